@@ -21,6 +21,14 @@ from sqlmodel import SQLModel
 
 target_metadata = SQLModel.metadata
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Partisi dan arsip histories (histories_y2026m01, histories_default, histories_archive_*)
+    # dibuat di luar model, jangan dianggap tabel yang harus di-drop oleh autogenerate
+    if type_ == "table" and reflected and compare_to is None and name.startswith("histories_"):
+        return False
+
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -54,6 +62,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -75,7 +84,8 @@ def run_migrations_online() -> None:
         context.configure(
             connection=connection, 
             target_metadata=target_metadata,
-            compare_type=True
+            compare_type=True,
+            include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,117 @@
+"""partition_histories_by_month
+
+Revision ID: b5c7d9e1f3a2
+Revises: 8d2e4b6f1a3c
+Create Date: 2026-10-18 11:02:37.530193
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5c7d9e1f3a2'
+down_revision: Union[str, Sequence[str], None] = '8d2e4b6f1a3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Jumlah bulan ke depan yang partisinya langsung dibuat
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_history_indexes(table: str) -> None:
+    op.create_index(op.f('ix_histories_item_id'), table, ['item_id'], unique=False)
+    op.create_index(op.f('ix_histories_user_id'), table, ['user_id'], unique=False)
+    op.create_index(op.f('ix_histories_viewed_at'), table, ['viewed_at'], unique=False)
+
+
+def _drop_history_indexes(table: str) -> None:
+    op.drop_index(op.f('ix_histories_viewed_at'), table_name=table)
+    op.drop_index(op.f('ix_histories_user_id'), table_name=table)
+    op.drop_index(op.f('ix_histories_item_id'), table_name=table)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Declarative partitioning hanya ada di PostgreSQL; database lain tetap memakai tabel biasa
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    _drop_history_indexes('histories')
+    op.execute('ALTER TABLE histories RENAME TO histories_legacy')
+    op.execute('ALTER INDEX histories_pkey RENAME TO histories_legacy_pkey')
+    op.execute('ALTER SEQUENCE histories_id_seq OWNED BY NONE')
+
+    # Primary key tabel partisi wajib memuat kolom partisi (viewed_at)
+    op.execute("""
+        CREATE TABLE histories (
+            id INTEGER NOT NULL DEFAULT nextval('histories_id_seq'),
+            user_id INTEGER REFERENCES users (id),
+            item_id INTEGER REFERENCES items (id),
+            viewed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            CONSTRAINT histories_pkey PRIMARY KEY (id, viewed_at)
+        ) PARTITION BY RANGE (viewed_at)
+    """)
+    op.execute('ALTER SEQUENCE histories_id_seq OWNED BY histories.id')
+    _create_history_indexes('histories')
+
+    # Satu partisi per bulan dari histori paling lama sampai MONTHS_AHEAD bulan ke depan
+    oldest = op.get_bind().execute(sa.text('SELECT min(viewed_at) FROM histories_legacy')).scalar()
+    today = datetime.now(timezone.utc).date()
+    month = (oldest.date() if oldest else today).replace(day=1)
+    last = _add_months(today.replace(day=1), MONTHS_AHEAD)
+
+    while month <= last:
+        following = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE histories_y{month.year}m{month.month:02d} PARTITION OF histories "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+        )
+        month = following
+
+    # Menampung histori di luar partisi yang ada, supaya insert tidak pernah ditolak
+    op.execute('CREATE TABLE histories_default PARTITION OF histories DEFAULT')
+
+    op.execute("""
+        INSERT INTO histories (id, user_id, item_id, viewed_at)
+        SELECT id, user_id, item_id, viewed_at FROM histories_legacy
+    """)
+    op.execute('DROP TABLE histories_legacy')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    _drop_history_indexes('histories')
+    op.execute('ALTER TABLE histories RENAME TO histories_partitioned')
+    op.execute('ALTER INDEX histories_pkey RENAME TO histories_partitioned_pkey')
+    op.execute('ALTER SEQUENCE histories_id_seq OWNED BY NONE')
+
+    op.execute("""
+        CREATE TABLE histories (
+            id INTEGER NOT NULL DEFAULT nextval('histories_id_seq'),
+            user_id INTEGER REFERENCES users (id),
+            item_id INTEGER REFERENCES items (id),
+            viewed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            CONSTRAINT histories_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute('ALTER SEQUENCE histories_id_seq OWNED BY histories.id')
+
+    # Partisi yang sudah di-detach oleh retention (arsip) tidak ikut dikembalikan
+    op.execute("""
+        INSERT INTO histories (id, user_id, item_id, viewed_at)
+        SELECT id, user_id, item_id, viewed_at FROM histories_partitioned
+    """)
+    op.execute('DROP TABLE histories_partitioned')
+    _create_history_indexes('histories')
@@ -0,0 +1,155 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def content_hash(*parts: bytes | str) -> str:
+    """
+    Hash SHA-256 dari beberapa bagian (bytes / str) yang digabung.
+    Dipakai sebagai key cache berbasis isi (content-addressed).
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode()
+        digest.update(part)
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class CacheBackend:
+    """
+    Interface untuk tier cache bersama (shared), misalnya Redis / Memcached.
+    Implementasi cukup meng-override get, set dan delete.
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class TTLCache(CacheBackend):
+    """
+    Cache in-process dengan TTL per entry dan LRU eviction.
+    Thread-safe karena dipakai dari event loop maupun threadpool FastAPI.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: int = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: int | None = None) -> None:
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TieredCache:
+    """
+    Cache dua tingkat: tier lokal (TTLCache) di depan tier bersama yang opsional.
+    Hit di tier bersama akan di-populate ulang ke tier lokal.
+    """
+
+    def __init__(
+        self,
+        local: TTLCache,
+        shared: CacheBackend | None = None,
+    ):
+        self.local = local
+        self.shared = shared
+
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def set_shared_backend(self, backend: CacheBackend | None) -> None:
+        self.shared = backend
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        if self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except Exception as e:
+                print(f"Shared cache get failed: {str(e)}")
+                value = None
+
+            if value is not None:
+                self.hits += 1
+                self.shared_hits += 1
+                self.local.set(key, value)
+                return value
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        self.local.set(key, value)
+
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value, self.local.ttl)
+            except Exception as e:
+                print(f"Shared cache set failed: {str(e)}")
+
+    def delete(self, key: str) -> None:
+        self.local.delete(key)
+
+        if self.shared is not None:
+            try:
+                self.shared.delete(key)
+            except Exception as e:
+                print(f"Shared cache delete failed: {str(e)}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "local_entries": len(self.local),
+        }
@@ -0,0 +1,46 @@
+import ipaddress
+import socket
+from urllib.parse import urlsplit
+
+_ALLOWED_SCHEMES = ("http", "https")
+
+
+def _is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+
+    # Alamat IPv4 yang dibungkus IPv6 (::ffff:127.0.0.1) dicek sebagai IPv4
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+
+    return ip.is_global and not ip.is_multicast
+
+
+def validate_callback_url(url: str) -> list[str]:
+    """
+    Pastikan callback_url hanya menuju host publik lewat http/https, supaya
+    server tidak bisa dipakai untuk mengakses jaringan internal (SSRF).
+    Host di-resolve dan SEMUA alamatnya harus publik: loopback, private,
+    link-local, reserved, multicast dan unspecified ditolak.
+    Mengembalikan alamat yang sudah divalidasi; koneksi harus dibuat ke alamat
+    ini, bukan me-resolve host lagi (DNS bisa berubah di antaranya).
+    Raise ValueError("INVALID_CALLBACK_URL") jika tidak valid.
+    Melakukan DNS lookup (blocking), panggil lewat asyncio.to_thread dari kode async.
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+    except ValueError:
+        raise ValueError("INVALID_CALLBACK_URL")
+
+    if parts.scheme not in _ALLOWED_SCHEMES or not parts.hostname or parts.username or parts.password:
+        raise ValueError("INVALID_CALLBACK_URL")
+
+    try:
+        addresses = socket.getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError):
+        raise ValueError("INVALID_CALLBACK_URL")
+
+    if not addresses or not all(_is_public_address(info[4][0]) for info in addresses):
+        raise ValueError("INVALID_CALLBACK_URL")
+
+    return list(dict.fromkeys(info[4][0].split("%", 1)[0] for info in addresses))
@@ -8,6 +8,129 @@ class Settings(BaseSettings):
     GEMINI_MODEL_NAME_CHECK: str
     GEMINI_MODEL_NAME_PROCESS: str
 
+    # Ukuran maksimum file upload (bytes)
+    UPLOAD_MAX_BYTES: int = 15 * 1024 * 1024
+
+    # Cache hasil LLM (key: hash gambar + model + versi prompt)
+    LLM_CACHE_TTL_SECONDS: int = 86400
+    LLM_CACHE_MAX_ENTRIES: int = 2048
+
+    # Jarak Hamming maksimum (dari 64 bit) untuk gambar dianggap near-duplicate
+    PHASH_MAX_DISTANCE: int = 6
+
+    # Similarity trigram minimum (0-1) untuk mencocokkan nama hasil check ke Item
+    ITEM_NAME_MATCH_THRESHOLD: float = 0.6
+
+    # Pre-filter lokal (NumPy) untuk menolak gambar non-sampah tanpa memanggil model
+    PREFILTER_ENABLED: bool = True
+    PREFILTER_REJECT_THRESHOLD: float = 0.95
+    PREFILTER_MIN_SAMPLES_PER_CLASS: int = 20
+    PREFILTER_MAX_SAMPLES_PER_CLASS: int = 500
+    PREFILTER_RETRAIN_EVERY: int = 50
+    PREFILTER_NEGATIVE_DIR: str = "storage/prefilter/negative"
+
+    # Batas inferensi bersamaan per worker dan timeout per panggilan model
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_TIMEOUT_SECONDS: float = 30
+
+    # Minta output JSON sesuai skema Pydantic (response_schema) dari Gemini
+    LLM_STRUCTURED_OUTPUT: bool = True
+
+    # /llm/scan: hasil model check dipakai langsung jika confidence >= nilai ini
+    LLM_SCAN_CONFIDENCE_THRESHOLD: float = 0.8
+
+    # Deadline total per request /llm/* (semua panggilan model di dalamnya)
+    LLM_REQUEST_DEADLINE_SECONDS: float = 45
+    # Circuit breaker per model: open jika error rate >= FAILURE_RATE dari WINDOW panggilan terakhir
+    LLM_BREAKER_FAILURE_RATE: float = 0.5
+    LLM_BREAKER_MIN_CALLS: int = 10
+    LLM_BREAKER_WINDOW: int = 50
+    LLM_BREAKER_OPEN_SECONDS: float = 30
+    # Hedged request: kirim request kedua jika yang pertama melewati p95 latency model
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_MIN_SAMPLES: int = 50
+
+    # Prompt process dibangun dari tabel categories; dibangun ulang berkala untuk multi-worker
+    LLM_PROMPT_REFRESH_SECONDS: int = 300
+    # Context caching Gemini untuk prompt statis (butuh jumlah token minimum dari model)
+    LLM_CONTEXT_CACHE_ENABLED: bool = False
+    LLM_CONTEXT_CACHE_TTL_SECONDS: int = 3600
+
+    # Backend inferensi: "gemini", "fake" (lokal, untuk load test) atau "onnx" (on-CPU)
+    LLM_BACKEND: str = "gemini"
+    FAKE_MODEL_LATENCY_MEDIAN_SECONDS: float = 0.8
+    FAKE_MODEL_LATENCY_SIGMA: float = 0.5
+    FAKE_MODEL_ERROR_RATE: float = 0.0
+    FAKE_MODEL_SEED: int | None = None
+    ONNX_MODEL_PATH: str = "storage/models/classifier.onnx"
+    ONNX_LABELS_PATH: str = "storage/models/labels.json"
+    ONNX_INPUT_SIZE: int = 224
+
+    # Connection pool untuk genai.Client (dibuat sekali per proses)
+    GENAI_MAX_CONNECTIONS: int = 32
+    GENAI_MAX_KEEPALIVE_CONNECTIONS: int = 16
+    GENAI_KEEPALIVE_EXPIRY_SECONDS: float = 60
+
+    # Preprocessing gambar sebelum dikirim ke model
+    IMAGE_PREPROCESS_ENABLED: bool = True
+    IMAGE_PREPROCESS_WORKERS: int = 2
+    IMAGE_MAX_EDGE: int = 1024
+    IMAGE_QUALITY: int = 85
+    IMAGE_OUTPUT_FORMAT: str = "JPEG"
+
+    # Endpoint batch /api/llm/process/batch
+    LLM_BATCH_MAX_FILES: int = 20
+    LLM_BATCH_MAX_CONCURRENCY: int = 8
+
+    # Mode asynchronous (job queue) untuk /api/llm/jobs
+    LLM_JOB_WORKERS: int = 4
+    LLM_JOB_QUEUE_MAX_SIZE: int = 100
+    LLM_JOB_MAX_RETRIES: int = 3
+    LLM_JOB_RETRY_BASE_SECONDS: float = 1.0
+    LLM_JOB_CALLBACK_TIMEOUT_SECONDS: float = 10
+    LLM_JOB_STORE: str = "memory"  # memory | sqlite
+    LLM_JOB_SQLITE_PATH: str = "storage/llm_jobs.sqlite3"
+
+    # Rekomendasi: interaksi baru digabung ke matriks sparse setiap N pasangan
+    RECOMMENDATION_COMPACT_THRESHOLD: int = 5000
+    # Index item-item (top-K tetangga per item) dibangun ulang di background setiap N detik
+    RECOMMENDATION_NEIGHBOURS: int = 20
+    RECOMMENDATION_INDEX_REBUILD_SECONDS: float = 300
+    # Jumlah item terakhir user yang dipakai sebagai dasar rekomendasi, dan jumlah hasil maksimum
+    RECOMMENDATION_RECENT_ITEMS: int = 20
+    RECOMMENDATION_LIMIT: int = 20
+    # Similarity user-user: "exact" (semua user) atau "lsh" (kandidat dari MinHash LSH)
+    RECOMMENDATION_USER_SIMILARITY: str = "exact"  # exact | lsh
+    RECOMMENDATION_LSH_PERMUTATIONS: int = 64
+    RECOMMENDATION_LSH_BANDS: int = 32
+    RECOMMENDATION_LSH_MAX_CANDIDATES: int = 500
+    # Cache hasil rekomendasi per user (dihapus saat user melihat item baru)
+    RECOMMENDATION_CACHE_TTL_SECONDS: int = 600
+    RECOMMENDATION_CACHE_MAX_ENTRIES: int = 10000
+
+    # Popular items: window sliding per jam (168 = 7 hari) dan jumlah item yang dikembalikan
+    POPULAR_ITEMS_WINDOW_HOURS: int = 168
+    POPULAR_ITEMS_LIMIT: int = 10
+    # Rollup harian item_daily_views: interval refresh dan jumlah hari terakhir yang dihitung ulang
+    ITEM_DAILY_VIEWS_REFRESH_SECONDS: float = 300
+    ITEM_DAILY_VIEWS_LOOKBACK_DAYS: int = 1
+    # Trending: skor view meluruh setengahnya setiap HALF_LIFE jam (di-bootstrap dari window popular items)
+    TRENDING_HALF_LIFE_HOURS: float = 24
+    TRENDING_LIMIT: int = 10
+    # Histori view item: ditampung di memori lalu di-insert per batch saat mencapai MAX_SIZE
+    # atau setiap FLUSH_SECONDS. Jika proses mati mendadak, paling banyak satu batch / interval hilang;
+    # saat database down buffer dibatasi MAX_PENDING baris (yang paling lama dibuang)
+    HISTORY_BUFFER_ENABLED: bool = True
+    HISTORY_BUFFER_MAX_SIZE: int = 500
+    HISTORY_BUFFER_FLUSH_SECONDS: float = 1
+    HISTORY_BUFFER_MAX_PENDING: int = 100000
+    # Partisi bulanan histories (PostgreSQL) dibuat N bulan ke depan. Partisi yang lebih tua dari
+    # RETENTION_MONTHS bulan (0 = simpan semua) di-detach sebagai arsip atau di-drop
+    HISTORY_PARTITION_MONTHS_AHEAD: int = 3
+    HISTORY_RETENTION_MONTHS: int = 12
+    HISTORY_RETENTION_MODE: str = "detach"  # detach | drop
+    HISTORY_MAINTENANCE_SECONDS: float = 86400
+
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
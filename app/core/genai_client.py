@@ -0,0 +1,113 @@
+import httpx
+from google import genai
+from google.genai import types
+
+from app.core.config import settings
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class TrackingTransport(httpx.AsyncHTTPTransport):
+    """
+    Transport httpx dengan connection pooling yang mencatat berapa request
+    yang dikirim dan berapa koneksi baru yang dibuka (sisanya = reuse).
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requests = 0
+        self.new_connections = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        parent_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: dict):
+            if event_name == "connection.connect_tcp.complete":
+                self.new_connections += 1
+            if parent_trace is not None:
+                await parent_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        return await super().handle_async_request(request)
+
+    def open_connections(self) -> int:
+        pool = getattr(self, "_pool", None)
+        if pool is None:
+            return 0
+
+        return sum(1 for connection in pool.connections if not connection.is_closed())
+
+
+_client: genai.Client | None = None
+_transport: TrackingTransport | None = None
+
+def init_genai_client() -> genai.Client:
+    """
+    Buat satu genai.Client per proses dengan koneksi HTTP yang di-pool.
+    Dipanggil saat lifespan startup.
+    """
+    global _client, _transport
+
+    if _client is not None:
+        return _client
+
+    _transport = TrackingTransport(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=settings.GENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.GENAI_KEEPALIVE_EXPIRY_SECONDS
+        )
+    )
+
+    _client = genai.Client(
+        api_key=settings.GEMINI_API_KEY,
+        http_options=types.HttpOptions(
+            httpx_async_client=httpx.AsyncClient(transport=_transport)
+        )
+    )
+
+    return _client
+
+def get_genai_client() -> genai.Client:
+    if _client is None:
+        return init_genai_client()
+
+    return _client
+
+async def close_genai_client():
+    global _client, _transport
+
+    if _client is None:
+        return
+
+    await _client.aio.aclose()
+    _client.close()
+
+    _client = None
+    _transport = None
+
+def genai_client_stats() -> dict:
+    if _transport is None:
+        return {
+            "initialized": False,
+            "http2": HTTP2_AVAILABLE
+        }
+
+    requests = _transport.requests
+    reused = max(requests - _transport.new_connections, 0)
+
+    return {
+        "initialized": True,
+        "http2": HTTP2_AVAILABLE,
+        "open_connections": _transport.open_connections(),
+        "requests": requests,
+        "new_connections": _transport.new_connections,
+        "reused_connections": reused,
+        "reuse_rate": round(reused / requests, 4) if requests else 0.0
+    }
@@ -0,0 +1,150 @@
+import io
+import threading
+from collections import defaultdict
+from itertools import combinations
+
+from PIL import Image, ImageOps
+
+HASH_BITS = 64
+CHUNK_COUNT = 4
+CHUNK_BITS = HASH_BITS // CHUNK_COUNT
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+
+def dhash(image: bytes | str, hash_size: int = 8) -> int | None:
+    """
+    Difference hash (dHash) 64-bit dari gambar (bytes atau path file).
+    Mengembalikan None jika gambar tidak bisa di-decode.
+    """
+    source = io.BytesIO(image) if isinstance(image, bytes) else image
+
+    try:
+        with Image.open(source) as image:
+            # Decode JPEG langsung di resolusi kecil supaya foto besar tetap murah
+            image.draft("L", (hash_size * 8, hash_size * 8))
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("L").resize(
+                (hash_size + 1, hash_size),
+                Image.Resampling.LANCZOS
+            )
+            pixels = image.tobytes()
+    except Exception:
+        return None
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+
+    return value
+
+
+def to_signed64(value: int) -> int:
+    """Konversi hash unsigned 64-bit ke signed agar muat di kolom BIGINT."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def from_signed64(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _chunks(value: int) -> list[int]:
+    return [
+        (value >> (index * CHUNK_BITS)) & CHUNK_MASK
+        for index in range(CHUNK_COUNT)
+    ]
+
+
+def _neighbours(chunk: int, radius: int):
+    """Semua nilai chunk dengan jarak Hamming <= radius dari chunk."""
+    yield chunk
+    for distance in range(1, radius + 1):
+        for bits in combinations(range(CHUNK_BITS), distance):
+            flipped = chunk
+            for bit in bits:
+                flipped ^= 1 << bit
+            yield flipped
+
+
+class HammingIndex:
+    """
+    Multi-index hashing untuk hash 64-bit.
+
+    Hash dipecah menjadi 4 chunk 16-bit yang masing-masing punya tabel sendiri.
+    Dua hash dengan jarak <= r pasti punya minimal satu chunk dengan jarak
+    <= r // 4 (pigeonhole), jadi cukup memeriksa tetangga kecil di tiap tabel
+    lalu memverifikasi kandidat dengan popcount.
+    """
+
+    def __init__(self):
+        self._hashes: dict[int, int] = {}
+        self._tables: list[dict[int, set[int]]] = [
+            defaultdict(set) for _ in range(CHUNK_COUNT)
+        ]
+        self._lock = threading.Lock()
+
+    def add(self, key: int, value: int) -> None:
+        with self._lock:
+            self._remove(key)
+            self._hashes[key] = value
+            for table, chunk in zip(self._tables, _chunks(value)):
+                table[chunk].add(key)
+
+    def remove(self, key: int) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: int) -> None:
+        value = self._hashes.pop(key, None)
+        if value is None:
+            return
+
+        for table, chunk in zip(self._tables, _chunks(value)):
+            bucket = table.get(chunk)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del table[chunk]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hashes.clear()
+            for table in self._tables:
+                table.clear()
+
+    def nearest(self, value: int, max_distance: int) -> tuple[int, int] | None:
+        """
+        Cari key dengan hash terdekat dalam jarak max_distance.
+        Mengembalikan (key, distance) atau None.
+        """
+        radius = max_distance // CHUNK_COUNT
+        best: tuple[int, int] | None = None
+        seen: set[int] = set()
+
+        with self._lock:
+            for table, chunk in zip(self._tables, _chunks(value)):
+                for probe in _neighbours(chunk, radius):
+                    bucket = table.get(probe)
+                    if not bucket:
+                        continue
+
+                    for key in bucket:
+                        if key in seen:
+                            continue
+                        seen.add(key)
+
+                        distance = hamming_distance(value, self._hashes[key])
+                        if distance <= max_distance and (best is None or distance < best[1]):
+                            best = (key, distance)
+                            if distance == 0:
+                                return best
+
+        return best
+
+    def __len__(self) -> int:
+        return len(self._hashes)
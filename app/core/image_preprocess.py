@@ -0,0 +1,38 @@
+import io
+
+from PIL import Image, ImageOps
+
+MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+    "PNG": "image/png",
+}
+
+
+def preprocess_image(
+    image: bytes | str,
+    max_edge: int,
+    quality: int,
+    image_format: str = "JPEG",
+) -> tuple[bytes, str]:
+    """
+    Decode, perbaiki orientasi EXIF, resize ke max_edge, lalu encode ulang
+    tanpa metadata. Dijalankan di process pool, jadi harus top-level & picklable.
+    Menerima path file agar gambar tidak perlu disalin antar proses.
+    """
+    source = io.BytesIO(image) if isinstance(image, bytes) else image
+
+    with Image.open(source) as image:
+        # JPEG bisa di-decode langsung ke skala lebih kecil (jauh lebih cepat)
+        image.draft("RGB", (max_edge, max_edge))
+        image = ImageOps.exif_transpose(image)
+
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+        output = io.BytesIO()
+        image.save(output, format=image_format, quality=quality, optimize=True)
+
+    return output.getvalue(), MIME_TYPES.get(image_format, "image/jpeg")
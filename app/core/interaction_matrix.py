@@ -0,0 +1,348 @@
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+from scipy import sparse
+
+
+@dataclass(frozen=True)
+class InteractionSnapshot:
+    csr: sparse.csr_matrix
+    csc: sparse.csc_matrix
+    item_ids: tuple[int, ...]
+    # Naik setiap kali matriks dibangun ulang dari awal (mapping kolom berubah)
+    generation: int
+    # Kolom item yang mendapat pasangan baru sejak snapshot sebelumnya
+    dirty_cols: frozenset[int]
+
+
+class InteractionMatrix:
+    """
+    Matriks user x item biner (sudah pernah dilihat / belum) di memori untuk
+    collaborative filtering. Disimpan sebagai CSR (baris = user) dan CSC
+    (kolom = item) yang dibangun ulang secara berkala; interaksi baru masuk
+    ke delta kecil dulu dan digabung saat jumlahnya melewati compact_threshold.
+    """
+
+    def __init__(self, compact_threshold: int = 5000):
+        self.compact_threshold = compact_threshold
+
+        self._user_index: dict[int, int] = {}
+        self._user_ids: list[int] = []
+        self._item_index: dict[int, int] = {}
+        self._item_ids: list[int] = []
+
+        self._csr = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._csc = self._csr.tocsc()
+        self._row_counts = np.zeros(0, dtype=np.int64)
+
+        # Pasangan baru yang belum masuk ke matriks utama
+        self._delta_rows: dict[int, set[int]] = defaultdict(set)
+        self._delta_cols: dict[int, set[int]] = defaultdict(set)
+        self._delta_size = 0
+        self._dirty_cols: set[int] = set()
+        self.generation = 0
+
+        # Jumlah baris histories (termasuk view berulang), bukan pasangan unik
+        self.events = 0
+        self.compactions = 0
+        self._lock = threading.Lock()
+
+    def _row(self, user_id: int) -> int:
+        row = self._user_index.get(user_id)
+        if row is None:
+            row = self._user_index[user_id] = len(self._user_ids)
+            self._user_ids.append(user_id)
+        return row
+
+    def _col(self, item_id: int) -> int:
+        col = self._item_index.get(item_id)
+        if col is None:
+            col = self._item_index[item_id] = len(self._item_ids)
+            self._item_ids.append(item_id)
+        return col
+
+    def load(self, pairs: Iterable[tuple[int, int]]) -> None:
+        """Bangun ulang seluruh matriks dari pasangan (user_id, item_id)."""
+        with self._lock:
+            self._user_index.clear()
+            self._user_ids.clear()
+            self._item_index.clear()
+            self._item_ids.clear()
+            self._delta_rows.clear()
+            self._delta_cols.clear()
+            self._delta_size = 0
+            self._dirty_cols = set()
+            self.generation += 1
+            self.events = 0
+
+            rows: list[int] = []
+            cols: list[int] = []
+            for user_id, item_id in pairs:
+                rows.append(self._row(user_id))
+                cols.append(self._col(item_id))
+                self.events += 1
+
+            self._rebuild(np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64))
+
+    def _rebuild(self, rows: np.ndarray, cols: np.ndarray) -> None:
+        shape = (len(self._user_index), len(self._item_ids))
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=shape
+        )
+        # View berulang ke item yang sama dijumlahkan oleh SciPy, jadikan biner lagi
+        matrix.sum_duplicates()
+        matrix.data[:] = 1.0
+
+        self._csr = matrix
+        self._csc = matrix.tocsc()
+        self._row_counts = np.diff(matrix.indptr).astype(np.int64)
+
+    def _compact(self) -> None:
+        base = self._csr.tocoo()
+        delta_rows = [row for row, cols in self._delta_rows.items() for _ in cols]
+        delta_cols = [col for cols in self._delta_rows.values() for col in cols]
+
+        self._rebuild(
+            np.concatenate([base.row, np.asarray(delta_rows, dtype=np.int64)]),
+            np.concatenate([base.col, np.asarray(delta_cols, dtype=np.int64)])
+        )
+
+        self._delta_rows.clear()
+        self._delta_cols.clear()
+        self._delta_size = 0
+        self.compactions += 1
+
+    def _in_base(self, row: int, col: int) -> bool:
+        if row >= self._csr.shape[0] or col >= self._csr.shape[1]:
+            return False
+
+        start, end = self._csr.indptr[row], self._csr.indptr[row + 1]
+        indices = self._csr.indices[start:end]
+        position = np.searchsorted(indices, col)
+        return position < len(indices) and indices[position] == col
+
+    def add(self, user_id: int, item_id: int) -> bool:
+        """Catat satu interaksi. Mengembalikan True jika pasangannya baru."""
+        with self._lock:
+            self.events += 1
+            row = self._row(user_id)
+            col = self._col(item_id)
+
+            if col in self._delta_rows.get(row, ()) or self._in_base(row, col):
+                return False
+
+            self._delta_rows[row].add(col)
+            self._delta_cols[col].add(row)
+            self._delta_size += 1
+            self._dirty_cols.add(col)
+
+            if self._delta_size >= self.compact_threshold:
+                self._compact()
+
+            return True
+
+    def snapshot(self) -> InteractionSnapshot:
+        """
+        Matriks saat ini (delta sudah digabung) untuk dipakai job di background.
+        Matriks CSR / CSC tidak pernah diubah di tempat, jadi aman dibaca tanpa lock.
+        """
+        with self._lock:
+            if self._delta_size:
+                self._compact()
+
+            dirty_cols, self._dirty_cols = self._dirty_cols, set()
+
+            return InteractionSnapshot(
+                csr=self._csr,
+                csc=self._csc,
+                item_ids=tuple(self._item_ids),
+                generation=self.generation,
+                dirty_cols=frozenset(dirty_cols)
+            )
+
+    def restore_dirty(self, snapshot: InteractionSnapshot) -> None:
+        """
+        Kembalikan dirty_cols milik snapshot yang gagal diproses supaya ikut
+        snapshot berikutnya. Diabaikan jika matriks sudah dibangun ulang sejak itu.
+        """
+        with self._lock:
+            if snapshot.generation == self.generation:
+                self._dirty_cols |= snapshot.dirty_cols
+
+    def _user_cols(self, row: int) -> np.ndarray:
+        if row < self._csr.shape[0]:
+            start, end = self._csr.indptr[row], self._csr.indptr[row + 1]
+            base = self._csr.indices[start:end]
+        else:
+            base = np.zeros(0, dtype=np.int32)
+
+        delta = self._delta_rows.get(row)
+        if not delta:
+            return base
+
+        return np.concatenate([base, np.fromiter(delta, dtype=base.dtype, count=len(delta))])
+
+    def similar_users(
+        self,
+        user_id: int,
+        top_k: int,
+        candidates: Iterable[int] | None = None
+    ) -> list[tuple[int, float]]:
+        """
+        Top-k user lain dengan cosine similarity tertinggi (> 0) terhadap user_id.
+        Tanpa candidates, irisan dihitung dari kolom item milik user target lewat CSC,
+        jadi biayanya sebanding dengan popularitas item tersebut, bukan total histori.
+        Dengan candidates (misalnya dari LSH), hanya user tersebut yang dihitung.
+        """
+        with self._lock:
+            return self._similar_rows(user_id, top_k, candidates)
+
+    def _all_intersections(self, target_cols: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        n_users = len(self._user_ids)
+        base_cols = target_cols[target_cols < self._csc.shape[1]]
+
+        if len(base_cols):
+            starts = self._csc.indptr[base_cols]
+            ends = self._csc.indptr[base_cols + 1]
+            users = np.concatenate([self._csc.indices[s:e] for s, e in zip(starts, ends)])
+            intersections = np.bincount(users, minlength=n_users).astype(np.float64)
+        else:
+            intersections = np.zeros(n_users, dtype=np.float64)
+
+        for col in target_cols:
+            for other in self._delta_cols.get(int(col), ()):
+                intersections[other] += 1
+
+        counts = np.zeros(n_users, dtype=np.float64)
+        counts[:len(self._row_counts)] = self._row_counts
+        for other, cols in self._delta_rows.items():
+            counts[other] += len(cols)
+
+        return intersections, counts
+
+    def _candidate_intersections(
+        self,
+        target_cols: np.ndarray,
+        rows: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        target = np.zeros(len(self._item_ids), dtype=np.float32)
+        target[target_cols] = 1
+
+        base_rows = rows < self._csr.shape[0]
+        intersections = np.zeros(len(rows), dtype=np.float64)
+        counts = np.zeros(len(rows), dtype=np.float64)
+
+        if base_rows.any():
+            base = self._csr[rows[base_rows]]
+            intersections[base_rows] = base @ target[:base.shape[1]]
+            counts[base_rows] = self._row_counts[rows[base_rows]]
+
+        for position, row in enumerate(rows.tolist()):
+            delta = self._delta_rows.get(row)
+            if delta:
+                intersections[position] += target[list(delta)].sum()
+                counts[position] += len(delta)
+
+        return intersections, counts
+
+    def _similar_rows(
+        self,
+        user_id: int,
+        top_k: int,
+        candidates: Iterable[int] | None = None
+    ) -> list[tuple[int, float]]:
+        row = self._user_index.get(user_id)
+        if row is None:
+            return []
+
+        target_cols = self._user_cols(row)
+        if len(target_cols) == 0:
+            return []
+
+        if candidates is None:
+            intersections, counts = self._all_intersections(target_cols)
+            intersections[row] = 0
+            rows = np.flatnonzero(intersections)
+            intersections, counts = intersections[rows], counts[rows]
+        else:
+            rows = np.fromiter(
+                (self._user_index[other] for other in candidates
+                 if other in self._user_index and other != user_id),
+                dtype=np.int64
+            )
+            intersections, counts = self._candidate_intersections(target_cols, rows)
+            nonzero = intersections > 0
+            rows, intersections, counts = rows[nonzero], intersections[nonzero], counts[nonzero]
+
+        if len(rows) == 0:
+            return []
+
+        scores = intersections / (np.sqrt(counts) * np.sqrt(len(target_cols)))
+
+        if len(rows) > top_k:
+            best = np.argpartition(-scores, top_k)[:top_k]
+            rows, scores = rows[best], scores[best]
+
+        order = np.argsort(-scores, kind="stable")
+
+        return [(self._user_ids[rows[i]], float(scores[i])) for i in order]
+
+    def recommend(
+        self,
+        user_id: int,
+        top_k_users: int,
+        candidates: Iterable[int] | None = None
+    ) -> list[int]:
+        """
+        Item yang dilihat oleh top_k_users user paling mirip tetapi belum
+        dilihat user_id, diurutkan dari jumlah similarity terbesar.
+        """
+        with self._lock:
+            neighbours = self._similar_rows(user_id, top_k_users, candidates)
+            if not neighbours:
+                return []
+
+            seen = set(self._user_cols(self._user_index[user_id]).tolist())
+            scores: dict[int, float] = defaultdict(float)
+
+            for other_id, similarity in neighbours:
+                for col in self._user_cols(self._user_index[other_id]).tolist():
+                    if col not in seen:
+                        scores[col] += similarity
+
+            ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+
+            return [self._item_ids[col] for col, _ in ranked]
+
+    def user_items(self, user_id: int) -> set[int]:
+        with self._lock:
+            row = self._user_index.get(user_id)
+            if row is None:
+                return set()
+
+            return {self._item_ids[col] for col in self._user_cols(row).tolist()}
+
+    def user_ids(self) -> list[int]:
+        with self._lock:
+            return list(self._user_ids)
+
+    def has_user(self, user_id: int) -> bool:
+        return user_id in self._user_index
+
+    @property
+    def user_count(self) -> int:
+        return len(self._user_index)
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._user_index),
+            "items": len(self._item_ids),
+            "interactions": int(self._csr.nnz) + self._delta_size,
+            "events": self.events,
+            "pending": self._delta_size,
+            "compactions": self.compactions
+        }
@@ -0,0 +1,159 @@
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from scipy import sparse
+
+from app.core.interaction_matrix import InteractionSnapshot
+
+
+@dataclass(frozen=True)
+class ItemSimilarityIndex:
+    """
+    Top-K tetangga per item (cosine similarity co-occurrence), disimpan
+    sebagai array (n_items x K). Baris i berisi posisi item tetangga
+    (-1 = kosong) dan skornya, urut dari yang paling mirip.
+    """
+
+    item_ids: np.ndarray
+    positions: dict[int, int]
+    neighbours: np.ndarray
+    scores: np.ndarray
+    generation: int
+    built_at: float
+    build_seconds: float
+    rows_rebuilt: int
+
+    @property
+    def top_k(self) -> int:
+        return self.neighbours.shape[1]
+
+    def recommend(self, recent_item_ids: list[int], exclude: set[int], limit: int) -> list[int]:
+        """
+        Gabungkan tetangga dari item yang baru dilihat user, jumlahkan
+        skornya, lalu buang item yang sudah pernah dilihat.
+        """
+        rows = [self.positions[item_id] for item_id in recent_item_ids if item_id in self.positions]
+        if not rows:
+            return []
+
+        candidates = self.neighbours[rows].ravel()
+        weights = self.scores[rows].ravel()
+
+        valid = candidates >= 0
+        candidates, weights = candidates[valid], weights[valid]
+        if len(candidates) == 0:
+            return []
+
+        unique, inverse = np.unique(candidates, return_inverse=True)
+        totals = np.bincount(inverse, weights=weights)
+
+        ranked = []
+        for index in np.argsort(-totals, kind="stable").tolist():
+            item_id = int(self.item_ids[unique[index]])
+            if item_id in exclude:
+                continue
+
+            ranked.append(item_id)
+            if len(ranked) >= limit:
+                break
+
+        return ranked
+
+    def stats(self) -> dict:
+        return {
+            "items": len(self.item_ids),
+            "top_k": self.top_k,
+            "generation": self.generation,
+            "age_seconds": round(time.monotonic() - self.built_at, 1),
+            "build_seconds": round(self.build_seconds, 3),
+            "rows_rebuilt": self.rows_rebuilt
+        }
+
+
+def _affected_rows(snapshot: InteractionSnapshot) -> np.ndarray:
+    """
+    Item yang barisnya bisa berubah karena pasangan baru di dirty_cols:
+    item dirty itu sendiri dan semua item yang co-occur dengannya
+    (norm item dirty ikut berubah, jadi cosine terhadapnya juga berubah).
+    """
+    dirty = np.fromiter(snapshot.dirty_cols, dtype=np.int64, count=len(snapshot.dirty_cols))
+    if len(dirty) == 0:
+        return dirty
+
+    users = np.unique(snapshot.csc[:, dirty].indices)
+    items = snapshot.csr[users].indices
+
+    return np.union1d(dirty, items)
+
+
+def build_item_similarity(
+    snapshot: InteractionSnapshot,
+    top_k: int,
+    previous: ItemSimilarityIndex | None = None,
+    block_size: int = 512
+) -> ItemSimilarityIndex:
+    """
+    Bangun index item-item dari snapshot matriks user x item. Jika previous
+    berasal dari generation yang sama, hanya baris item yang terpengaruh
+    interaksi baru yang dihitung ulang; sisanya disalin dari previous.
+    Hasilnya objek baru, jadi pemanggil cukup mengganti referensinya (atomic swap).
+    """
+    started = time.perf_counter()
+
+    csc = snapshot.csc
+    n_items = len(snapshot.item_ids)
+    norms = np.sqrt(np.diff(csc.indptr)).astype(np.float32)
+
+    neighbours = np.full((n_items, top_k), -1, dtype=np.int32)
+    scores = np.zeros((n_items, top_k), dtype=np.float32)
+
+    incremental = (
+        previous is not None
+        and previous.generation == snapshot.generation
+        and previous.top_k == top_k
+    )
+
+    if incremental:
+        previous_items = len(previous.item_ids)
+        neighbours[:previous_items] = previous.neighbours
+        scores[:previous_items] = previous.scores
+        rows = _affected_rows(snapshot)
+    else:
+        rows = np.arange(n_items)
+
+    # Item x item co-occurrence dihitung per blok baris supaya memori tetap kecil
+    item_users = csc.T.tocsr()
+
+    for start in range(0, len(rows), block_size):
+        block = rows[start:start + block_size]
+        cooccurrence = sparse.csr_matrix(item_users[block] @ csc)
+
+        block_rows = np.repeat(np.arange(len(block)), np.diff(cooccurrence.indptr))
+        others = cooccurrence.indices
+        similarity = cooccurrence.data / (norms[block][block_rows] * norms[others])
+        similarity[others == block[block_rows]] = 0
+
+        # Urutkan per baris dari similarity terbesar, lalu ambil K pertama setiap baris
+        order = np.lexsort((-similarity, block_rows))
+        rank = np.arange(len(order)) - cooccurrence.indptr[block_rows[order]]
+        selected = (rank < top_k) & (similarity[order] > 0)
+        keep, keep_rank = order[selected], rank[selected]
+
+        neighbours[block] = -1
+        scores[block] = 0
+        neighbours[block[block_rows[keep]], keep_rank] = others[keep]
+        scores[block[block_rows[keep]], keep_rank] = similarity[keep]
+
+    item_ids = np.asarray(snapshot.item_ids, dtype=np.int64)
+
+    return ItemSimilarityIndex(
+        item_ids=item_ids,
+        positions={item_id: position for position, item_id in enumerate(snapshot.item_ids)},
+        neighbours=neighbours,
+        scores=scores,
+        generation=snapshot.generation,
+        built_at=time.monotonic(),
+        build_seconds=time.perf_counter() - started,
+        rows_rebuilt=len(rows)
+    )
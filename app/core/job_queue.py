@@ -0,0 +1,300 @@
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+from uuid import uuid4
+
+
+def _process_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # os.kill(pid, 0) di Windows justru menghentikan proses
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+
+    return True
+
+
+class JobStore:
+    """
+    Interface penyimpanan status job. Implementasi cukup meng-override get dan save.
+    """
+
+    def get(self, job_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def save(self, job: dict) -> None:
+        raise NotImplementedError
+
+
+class InMemoryJobStore(JobStore):
+    def __init__(self, max_jobs: int = 10000):
+        self.max_jobs = max_jobs
+        self._jobs: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def save(self, job: dict) -> None:
+        with self._lock:
+            self._jobs[job["id"]] = dict(job)
+
+            # Buang job paling lama agar memori tidak tumbuh tanpa batas
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.pop(next(iter(self._jobs)))
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Status job disimpan di SQLite sehingga tetap bisa di-poll setelah restart.
+    Beberapa worker (proses uvicorn) boleh memakai file yang sama: setiap baris
+    mencatat pid worker yang terakhir menyimpannya, dan saat start hanya job
+    queued / running milik proses yang sudah mati yang ditandai failed.
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_jobs (id TEXT PRIMARY KEY, data TEXT NOT NULL, worker_pid INTEGER)"
+            )
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(llm_jobs)")]
+            if "worker_pid" not in columns:
+                self._conn.execute("ALTER TABLE llm_jobs ADD COLUMN worker_pid INTEGER")
+
+            rows = self._conn.execute("SELECT data, worker_pid FROM llm_jobs").fetchall()
+            for data, worker_pid in rows:
+                job = json.loads(data)
+                if job["status"] in ("queued", "running") and not self._worker_alive(worker_pid):
+                    job["status"] = "failed"
+                    job["error"] = "Interrupted by restart"
+                    self._conn.execute(
+                        "UPDATE llm_jobs SET data = ? WHERE id = ?",
+                        (json.dumps(job), job["id"])
+                    )
+
+    def _worker_alive(self, pid: int | None) -> bool:
+        # Pid sendiri berarti job dari proses sebelumnya yang kebetulan dapat pid sama (misalnya pid 1 di container)
+        if pid is None or pid == self._pid:
+            return False
+
+        return _process_alive(pid)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM llm_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+
+        return json.loads(row[0]) if row else None
+
+    def save(self, job: dict) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_jobs (id, data, worker_pid) VALUES (?, ?, ?)",
+                (job["id"], json.dumps(job), self._pid)
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class JobQueue:
+    """
+    Antrian job in-process dengan worker pool, backpressure (antrian terbatas)
+    dan retry dengan exponential backoff + jitter untuk error transient.
+    Job yang belum selesai saat stop() ditandai failed dan payload-nya dibuang
+    lewat discard_payload (antrian hanya ada di memori, job tidak dilanjutkan).
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[dict, Any], Awaitable[Any]],
+        store: JobStore,
+        max_size: int = 100,
+        max_retries: int = 3,
+        retry_base_seconds: float = 1.0,
+        is_transient: Callable[[Exception], bool] = lambda e: False,
+        on_finished: Callable[[dict], Awaitable[None]] | None = None,
+        discard_payload: Callable[[Any], None] | None = None,
+    ):
+        self.handler = handler
+        self.store = store
+        self.max_size = max_size
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.is_transient = is_transient
+        self.on_finished = on_finished
+        self.discard_payload = discard_payload
+
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+
+        self.in_flight = 0
+        self.stats = {
+            "submitted": 0,
+            "rejected": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "retried": 0,
+            "interrupted": 0
+        }
+
+    def start(self, workers: int) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(workers)
+        ]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if self._queue is None:
+            return
+
+        while not self._queue.empty():
+            job_id, payload = self._queue.get_nowait()
+            self._interrupt(job_id, payload)
+            self._queue.task_done()
+
+    def _interrupt(self, job_id: str, payload: Any) -> None:
+        job = self.store.get(job_id)
+
+        # Job yang sudah selesai (misalnya dihentikan saat on_finished) payload-nya sudah dipakai
+        if job is not None and job["status"] not in ("queued", "running"):
+            return
+
+        if job is not None:
+            self.stats["interrupted"] += 1
+            self._update(job, status="failed", error="Interrupted by shutdown")
+
+        if self.discard_payload is not None:
+            try:
+                self.discard_payload(payload)
+            except Exception as e:
+                print(f"Error discarding job payload {job_id}: {str(e)}")
+
+    def submit(self, payload: Any, owner_id: int | None = None, callback_url: str | None = None) -> dict:
+        """
+        Masukkan job ke antrian. Raise ValueError("QUEUE_FULL") jika antrian penuh
+        atau worker belum berjalan.
+        """
+        if self._queue is None or self._queue.full():
+            self.stats["rejected"] += 1
+            raise ValueError("QUEUE_FULL")
+
+        now = datetime.now(timezone.utc).isoformat()
+        job = {
+            "id": uuid4().hex,
+            "status": "queued",
+            "owner_id": owner_id,
+            "callback_url": callback_url,
+            "attempts": 0,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now
+        }
+
+        self.store.save(job)
+        self._queue.put_nowait((job["id"], payload))
+        self.stats["submitted"] += 1
+
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self.store.get(job_id)
+
+    def _update(self, job: dict, **fields) -> dict:
+        job.update(fields, updated_at=datetime.now(timezone.utc).isoformat())
+        self.store.save(job)
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, payload = await self._queue.get()
+            self.in_flight += 1
+
+            try:
+                job = self.store.get(job_id)
+                if job is not None:
+                    await self._run(job, payload)
+            except asyncio.CancelledError:
+                # Worker dihentikan oleh stop() saat job sedang berjalan / menunggu retry
+                self._interrupt(job_id, payload)
+                raise
+            except Exception as e:
+                print(f"Error running job {job_id}: {str(e)}")
+            finally:
+                self.in_flight -= 1
+                self._queue.task_done()
+
+    async def _run(self, job: dict, payload: Any) -> None:
+        while True:
+            self._update(job, status="running", attempts=job["attempts"] + 1)
+
+            try:
+                result = await self.handler(job, payload)
+
+            except Exception as e:
+                if self.is_transient(e) and job["attempts"] <= self.max_retries:
+                    self.stats["retried"] += 1
+                    self._update(job, status="queued", error=str(e))
+
+                    # Full jitter: tidur acak antara 0 dan base * 2^attempt
+                    backoff = self.retry_base_seconds * (2 ** (job["attempts"] - 1))
+                    await asyncio.sleep(random.uniform(0, backoff))
+                    continue
+
+                self.stats["failed"] += 1
+                self._update(job, status="failed", error=str(e))
+                break
+
+            self.stats["succeeded"] += 1
+            self._update(job, status="succeeded", result=result, error=None)
+            break
+
+        if self.on_finished is not None:
+            try:
+                await self.on_finished(job)
+            except Exception as e:
+                print(f"Error running job callback {job['id']}: {str(e)}")
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_size": self.max_size,
+            "in_flight": self.in_flight,
+            "workers": len(self._workers),
+            **self.stats
+        }
@@ -0,0 +1,95 @@
+import bisect
+import threading
+from collections import defaultdict
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class LatencyHistogram:
+    """
+    Histogram latency dengan bucket tetap (gaya Prometheus).
+    Quantile diestimasi dengan interpolasi linear di dalam bucket.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        index = bisect.bisect_left(self.buckets, seconds)
+
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += seconds
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def quantile(self, q: float) -> float | None:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+
+        if total == 0:
+            return None
+
+        rank = q * total
+        cumulative = 0
+
+        for index, count in enumerate(counts):
+            if count and cumulative + count >= rank:
+                if index == len(self.buckets):
+                    # Bucket +Inf tidak punya batas atas, pakai batas bucket terakhir
+                    return self.buckets[-1]
+
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / count
+
+            cumulative += count
+
+        return self.buckets[-1]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+            total_seconds = self._sum
+
+        labels = [f"le_{bucket}" for bucket in self.buckets] + ["le_inf"]
+        p50 = self.quantile(0.5)
+        p95 = self.quantile(0.95)
+
+        return {
+            "count": total,
+            "avg_seconds": round(total_seconds / total, 4) if total else 0.0,
+            "p50_seconds": round(p50, 4) if p50 is not None else None,
+            "p95_seconds": round(p95, 4) if p95 is not None else None,
+            "buckets": dict(zip(labels, counts))
+        }
+
+
+class HistogramRegistry:
+    """Kumpulan histogram yang dibuat otomatis per nama (misalnya per route)."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self._histograms: dict[str, LatencyHistogram] = defaultdict(
+            lambda: LatencyHistogram(buckets)
+        )
+
+    def observe(self, name: str, seconds: float) -> None:
+        self._histograms[name].observe(seconds)
+
+    def get(self, name: str) -> LatencyHistogram:
+        return self._histograms[name]
+
+    def snapshot(self) -> dict:
+        return {
+            name: histogram.snapshot()
+            for name, histogram in sorted(self._histograms.items())
+        }
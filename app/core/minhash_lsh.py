@@ -0,0 +1,231 @@
+import threading
+from collections import Counter
+from typing import Iterable
+
+import numpy as np
+
+# Bilangan prima Mersenne 2^31 - 1, hasil a * x + b tetap muat di uint64
+_PRIME = np.uint64((1 << 31) - 1)
+_EMPTY = np.iinfo(np.uint32).max
+
+
+class MinHashLSH:
+    """
+    MinHash + LSH banding untuk mencari user dengan himpunan item yang mirip
+    (estimasi Jaccard) dalam waktu sublinear. Signature dibagi menjadi `bands`
+    band; dua user menjadi kandidat jika minimal satu band-nya identik.
+    Signature bisa di-update per item karena MinHash cukup mengambil minimum.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 32, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+
+        generator = np.random.default_rng(seed)
+        self._a = generator.integers(1, int(_PRIME), num_perm, dtype=np.uint64)
+        self._b = generator.integers(0, int(_PRIME), num_perm, dtype=np.uint64)
+        self._mix = generator.integers(1, 1 << 63, self.rows_per_band, dtype=np.uint64) | np.uint64(1)
+
+        self._user_index: dict[int, int] = {}
+        self._user_ids: list[int] = []
+        self._signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        # Isi bucket: satu user_id (int) atau set user_id jika lebih dari satu
+        self._buckets: list[dict[int, int | set[int]]] = [{} for _ in range(bands)]
+        self.loaded = False
+        # Interaksi yang masuk selama load() berjalan, diputar ulang setelah swap
+        self._pending: list[tuple[int, int]] | None = None
+        self._lock = threading.Lock()
+
+    def _hash(self, item_ids: np.ndarray) -> np.ndarray:
+        x = np.asarray(item_ids, dtype=np.uint64) % _PRIME
+        return ((x[:, np.newaxis] * self._a + self._b) % _PRIME).astype(np.uint32)
+
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """Key integer per band, shape (n_users, bands)."""
+        parts = signatures.reshape(len(signatures), self.bands, self.rows_per_band).astype(np.uint64)
+        return (parts * self._mix).sum(axis=2, dtype=np.uint64)
+
+    def _bucket_add(self, band: int, key: int, user_id: int) -> None:
+        buckets = self._buckets[band]
+        members = buckets.get(key)
+
+        if members is None:
+            buckets[key] = user_id
+        elif isinstance(members, set):
+            members.add(user_id)
+        elif members != user_id:
+            buckets[key] = {members, user_id}
+
+    def _bucket_remove(self, band: int, key: int, user_id: int) -> None:
+        buckets = self._buckets[band]
+        members = buckets.get(key)
+
+        if members == user_id:
+            del buckets[key]
+        elif isinstance(members, set):
+            members.discard(user_id)
+            if len(members) == 1:
+                buckets[key] = next(iter(members))
+
+    def _row(self, user_id: int) -> tuple[int, bool]:
+        row = self._user_index.get(user_id)
+        if row is not None:
+            return row, False
+
+        row = self._user_index[user_id] = len(self._user_ids)
+        self._user_ids.append(user_id)
+
+        if row >= len(self._signatures):
+            grown = np.full((max(16, len(self._signatures) * 2), self.num_perm), _EMPTY, dtype=np.uint32)
+            grown[:len(self._signatures)] = self._signatures
+            self._signatures = grown
+
+        return row, True
+
+    def begin_load(self) -> None:
+        """
+        Mulai menampung add() untuk load() berikutnya. Panggil sebelum data sumber
+        dibaca, supaya interaksi yang masuk selama pembacaan tidak hilang saat swap.
+        """
+        with self._lock:
+            if self._pending is None:
+                self._pending = []
+
+    def load(self, pairs: Iterable[tuple[int, int]], chunk_size: int = 100_000) -> None:
+        """Bangun ulang seluruh signature dari pasangan (user_id, item_id)."""
+        self.begin_load()
+
+        try:
+            self._load(pairs, chunk_size)
+
+        except Exception:
+            self.abort_load()
+            raise
+
+    def abort_load(self) -> None:
+        """Batalkan begin_load(): buang tampungan jika data sumber gagal dibaca."""
+        with self._lock:
+            self._pending = None
+
+    def _load(self, pairs: Iterable[tuple[int, int]], chunk_size: int) -> None:
+        pairs_array = np.asarray(list(pairs), dtype=np.int64).reshape(-1, 2)
+        user_ids, rows = np.unique(pairs_array[:, 0], return_inverse=True)
+
+        order = np.argsort(rows, kind="stable")
+        rows, items = rows[order], pairs_array[order, 1]
+
+        signatures = np.full((len(user_ids), self.num_perm), _EMPTY, dtype=np.uint32)
+
+        # Per chunk supaya matriks hash (pasangan x num_perm) tidak terlalu besar
+        for start in range(0, len(rows), chunk_size):
+            chunk_rows = rows[start:start + chunk_size]
+            hashes = self._hash(items[start:start + chunk_size])
+
+            starts = np.concatenate([[0], np.flatnonzero(np.diff(chunk_rows)) + 1])
+            users = chunk_rows[starts]
+            signatures[users] = np.minimum(signatures[users], np.minimum.reduceat(hashes, starts, axis=0))
+
+        keys = self._band_keys(signatures)
+        user_list = user_ids.tolist()
+        buckets = []
+
+        for band in range(self.bands):
+            band_keys = keys[:, band]
+            # Mayoritas bucket berisi satu user; yang lebih dari satu diganti set
+            bucket: dict[int, int | set[int]] = dict(zip(band_keys.tolist(), user_list))
+
+            unique, counts = np.unique(band_keys, return_counts=True)
+            shared = unique[counts > 1]
+            if len(shared):
+                mask = np.isin(band_keys, shared)
+                order = np.argsort(band_keys[mask], kind="stable")
+                grouped = user_ids[mask][order]
+                boundaries = np.flatnonzero(np.diff(band_keys[mask][order])) + 1
+
+                for key, members in zip(shared.tolist(), np.split(grouped, boundaries)):
+                    bucket[key] = set(members.tolist())
+
+            buckets.append(bucket)
+
+        with self._lock:
+            self._user_index = {user_id: row for row, user_id in enumerate(user_list)}
+            self._user_ids = user_list
+            self._signatures = signatures
+            self._buckets = buckets
+            self.loaded = True
+
+            pending, self._pending = self._pending or [], None
+            for user_id, item_id in pending:
+                self._add(user_id, item_id)
+
+    def add(self, user_id: int, item_id: int) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((user_id, item_id))
+
+            self._add(user_id, item_id)
+
+    def _add(self, user_id: int, item_id: int) -> None:
+        row, created = self._row(user_id)
+        old = self._signatures[row].copy()
+        new = np.minimum(old, self._hash(np.array([item_id]))[0])
+
+        if not created and np.array_equal(old, new):
+            return
+
+        old_keys = self._band_keys(old[np.newaxis])[0].tolist()
+        new_keys = self._band_keys(new[np.newaxis])[0].tolist()
+
+        for band, key in enumerate(new_keys):
+            if created:
+                self._bucket_add(band, key, user_id)
+            elif key != old_keys[band]:
+                self._bucket_remove(band, old_keys[band], user_id)
+                self._bucket_add(band, key, user_id)
+
+        self._signatures[row] = new
+
+    def candidates(self, user_id: int, limit: int | None = None) -> list[int]:
+        """
+        User yang berbagi minimal satu band dengan user_id. Jika lebih dari
+        limit, ambil yang paling banyak band-nya sama (estimasi Jaccard tertinggi).
+        Bucket yang isinya lebih dari limit tidak dipakai.
+        """
+        with self._lock:
+            row = self._user_index.get(user_id)
+            if row is None:
+                return []
+
+            collisions: Counter[int] = Counter()
+            keys = self._band_keys(self._signatures[row][np.newaxis])[0].tolist()
+
+            for band, key in enumerate(keys):
+                members = self._buckets[band].get(key)
+                if isinstance(members, set):
+                    # Bucket raksasa (biasanya dari item yang sangat populer) hampir tidak
+                    # membedakan user, dilewati agar biaya query tetap terbatas
+                    if limit is not None and len(members) > limit:
+                        continue
+                    collisions.update(members)
+                elif members is not None:
+                    collisions[members] += 1
+
+        collisions.pop(user_id, None)
+
+        if limit is None or len(collisions) <= limit:
+            return list(collisions)
+
+        return [other for other, _ in collisions.most_common(limit)]
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._user_ids),
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "loaded": self.loaded,
+            "buckets": sum(len(buckets) for buckets in self._buckets)
+        }
@@ -0,0 +1,247 @@
+import asyncio
+import hashlib
+import io
+import json
+import math
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from google.genai import types
+from PIL import Image
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.genai_client import get_genai_client
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+
+class TransientModelError(Exception):
+    """Error sementara dari backend non-Gemini (dihitung circuit breaker, layak di-retry)."""
+
+
+@dataclass
+class ModelRequest:
+    model: str
+    image: bytes
+    mime_type: str
+    # None jika prompt sudah tersimpan di context cache (cached_content)
+    prompt: str | None
+    schema: type[BaseModel] | None = None
+    cached_content: str | None = None
+
+
+class ModelBackend:
+    """
+    Antarmuka backend inferensi. generate() mengembalikan teks mentah (JSON)
+    yang kemudian divalidasi oleh parser structured output.
+    """
+
+    name = "base"
+
+    async def generate(self, request: ModelRequest) -> str | None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+#---------------------------------------------------------------#
+#------------------------ GEMINI BACKEND -----------------------#
+#---------------------------------------------------------------#
+class GeminiBackend(ModelBackend):
+    name = "gemini"
+
+    def _config(self, request: ModelRequest) -> types.GenerateContentConfig | None:
+        structured = settings.LLM_STRUCTURED_OUTPUT and request.schema is not None
+
+        if not structured and request.cached_content is None:
+            return None
+
+        if not structured:
+            return types.GenerateContentConfig(cached_content=request.cached_content)
+
+        return types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=request.schema,
+            cached_content=request.cached_content
+        )
+
+    async def generate(self, request: ModelRequest) -> str | None:
+        contents = [
+            types.Part.from_bytes(
+                data=request.image,
+                mime_type=request.mime_type,
+            )
+        ]
+        if request.prompt is not None:
+            contents.append(request.prompt)
+
+        response = await get_genai_client().aio.models.generate_content(
+            model=request.model,
+            contents=contents,
+            config=self._config(request)
+        )
+
+        return response.text
+
+#---------------------------------------------------------------#
+#------------------------- FAKE BACKEND ------------------------#
+#---------------------------------------------------------------#
+class FakeBackend(ModelBackend):
+    """
+    Backend lokal untuk load / soak test tanpa jaringan. Jawaban deterministik
+    per gambar (diturunkan dari hash isi gambar), latency mengikuti distribusi
+    lognormal dan error sementara bisa diinjeksi dengan error_rate.
+    """
+
+    name = "fake"
+
+    NAMES = (
+        "plastic bottle", "glass jar", "aluminium can", "cardboard box",
+        "battery", "banana peel", "newspaper", "styrofoam cup"
+    )
+
+    def __init__(
+        self,
+        latency_median: float,
+        latency_sigma: float,
+        error_rate: float,
+        seed: int | None = None
+    ):
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    async def generate(self, request: ModelRequest) -> str | None:
+        if self.latency_median > 0:
+            await asyncio.sleep(
+                self._random.lognormvariate(math.log(self.latency_median), self.latency_sigma)
+            )
+
+        if self._random.random() < self.error_rate:
+            raise TransientModelError("FAKE_MODEL_ERROR")
+
+        digest = int.from_bytes(hashlib.sha256(request.image).digest()[:8], "big")
+        return json.dumps(self._fake_output(request.schema, digest))
+
+    def _fake_output(self, schema: type[BaseModel] | None, digest: int) -> dict:
+        name = self.NAMES[digest % len(self.NAMES)]
+        if schema is None:
+            return {"name": name}
+
+        data = {}
+        for index, (field, info) in enumerate(schema.model_fields.items()):
+            if field == "name":
+                data[field] = name
+            elif info.annotation is bool:
+                data[field] = bool((digest >> index) & 1)
+            elif info.annotation is int:
+                data[field] = 1 + (digest >> 8) % 12
+            elif info.annotation is float:
+                data[field] = round(0.5 + (digest >> 16) % 500 / 1000, 3)
+            elif info.annotation is str:
+                data[field] = f"Fake {field} for {name}"
+
+        return data
+
+#---------------------------------------------------------------#
+#------------------------- ONNX BACKEND ------------------------#
+#---------------------------------------------------------------#
+class OnnxBackend(ModelBackend):
+    """
+    Klasifikasi gambar on-CPU dengan model ONNX (opsional, butuh onnxruntime).
+    labels_path berisi list JSON sejajar dengan output model, setiap elemen
+    berupa nama label atau objek field hasil (misalnya {"name", "category_id", ...}).
+    """
+
+    name = "onnx"
+
+    MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+    STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+    def __init__(self, model_path: str, labels_path: str, input_size: int):
+        if onnxruntime is None:
+            raise RuntimeError("onnxruntime is not installed")
+
+        self.input_size = input_size
+        self._session = onnxruntime.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        self._input_name = self._session.get_inputs()[0].name
+
+        labels = json.loads(Path(labels_path).read_text())
+        self._labels = [label if isinstance(label, dict) else {"name": label} for label in labels]
+
+    def _predict(self, image: bytes) -> tuple[dict, float]:
+        with Image.open(io.BytesIO(image)) as source:
+            source = source.convert("RGB").resize(
+                (self.input_size, self.input_size),
+                Image.Resampling.BILINEAR
+            )
+            pixels = np.asarray(source, dtype=np.float32) / 255.0
+
+        tensor = ((pixels - self.MEAN) / self.STD).transpose(2, 0, 1)[np.newaxis]
+        logits = self._session.run(None, {self._input_name: tensor})[0][0]
+
+        probabilities = np.exp(logits - logits.max())
+        probabilities /= probabilities.sum()
+        index = int(probabilities.argmax())
+
+        return self._labels[index], float(probabilities[index])
+
+    async def generate(self, request: ModelRequest) -> str | None:
+        # onnxruntime melepas GIL selama inferensi, cukup dijalankan di thread
+        label, confidence = await asyncio.to_thread(self._predict, request.image)
+
+        data = {**label, "confidence": confidence}
+        if request.schema is not None:
+            data = {field: data[field] for field in request.schema.model_fields if field in data}
+
+        return json.dumps(data)
+
+#---------------------------------------------------------------#
+#----------------------- BACKEND LIFECYCLE ---------------------#
+#---------------------------------------------------------------#
+_backend: ModelBackend | None = None
+
+def init_model_backend() -> ModelBackend:
+    """Pilih backend sesuai LLM_BACKEND ("gemini", "fake", "onnx"). Dipanggil saat lifespan startup."""
+    global _backend
+
+    if _backend is not None:
+        return _backend
+
+    if settings.LLM_BACKEND == "fake":
+        _backend = FakeBackend(
+            latency_median=settings.FAKE_MODEL_LATENCY_MEDIAN_SECONDS,
+            latency_sigma=settings.FAKE_MODEL_LATENCY_SIGMA,
+            error_rate=settings.FAKE_MODEL_ERROR_RATE,
+            seed=settings.FAKE_MODEL_SEED
+        )
+    elif settings.LLM_BACKEND == "onnx":
+        _backend = OnnxBackend(
+            model_path=settings.ONNX_MODEL_PATH,
+            labels_path=settings.ONNX_LABELS_PATH,
+            input_size=settings.ONNX_INPUT_SIZE
+        )
+    else:
+        _backend = GeminiBackend()
+
+    return _backend
+
+def get_model_backend() -> ModelBackend:
+    if _backend is None:
+        return init_model_backend()
+
+    return _backend
+
+async def close_model_backend():
+    global _backend
+
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
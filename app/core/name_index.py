@@ -0,0 +1,132 @@
+import math
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def _singularize(word: str) -> str:
+    if len(word) <= 3:
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("sses"):
+        return word[:-2]
+    if word.endswith(("ches", "shes", "xes", "zes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalisasi nama item: lowercase, hapus aksen & tanda baca, singular.
+    "Plastic Bottles!" -> "plastic bottle"
+    """
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    words = _NON_ALNUM.sub(" ", name.lower()).split()
+    return " ".join(_singularize(word) for word in words)
+
+
+def trigrams(normalized: str) -> frozenset[str]:
+    padded = f"  {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class NameIndex:
+    """
+    Index nama in-memory: lookup exact atas nama ternormalisasi (O(1)),
+    lalu fallback similarity trigram (Jaccard) dengan prefix filtering
+    supaya hanya posting list trigram paling jarang yang dipindai.
+    """
+
+    def __init__(self):
+        self._exact: dict[str, set[int]] = defaultdict(set)
+        self._postings: dict[str, set[int]] = defaultdict(set)
+        self._entries: dict[int, tuple[str, frozenset[str]]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: int, name: str) -> None:
+        normalized = normalize_name(name)
+        grams = trigrams(normalized)
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (normalized, grams)
+            self._exact[normalized].add(key)
+            for gram in grams:
+                self._postings[gram].add(key)
+
+    def remove(self, key: int) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: int) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        normalized, grams = entry
+        self._discard(self._exact, normalized, key)
+        for gram in grams:
+            self._discard(self._postings, gram, key)
+
+    @staticmethod
+    def _discard(table: dict[str, set[int]], token: str, key: int) -> None:
+        bucket = table.get(token)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del table[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._exact.clear()
+            self._postings.clear()
+            self._entries.clear()
+
+    def lookup(self, name: str, threshold: float) -> tuple[int, float] | None:
+        """
+        Cari key dengan nama paling mirip. Mengembalikan (key, similarity) atau None.
+        """
+        normalized = normalize_name(name)
+
+        with self._lock:
+            exact = self._exact.get(normalized)
+            if exact:
+                return min(exact), 1.0
+
+            grams = trigrams(normalized)
+            if not grams:
+                return None
+
+            # Jaccard >= t butuh overlap >= ceil(t * |q|), jadi kandidat pasti
+            # muncul di salah satu (|q| - overlap + 1) trigram paling jarang
+            min_overlap = max(math.ceil(threshold * len(grams)), 1)
+            ordered = sorted(grams, key=lambda gram: len(self._postings.get(gram, ())))
+            prefix = ordered[:len(grams) - min_overlap + 1]
+
+            candidates: set[int] = set()
+            for gram in prefix:
+                candidates.update(self._postings.get(gram, ()))
+
+            best: tuple[int, float] | None = None
+            for key in candidates:
+                other = self._entries[key][1]
+                overlap = len(grams & other)
+                similarity = overlap / (len(grams) + len(other) - overlap)
+
+                if similarity >= threshold and (
+                    best is None
+                    or similarity > best[1]
+                    or (similarity == best[1] and key < best[0])
+                ):
+                    best = (key, similarity)
+
+        return best
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import Counter
+from typing import Iterable
+
+BUCKET_SECONDS = 3600
+
+
+def hour_bucket(timestamp: float) -> int:
+    """Nomor bucket per jam (epoch / 3600) dari unix timestamp."""
+    return int(timestamp // BUCKET_SECONDS)
+
+
+class PopularityBackend:
+    """
+    Interface counter popularitas sliding-window. Implementasi bersama
+    (misalnya Redis sorted set per jam) cukup meng-override method di bawah.
+    """
+
+    def increment(self, item_id: int, timestamp: float | None = None, amount: int = 1) -> None:
+        raise NotImplementedError
+
+    def merge(self, counts: Iterable[tuple[int, int, int]]) -> None:
+        """Tambahkan hitungan (bucket, item_id, count) hasil agregasi dari database."""
+        raise NotImplementedError
+
+    def top(self, k: int) -> list[tuple[int, int]]:
+        """k item terpopuler di dalam window: [(item_id, count), ...]."""
+        raise NotImplementedError
+
+    def remove(self, item_id: int) -> list[tuple[int, int, int]]:
+        """Hapus item dari counter, mengembalikan hitungan (bucket, item_id, count) yang dihapus."""
+        raise NotImplementedError
+
+
+class SlidingWindowCounter(PopularityBackend):
+    """
+    Counter view per item dengan bucket per jam di memori. Total per item
+    selama window disimpan terpisah, dan daftar top-K dijaga tetap urut:
+    di antara dua pergantian jam hitungan hanya bertambah, jadi cukup
+    menggeser satu item di daftar (O(K)). Saat bucket lama keluar dari
+    window, top-K dihitung ulang dari total.
+    """
+
+    def __init__(self, window_hours: int = 168, capacity: int = 50):
+        self.window_hours = window_hours
+        self.capacity = capacity
+
+        self._buckets: dict[int, Counter[int]] = {}
+        self._totals: Counter[int] = Counter()
+        self._top: list[tuple[int, int]] = []
+        self._current_bucket = hour_bucket(time.time())
+        self._lock = threading.Lock()
+
+    def _oldest_bucket(self) -> int:
+        return self._current_bucket - self.window_hours + 1
+
+    def _advance(self, now: float) -> None:
+        bucket = hour_bucket(now)
+        if bucket <= self._current_bucket:
+            return
+
+        self._current_bucket = bucket
+        oldest = self._oldest_bucket()
+
+        expired = [key for key in self._buckets if key < oldest]
+        for key in expired:
+            self._totals.subtract(self._buckets.pop(key))
+
+        if expired:
+            self._totals = +self._totals
+            self._rebuild_top()
+
+    def _rebuild_top(self) -> None:
+        self._top = self._totals.most_common(self.capacity)
+
+    def _promote(self, item_id: int) -> None:
+        count = self._totals[item_id]
+        top = [entry for entry in self._top if entry[0] != item_id]
+
+        # Daftar penuh dan item ini tidak melewati posisi terakhir
+        if len(top) >= self.capacity and count <= top[-1][1]:
+            return
+
+        position = len(top)
+        while position > 0 and top[position - 1][1] < count:
+            position -= 1
+
+        top.insert(position, (item_id, count))
+        self._top = top[:self.capacity]
+
+    def increment(self, item_id: int, timestamp: float | None = None, amount: int = 1) -> None:
+        now = time.time()
+        timestamp = now if timestamp is None else timestamp
+
+        with self._lock:
+            self._advance(now)
+
+            bucket = hour_bucket(timestamp)
+            if bucket < self._oldest_bucket() or bucket > self._current_bucket:
+                return
+
+            self._buckets.setdefault(bucket, Counter())[item_id] += amount
+            self._totals[item_id] += amount
+            self._promote(item_id)
+
+    def merge(self, counts: Iterable[tuple[int, int, int]]) -> None:
+        with self._lock:
+            self._advance(time.time())
+            oldest = self._oldest_bucket()
+
+            for bucket, item_id, count in counts:
+                if bucket < oldest or bucket > self._current_bucket:
+                    continue
+
+                self._buckets.setdefault(bucket, Counter())[item_id] += count
+                self._totals[item_id] += count
+
+            self._rebuild_top()
+
+    def top(self, k: int) -> list[tuple[int, int]]:
+        with self._lock:
+            self._advance(time.time())
+            return self._top[:k]
+
+    def remove(self, item_id: int) -> list[tuple[int, int, int]]:
+        removed = []
+
+        with self._lock:
+            for bucket, counts in self._buckets.items():
+                count = counts.pop(item_id, None)
+                if count:
+                    removed.append((bucket, item_id, count))
+
+            if self._totals.pop(item_id, None) is not None:
+                self._rebuild_top()
+
+        return removed
+
+    def stats(self) -> dict:
+        return {
+            "window_hours": self.window_hours,
+            "buckets": len(self._buckets),
+            "items": len(self._totals)
+        }
@@ -0,0 +1,101 @@
+import io
+
+import numpy as np
+from PIL import Image, ImageOps
+
+THUMBNAIL_SIZE = 16
+
+
+def extract_features(image: bytes | str) -> np.ndarray | None:
+    """
+    Fitur ringan untuk pre-filter: histogram warna RGB (4x4x4), histogram hue
+    dan thumbnail grayscale 16x16. Setiap blok dinormalisasi L2.
+    Mengembalikan None jika gambar tidak bisa di-decode.
+    """
+    source = io.BytesIO(image) if isinstance(image, bytes) else image
+
+    try:
+        with Image.open(source) as image:
+            image.draft("RGB", (THUMBNAIL_SIZE * 8, THUMBNAIL_SIZE * 8))
+            image = ImageOps.exif_transpose(image).convert("RGB")
+            small = image.resize((THUMBNAIL_SIZE * 4, THUMBNAIL_SIZE * 4), Image.Resampling.BILINEAR)
+
+            rgb = np.asarray(small, dtype=np.uint8).reshape(-1, 3)
+            hue = np.asarray(small.convert("HSV"), dtype=np.uint8)[..., 0].ravel()
+            gray = np.asarray(
+                small.convert("L").resize((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.Resampling.BILINEAR),
+                dtype=np.float32
+            ).ravel()
+    except Exception:
+        return None
+
+    bins = (rgb // 64).astype(np.int32)
+    color_hist = np.bincount(bins[:, 0] * 16 + bins[:, 1] * 4 + bins[:, 2], minlength=64).astype(np.float32)
+    hue_hist = np.bincount(hue // 16, minlength=16).astype(np.float32)
+    gray = gray - gray.mean()
+
+    blocks = [color_hist, hue_hist, gray]
+    return np.concatenate([block / (np.linalg.norm(block) + 1e-6) for block in blocks]).astype(np.float32)
+
+
+class SoftmaxClassifier:
+    """
+    Regresi logistik multinomial (linear + softmax) yang dilatih dengan
+    full-batch gradient descent. Cukup kecil untuk dilatih ulang di background.
+    """
+
+    def __init__(self, l2: float = 1e-3, learning_rate: float = 0.5, iterations: int = 200):
+        self.l2 = l2
+        self.learning_rate = learning_rate
+        self.iterations = iterations
+
+        self.classes: np.ndarray | None = None
+        self.weights: np.ndarray | None = None
+        self.bias: np.ndarray | None = None
+        self.mean: np.ndarray | None = None
+        self.std: np.ndarray | None = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self.weights is not None
+
+    def fit(self, features: np.ndarray, labels: np.ndarray) -> "SoftmaxClassifier":
+        classes, targets = np.unique(labels, return_inverse=True)
+
+        mean = features.mean(axis=0)
+        std = features.std(axis=0) + 1e-6
+        x = (features - mean) / std
+
+        samples, dims = x.shape
+        onehot = np.eye(len(classes), dtype=np.float32)[targets]
+
+        weights = np.zeros((dims, len(classes)), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+
+        for _ in range(self.iterations):
+            probabilities = self._softmax(x @ weights + bias)
+            gradient = probabilities - onehot
+
+            weights -= self.learning_rate * (x.T @ gradient / samples + self.l2 * weights)
+            bias -= self.learning_rate * gradient.mean(axis=0)
+
+        self.classes, self.weights, self.bias = classes, weights, bias
+        self.mean, self.std = mean, std
+
+        return self
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        x = (np.atleast_2d(features) - self.mean) / self.std
+        return self._softmax(x @ self.weights + self.bias)
+
+    def predict(self, features: np.ndarray) -> tuple[int, float]:
+        """Kelas dengan probabilitas tertinggi untuk satu sampel: (label, confidence)."""
+        probabilities = self.predict_proba(features)[0]
+        index = int(probabilities.argmax())
+        return int(self.classes[index]), float(probabilities[index])
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        logits = logits - logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
@@ -0,0 +1,205 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+#---------------------------------------------------------------#
+#--------------------- DEADLINE PROPAGATION --------------------#
+#---------------------------------------------------------------#
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+@contextmanager
+def request_deadline(seconds: float):
+    """
+    Tetapkan batas waktu absolut untuk request saat ini. Deadline yang sudah
+    ada (lebih ketat) tetap dipakai. Ikut terbawa ke task turunan lewat contextvars.
+    """
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining_time() -> float | None:
+    """Sisa waktu (detik) sampai deadline request, None jika tidak ada deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+
+    return deadline - time.monotonic()
+
+#---------------------------------------------------------------#
+#----------------------- CIRCUIT BREAKER -----------------------#
+#---------------------------------------------------------------#
+class CircuitBreaker:
+    """
+    Circuit breaker berbasis error rate pada N panggilan terakhir.
+    closed -> open jika error rate >= failure_rate (minimal min_calls panggilan),
+    open -> half_open setelah open_seconds, half_open mengizinkan satu probe:
+    sukses menutup breaker, gagal membukanya lagi.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float,
+        min_calls: int,
+        window: int,
+        open_seconds: float
+    ):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._state = "closed"
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.open_seconds:
+                return "half_open"
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == "closed":
+                return True
+
+            if self._state == "open":
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    self.rejected += 1
+                    return False
+
+                self._state = "half_open"
+                self._probe_in_flight = False
+
+            if self._probe_in_flight:
+                self.rejected += 1
+                return False
+
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state == "half_open":
+                self._state = "closed"
+                self._outcomes.clear()
+                self._probe_in_flight = False
+                return
+
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state == "half_open":
+                self._trip()
+                return
+
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._trip()
+
+    def release(self) -> None:
+        """Panggilan selesai tanpa hasil (misalnya dibatalkan); probe boleh dicoba lagi."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._state != "open":
+                return 0.0
+            return max(self.open_seconds - (time.monotonic() - self._opened_at), 0.0)
+
+    def _trip(self) -> None:
+        self._state = "open"
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._probe_in_flight = False
+        self.opened += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            outcomes = list(self._outcomes)
+
+        return {
+            "state": self.state,
+            "window_calls": len(outcomes),
+            "window_failures": outcomes.count(False),
+            "opened": self.opened,
+            "rejected": self.rejected
+        }
+
+#---------------------------------------------------------------#
+#----------------------- HEDGED REQUESTS -----------------------#
+#---------------------------------------------------------------#
+class Hedger:
+    """
+    Kirim request kedua jika request pertama belum selesai setelah hedge_after
+    detik (biasanya p95 latency), lalu pakai hasil yang sukses lebih dulu.
+    """
+
+    def __init__(self):
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    async def run(self, call: Callable[[], Awaitable[T]], hedge_after: float | None) -> T:
+        if hedge_after is None:
+            return await call()
+
+        primary = asyncio.ensure_future(call())
+        tasks = {primary}
+
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if done:
+                return primary.result()
+
+            self.hedged += 1
+            hedge = asyncio.ensure_future(call())
+            tasks.add(hedge)
+
+            pending = set(tasks)
+            error: BaseException | None = None
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+
+                    error = task.exception()
+
+            raise error
+
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins
+        }
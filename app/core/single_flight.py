@@ -0,0 +1,65 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Request coalescing: pemanggil bersamaan dengan key yang sama menunggu satu
+    eksekusi yang sedang berjalan (leader) dan menerima hasil / error yang sama.
+    Jika leader dibatalkan (misalnya client disconnect), follower yang masih
+    menunggu akan mencoba lagi dan salah satunya menjadi leader baru.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """
+        Jalankan func() sekali untuk key yang sama.
+        Mengembalikan (result, shared); shared=True berarti hasil milik leader lain.
+        """
+        while (future := self._calls.get(key)) is not None:
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    continue
+                raise
+            except Exception:
+                self.coalesced += 1
+                raise
+
+            self.coalesced += 1
+            return result, True
+
+        future = asyncio.get_running_loop().create_future()
+        # Hindari warning "exception was never retrieved" jika tidak ada follower
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[key] = future
+        self.leaders += 1
+
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def stats(self) -> dict:
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls)
+        }
@@ -0,0 +1,86 @@
+import re
+from typing import TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_DANGLING_KEY = re.compile(r'([{,])\s*"(?:[^"\\]|\\.)*"\s*:?\s*$')
+
+
+def repair_json(text: str) -> str | None:
+    """
+    Perbaiki kerusakan umum pada output JSON model: markdown fence, teks
+    sebelum / sesudah objek, trailing comma, dan respons yang terpotong
+    (string atau kurung yang belum ditutup).
+    Mengembalikan None jika tidak ada objek JSON sama sekali.
+    """
+    text = _FENCE.sub("", text.strip())
+    start = text.find("{")
+    if start == -1:
+        return None
+    text = text[start:]
+
+    stack: list[str] = []
+    in_string = False
+    escaped = False
+
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+            if not stack:
+                # Objek lengkap, buang teks tambahan di belakangnya
+                return _TRAILING_COMMA.sub(r"\1", text[:index + 1])
+
+    # Respons terpotong: tutup string dan kurung yang masih terbuka
+    if in_string:
+        if escaped:
+            text = text[:-1]
+        text += '"'
+
+    # Key tanpa value dibuang agar field memakai nilai default
+    if stack and stack[-1] == "}":
+        text = _DANGLING_KEY.sub(lambda match: "{" if match.group(1) == "{" else "", text)
+
+    text = text.rstrip().rstrip(",")
+
+    return _TRAILING_COMMA.sub(r"\1", text + "".join(reversed(stack)))
+
+
+def parse_model_output(text: str | None, model: type[ModelT]) -> tuple[ModelT, bool]:
+    """
+    Validasi output model langsung dari string JSON dalam satu langkah
+    (pydantic-core), dengan satu percobaan repair jika gagal.
+    Mengembalikan (result, repaired). Raise ValueError("MODEL_PARSE_ERROR")
+    jika tetap tidak valid.
+    """
+    text = text or ""
+
+    try:
+        return model.model_validate_json(text), False
+    except ValidationError:
+        pass
+
+    repaired = repair_json(text)
+    if repaired is not None:
+        try:
+            return model.model_validate_json(repaired), True
+        except ValidationError:
+            pass
+
+    raise ValueError("MODEL_PARSE_ERROR")
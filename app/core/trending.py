@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Hashable, Iterable
+
+# Skor disimpan relatif terhadap landmark; dinormalisasi ulang setelah sekian half-life
+# supaya faktor 2^(umur / half_life) tidak overflow
+_RENORMALIZE_HALF_LIVES = 64
+# Skor di bawah ini (setelah normalisasi) dianggap nol dan itemnya dibuang dari memori
+_MIN_SCORE = 1e-6
+
+
+class TrendingLeaderboard:
+    """
+    Skor trending per item berupa jumlah view yang meluruh eksponensial
+    (half-life tertentu), plus top-K per grup (misalnya kategori) dan top-K global.
+
+    Meluruhkan semua skor setiap waktu terlalu mahal, jadi dipakai landmark:
+    view pada waktu t disimpan dengan bobot 2^((t - landmark) / half_life).
+    Urutan antar item sama dengan urutan skor yang sudah diluruhkan, dan
+    skor tersimpan hanya bertambah, sehingga update per view O(1) untuk skor
+    dan O(K) untuk menggeser item di daftar top-K grupnya.
+    """
+
+    def __init__(self, half_life_seconds: float = 86400, capacity: int = 50):
+        self.half_life_seconds = half_life_seconds
+        self.capacity = capacity
+
+        self._landmark = time.time()
+        self._scores: dict[int, float] = {}
+        self._groups: dict[int, Hashable] = {}
+        self._members: dict[Hashable, set[int]] = defaultdict(set)
+        # Key None berisi top-K global
+        self._top: dict[Hashable, list[tuple[int, float]]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def _weight(self, timestamp: float) -> float:
+        return 2 ** ((timestamp - self._landmark) / self.half_life_seconds)
+
+    def _renormalize(self, now: float) -> None:
+        if now - self._landmark < _RENORMALIZE_HALF_LIVES * self.half_life_seconds:
+            return
+
+        factor = 2 ** ((self._landmark - now) / self.half_life_seconds)
+        self._landmark = now
+
+        for item_id in list(self._scores):
+            score = self._scores[item_id] * factor
+            if score < _MIN_SCORE:
+                self._discard(item_id)
+            else:
+                self._scores[item_id] = score
+
+        self._rebuild_top(None)
+        for group in list(self._top):
+            self._rebuild_top(group)
+
+    def _rebuild_top(self, group: Hashable) -> None:
+        members = self._scores if group is None else self._members.get(group, ())
+        ranked = sorted(((item_id, self._scores[item_id]) for item_id in members), key=lambda x: x[1], reverse=True)
+
+        if ranked:
+            self._top[group] = ranked[:self.capacity]
+        else:
+            self._top.pop(group, None)
+
+    def _promote(self, group: Hashable, item_id: int) -> None:
+        score = self._scores[item_id]
+        top = [entry for entry in self._top.get(group, ()) if entry[0] != item_id]
+
+        if len(top) >= self.capacity and score <= top[-1][1]:
+            return
+
+        position = len(top)
+        while position > 0 and top[position - 1][1] < score:
+            position -= 1
+
+        top.insert(position, (item_id, score))
+        self._top[group] = top[:self.capacity]
+
+    def _discard(self, item_id: int) -> Hashable:
+        self._scores.pop(item_id, None)
+        group = self._groups.pop(item_id, None)
+
+        if group is not None:
+            members = self._members.get(group)
+            if members is not None:
+                members.discard(item_id)
+                if not members:
+                    del self._members[group]
+
+        return group
+
+    def _set_group(self, item_id: int, group: Hashable) -> None:
+        previous = self._groups.get(item_id)
+        if previous == group:
+            return
+
+        self._groups[item_id] = group
+        self._members[group].add(item_id)
+
+        if previous is not None:
+            self._members[previous].discard(item_id)
+            if not self._members[previous]:
+                del self._members[previous]
+            self._rebuild_top(previous)
+
+    def increment(
+        self,
+        item_id: int,
+        group: Hashable = None,
+        timestamp: float | None = None,
+        amount: float = 1
+    ) -> None:
+        now = time.time()
+        timestamp = now if timestamp is None else timestamp
+
+        with self._lock:
+            self._renormalize(now)
+
+            self._scores[item_id] = self._scores.get(item_id, 0.0) + amount * self._weight(timestamp)
+            self._promote(None, item_id)
+
+            if group is not None:
+                self._set_group(item_id, group)
+                self._promote(group, item_id)
+
+    def merge(self, events: Iterable[tuple[int, Hashable, float, float]]) -> None:
+        """Tambahkan view lama (item_id, group, timestamp, count) hasil agregasi dari database."""
+        with self._lock:
+            self._renormalize(time.time())
+
+            for item_id, group, timestamp, count in events:
+                self._scores[item_id] = self._scores.get(item_id, 0.0) + count * self._weight(timestamp)
+                if group is not None:
+                    self._set_group(item_id, group)
+
+            self._rebuild_top(None)
+            for group in list(self._members):
+                self._rebuild_top(group)
+
+    def set_group(self, item_id: int, group: Hashable) -> None:
+        """Pindahkan item ke grup lain (misalnya kategori item diubah), skornya tetap."""
+        with self._lock:
+            if item_id not in self._scores:
+                return
+
+            self._set_group(item_id, group)
+            self._rebuild_top(group)
+
+    def remove(self, item_id: int) -> None:
+        with self._lock:
+            if item_id not in self._scores:
+                return
+
+            group = self._discard(item_id)
+            self._rebuild_top(None)
+            if group is not None:
+                self._rebuild_top(group)
+
+    def top(self, k: int, group: Hashable = None) -> list[tuple[int, float]]:
+        """k item dengan skor tertinggi (global atau dalam group): [(item_id, skor saat ini), ...]."""
+        with self._lock:
+            decay = 2 ** ((self._landmark - time.time()) / self.half_life_seconds)
+
+            return [(item_id, score * decay) for item_id, score in self._top.get(group, ())[:k]]
+
+    def stats(self) -> dict:
+        return {
+            "half_life_hours": round(self.half_life_seconds / 3600, 2),
+            "items": len(self._scores),
+            "groups": len(self._members),
+            "landmark_age_hours": round((time.time() - self._landmark) / 3600, 2)
+        }
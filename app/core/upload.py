@@ -0,0 +1,70 @@
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import uuid4
+
+from fastapi import UploadFile
+
+CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class StoredUpload:
+    path: str
+    sha256: str
+    size: int
+    mime_type: str
+    filename: str | None
+
+    def read_bytes(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def discard(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def save_upload(
+    upload_file: UploadFile,
+    directory: Path,
+    max_bytes: int,
+) -> StoredUpload:
+    """
+    Salin upload ke storage per chunk sambil menghitung SHA-256 dan ukuran
+    dalam satu kali baca, tanpa pernah memuat seluruh file ke memori.
+    Raise ValueError("FILE_TOO_LARGE") begitu ukuran melewati max_bytes.
+    """
+    if upload_file.size is not None and upload_file.size > max_bytes:
+        raise ValueError("FILE_TOO_LARGE")
+
+    directory.mkdir(parents=True, exist_ok=True)
+    filepath = directory / f"{uuid4().hex}_{upload_file.filename}"
+
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        upload_file.file.seek(0)
+        with open(filepath, "wb") as f:
+            while chunk := upload_file.file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError("FILE_TOO_LARGE")
+
+                digest.update(chunk)
+                f.write(chunk)
+
+    except Exception:
+        if filepath.exists():
+            filepath.unlink()
+        raise
+
+    return StoredUpload(
+        path=str(filepath),
+        sha256=digest.hexdigest(),
+        size=size,
+        mime_type=upload_file.content_type or "image/jpeg",
+        filename=upload_file.filename
+    )
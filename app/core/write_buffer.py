@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+
+class WriteBehindBuffer:
+    """
+    Buffer tulis in-process: baris ditampung di memori lalu ditulis sekaligus
+    (bulk insert) oleh satu thread background saat jumlahnya mencapai max_size
+    atau sudah flush_seconds sejak flush terakhir, dan sekali lagi saat stop().
+
+    Batas kehilangan data: jika proses mati mendadak (kill -9, crash), baris yang
+    belum di-flush hilang, yaitu paling banyak sekitar max_size baris atau
+    flush_seconds detik terakhir. Jika flush gagal (database down), baris tetap
+    di buffer dan dicoba lagi pada flush berikutnya; memori dibatasi max_pending,
+    kelebihannya membuang baris paling lama dan dicatat di stats "dropped".
+    """
+
+    def __init__(
+        self,
+        flush_fn: Callable[[list[Any]], None],
+        max_size: int = 500,
+        flush_seconds: float = 1.0,
+        max_pending: int = 100_000
+    ):
+        self.flush_fn = flush_fn
+        self.max_size = max_size
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+
+        self._pending: deque[Any] = deque()
+        self._lock = threading.Lock()
+        # Hanya satu flush yang berjalan, supaya urutan tulis tetap terjaga
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self.stats = {
+            "appended": 0,
+            "flushed": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "dropped": 0
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def append(self, row: Any) -> None:
+        with self._lock:
+            self._pending.append(row)
+            self.stats["appended"] += 1
+
+            while len(self._pending) > self.max_pending:
+                self._pending.popleft()
+                self.stats["dropped"] += 1
+
+            full = len(self._pending) >= self.max_size
+
+        if full:
+            self._wakeup.set()
+
+    def discard(self, predicate: Callable[[Any], bool]) -> int:
+        """Buang baris yang belum di-flush dan cocok dengan predicate (misalnya item yang dihapus)."""
+        with self._lock:
+            kept = deque(row for row in self._pending if not predicate(row))
+            removed = len(self._pending) - len(kept)
+            self._pending = kept
+
+        return removed
+
+    def flush(self) -> int:
+        """Tulis semua baris yang tertunda. Mengembalikan jumlah baris yang ditulis."""
+        with self._flush_lock:
+            written = 0
+
+            while True:
+                with self._lock:
+                    batch = [self._pending.popleft() for _ in range(min(self.max_size, len(self._pending)))]
+
+                if not batch:
+                    return written
+
+                try:
+                    self.flush_fn(batch)
+
+                except Exception:
+                    # Kembalikan ke depan antrian agar dicoba lagi di flush berikutnya
+                    with self._lock:
+                        self._pending.extendleft(reversed(batch))
+                        while len(self._pending) > self.max_pending:
+                            self._pending.popleft()
+                            self.stats["dropped"] += 1
+
+                        self.stats["failed_flushes"] += 1
+                    raise
+
+                written += len(batch)
+                self.stats["flushed"] += len(batch)
+                self.stats["flushes"] += 1
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_seconds)
+            self._wakeup.clear()
+
+            try:
+                self.flush()
+
+            except Exception as e:
+                print(f"Error flushing write buffer: {str(e)}")
+                # Jangan mencoba terus-menerus saat database bermasalah
+                time.sleep(self.flush_seconds)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="write-behind-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Hentikan thread background lalu flush sisa buffer (graceful shutdown)."""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+
+        self.flush()
+
+    def metrics(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "max_size": self.max_size,
+            "flush_seconds": self.flush_seconds,
+            "running": self.running,
+            **self.stats
+        }
@@ -1,4 +1,8 @@
+import threading
+from contextlib import contextmanager
+
 from app.core.config import settings
+from sqlalchemy import text
 from sqlmodel import SQLModel, Session, create_engine
 
 DATABASE_URL = settings.DATABASE_URL
@@ -18,4 +22,42 @@ def get_session():
         yield session
                 
 def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
\ No newline at end of file
+    SQLModel.metadata.create_all(engine)
+
+_local_locks: dict[int, threading.Lock] = {}
+
+@contextmanager
+def advisory_lock(key: int, wait: bool = False):
+    """
+    Lock antar worker / proses lewat PostgreSQL advisory lock (level session,
+    pada koneksi tersendiri yang dipegang sampai blok selesai). Yield False jika
+    wait=False dan lock sedang dipegang pihak lain. Selain PostgreSQL (SQLite
+    untuk development, satu proses) cukup memakai lock antar thread.
+    """
+    if engine.dialect.name != "postgresql":
+        lock = _local_locks.setdefault(key, threading.Lock())
+        acquired = lock.acquire(blocking=wait)
+
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+        return
+
+    with engine.connect() as connection:
+        if wait:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": key})
+            acquired = True
+        else:
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+
+        # Lock level session tetap dipegang setelah commit; koneksi tidak dibiarkan idle in transaction
+        connection.commit()
+
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                connection.commit()
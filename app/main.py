@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import FastAPI, Depends, Request, HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
@@ -10,13 +12,98 @@ from app.routers import history_router, llm_router
 from app.routers.authentication_router import router as auth_router
 from app.routers.category_router import router as category_router
 from app.routers.llm_router import router as llm_router
-from app.databases.session import create_db_and_tables
+from app.databases.session import create_db_and_tables, engine
 from app.routers.item_router import router as item_router
 from app.routers.user_router import router as user_router
 from app.routers.history_router import router as history_router
+from app.core.genai_client import init_genai_client, close_genai_client
+from app.core.model_backend import init_model_backend, close_model_backend
+from app.services.image_hash_service import backfill_image_hashes, build_image_hash_index
+from app.services.item_name_service import build_item_name_index
+from app.services.history_service import (
+    bootstrap_popularity,
+    build_interaction_matrix,
+    build_user_lsh,
+    run_item_similarity_job,
+    start_history_buffer,
+    stop_history_buffer
+)
+from app.services.image_preprocess_service import init_preprocess_pool, shutdown_preprocess_pool
+from app.services.llm_job_service import start_llm_job_queue, stop_llm_job_queue
+from app.services.prefilter_service import bootstrap_prefilter
+from app.services.prompt_service import build_process_prompt
+from app.services.rollup_service import run_item_daily_views_job
+from app.services.history_partition_service import run_history_partition_job
 # from app.databases.session import create_db_and_tables
 
-app = FastAPI()
+def _bootstrap_prefilter():
+    with Session(engine) as session:
+        bootstrap_prefilter(session)
+
+def _backfill_image_hashes():
+    with Session(engine) as session:
+        backfill_image_hashes(session)
+
+def _build_user_lsh():
+    with Session(engine) as session:
+        build_user_lsh(session)
+
+def _bootstrap_popularity():
+    with Session(engine) as session:
+        bootstrap_popularity(session)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_genai_client()
+    init_model_backend()
+    init_preprocess_pool()
+    
+    with Session(engine) as session:
+        build_image_hash_index(session)
+        build_item_name_index(session)
+        build_process_prompt(session)
+        build_interaction_matrix(session)
+    
+    start_llm_job_queue()
+    start_history_buffer()
+    
+    # Training awal pre-filter membaca semua gambar item, jadi jalan di background
+    prefilter_task = asyncio.create_task(
+        asyncio.to_thread(_bootstrap_prefilter)
+    )
+    # Item lama tanpa image_hash di-hash dari file gambarnya
+    image_hash_task = asyncio.create_task(
+        asyncio.to_thread(_backfill_image_hashes)
+    )
+    user_lsh_task = asyncio.create_task(
+        asyncio.to_thread(_build_user_lsh)
+    )
+    popularity_task = asyncio.create_task(
+        asyncio.to_thread(_bootstrap_popularity)
+    )
+    item_similarity_task = asyncio.create_task(run_item_similarity_job())
+    daily_views_task = asyncio.create_task(run_item_daily_views_job())
+    history_partition_task = asyncio.create_task(run_history_partition_job())
+    
+    yield
+    
+    prefilter_task.cancel()
+    image_hash_task.cancel()
+    item_similarity_task.cancel()
+    user_lsh_task.cancel()
+    popularity_task.cancel()
+    daily_views_task.cancel()
+    history_partition_task.cancel()
+    
+    # Flush histori yang masih di buffer sebelum proses berhenti
+    await asyncio.to_thread(stop_history_buffer)
+    
+    await stop_llm_job_queue()
+    await close_model_backend()
+    await close_genai_client()
+    shutdown_preprocess_pool()
+
+app = FastAPI(lifespan=lifespan)
 
 # Tidak dipakai lagi karena sudah menggunakan Alembic
 # @app.on_event("startup")
@@ -37,7 +124,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         content={
             "status": "failed",
             "message": exc.detail
-        }
+        },
+        headers=exc.headers
     )
     
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -4,4 +4,5 @@ from app.models.refresh_token_model import RefreshToken
 from app.models.token_blockedlist import TokenBlockedList
 from app.models.item_model import Item
 from app.models.history_model import History
+from app.models.item_daily_view_model import ItemDailyView
 # from app.models.llm_model import LLMModel
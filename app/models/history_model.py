@@ -6,6 +6,8 @@ if TYPE_CHECKING:
     from app.models.user_model import User
     from app.models.item_model import Item
     
+# Di PostgreSQL tabel ini dipartisi per bulan berdasarkan viewed_at (migration b5c7d9e1f3a2),
+# dengan primary key (id, viewed_at); partisinya dikelola history_partition_service
 class History(SQLModel, table=True):
     __tablename__ = "histories"
     
@@ -14,7 +16,7 @@ class History(SQLModel, table=True):
     user_id: int | None = Field(foreign_key="users.id", index=True)
     item_id: int | None = Field(foreign_key="items.id", index=True)
     
-    viewed_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    viewed_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
 
     user: "User" = Relationship(back_populates="history")
     item: "Item" = Relationship(back_populates="history")
\ No newline at end of file
@@ -0,0 +1,13 @@
+from sqlmodel import Field, SQLModel
+from datetime import date
+
+
+class ItemDailyView(SQLModel, table=True):
+    __tablename__ = "item_daily_views"
+    
+    # Rollup harian dari histories (UTC), diisi oleh job di rollup_service
+    item_id: int = Field(foreign_key="items.id", primary_key=True, ondelete="CASCADE")
+    day: date = Field(primary_key=True, index=True)
+    
+    view_count: int = 0
+    unique_users: int = 0
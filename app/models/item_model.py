@@ -1,4 +1,4 @@
-from sqlmodel import Field, SQLModel, Relationship
+from sqlmodel import Field, SQLModel, Relationship, BigInteger
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, List
 
@@ -19,6 +19,9 @@ class Item(SQLModel, table=True):
     is_recyclable: bool
     is_hazardous: bool
     
+    # dHash 64-bit (signed) dari gambar item, untuk pencarian near-duplicate
+    image_hash: int | None = Field(default=None, sa_type=BigInteger, index=True)
+    
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime | None = None
     
@@ -1,4 +1,3 @@
-from uuid import uuid4
 from sqlmodel import Session
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
@@ -7,6 +6,8 @@ from pathlib import Path
 from app.services.category_service import read_category, show_category, create_category, update_category, delete_cetegory
 from app.databases.session import get_session
 from app.schemas.category_schema import ReadCategory, CreateCategory
+from app.core.config import settings
+from app.core.upload import save_upload
 
 BASE_STORAGE = Path("storage/image/categories")
 BASE_STORAGE.mkdir(parents=True, exist_ok=True)
@@ -42,25 +43,22 @@ def create_category_endpoint(
         if image.content_type not in ["image/png", "image/jpg"]:
             raise HTTPException(400, "Invalid image type")
         
-        filename = f"{uuid4().hex}_{image.filename}"
-        filepath = BASE_STORAGE / filename
-        
-        # print(filepath)
-        
-        with open(filepath, "wb")  as f:
-            f.write(image.file.read())
+        upload = save_upload(image, BASE_STORAGE, settings.UPLOAD_MAX_BYTES)
         
         category = create_category(
             session=session,
             data=CreateCategory(
                 name=name,
-                image_link=str(filepath)
+                image_link=upload.path
             )
         )
 
         return category
             
     except Exception as e:
+        if str(e) == "FILE_TOO_LARGE":
+            raise HTTPException(413, f"Image is larger than {settings.UPLOAD_MAX_BYTES} bytes")
+        
         raise HTTPException(
             status_code=400,
             detail=str(e)
@@ -89,13 +87,9 @@ def update_category_endpoint(
                 if old_file.exists():
                     old_file.unlink()
             
-            filename = f"{uuid4().hex}_{image.filename}"
-            filepath = BASE_STORAGE / filename
-            
-            with open(filepath, "wb") as f:
-                f.write(image.file.read())
+            upload = save_upload(image, BASE_STORAGE, settings.UPLOAD_MAX_BYTES)
 
-            image_path = str(filepath)
+            image_path = upload.path
             
         updated = update_category(
             session=session,
@@ -109,6 +103,9 @@ def update_category_endpoint(
         
         return updated
     except Exception as e:
+        if str(e) == "FILE_TOO_LARGE":
+            raise HTTPException(413, f"Image is larger than {settings.UPLOAD_MAX_BYTES} bytes")
+        
         raise HTTPException(400, str(e))
     
 @router.delete("/{id}")
@@ -1,24 +1,28 @@
 import traceback
 
-from typing import List, Annotated
+from typing import List, Annotated, Optional
 from sqlmodel import Session
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.models.user_model import User
-from app.schemas.history_schema import PopularItem, ResponsePopularItem, ResponseRecommendations
+from app.schemas.history_schema import PopularItem, ResponsePopularItem, ResponseRecommendations, ResponseTrendingItem, TrendingItem
 from app.databases.session import get_session
-from app.services.history_service import get_popular_items, get_recommendations
+from app.services.history_service import get_popular_items, get_recommendations, get_trending_items
 from app.services.authentication_service import get_current_active_user
 
 router = APIRouter(prefix="/history", tags=["history"])
 
 @router.get("/popular", response_model=ResponsePopularItem)
 def popular_items(
+    category: Optional[int] = Query(
+        default=None,
+        description="Popular items in category_id"
+    ),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
     try:
-        items = get_popular_items(session)
+        items = get_popular_items(session, category_id=category)
 
         clean_items = [PopularItem.model_validate(item) for item in items]
 
@@ -34,6 +38,38 @@ def popular_items(
         traceback.print_exc()
         raise HTTPException(500, f"Error fetching popular items: {str(e)}")
 
+@router.get("/trending", response_model=ResponseTrendingItem)
+def trending_items(
+    category: Optional[int] = Query(
+        default=None,
+        description="Trending items in category_id"
+    ),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    try:
+        items = get_trending_items(session, category_id=category)
+
+        clean_items = [
+            TrendingItem(
+                **PopularItem.model_validate(item).model_dump(),
+                score=round(score, 4)
+            )
+            for item, score in items
+        ]
+
+        response = {
+            "status": "success",
+            "message": "Trending items fetched successfully",
+            "data": clean_items
+        }
+
+        return response
+
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(500, f"Error fetching trending items: {str(e)}")
+
 @router.get("/recommendation/{id}")
 def get_recommendation_endpoint(
     id: int,
@@ -1,4 +1,3 @@
-from uuid import uuid4
 from sqlmodel import Session
 from typing import List, Optional, Annotated
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
@@ -7,6 +6,9 @@ import math
 
 from app.services.item_service import read_item, create_item, show_item, update_item, delete_item
 from app.services.history_service import create_history
+from app.services.image_hash_service import compute_image_hash
+from app.core.config import settings
+from app.core.upload import save_upload
 from app.services.authentication_service import get_current_active_user
 from app.models.user_model import User
 from app.schemas.item_schema import ItemListResponse, ReadItem, CreateItem, UpdateItem, SingleItemResponse
@@ -34,11 +36,7 @@ def create_item_endpoint(
         if image.content_type not in ["image/png", "image/jpg", "image/jpeg"]:
             raise HTTPException(400, "Invalid image type")
         
-        filename = f"{uuid4().hex}_{image.filename}"
-        filepath = BASE_STORAGE / filename
-        
-        with open(filepath, "wb") as f:
-            f.write(image.file.read())
+        upload = save_upload(image, BASE_STORAGE, settings.UPLOAD_MAX_BYTES)
             
         item = create_item(
             session=session,
@@ -46,11 +44,12 @@ def create_item_endpoint(
                 name=name,
                 description=description,
                 recycle=recycle,
-                image_link=str(filepath),
+                image_link=upload.path,
                 is_reusable=is_reusable,
                 is_recyclable=is_recyclable,
                 is_hazardous=is_hazardous,
-                category_name=category_name
+                category_name=category_name,
+                image_hash=compute_image_hash(upload.path)
             )
         )
         
@@ -61,6 +60,9 @@ def create_item_endpoint(
         }
     except Exception as e:
         print(str(e))
+        if str(e) == "FILE_TOO_LARGE":
+            raise HTTPException(413, f"Image is larger than {settings.UPLOAD_MAX_BYTES} bytes")
+        
         raise HTTPException(
             status_code=400,
             detail=str(e)
@@ -74,14 +76,15 @@ def read_item_endpoint(
 ):
     item = read_item(session=session, id=id)
     
+    if item is None:
+        raise HTTPException(404, f"Item {id} doesn't exists")
+    
     history = CreateHistory(
         user_id=current_user.id,
-        item_id=id
+        item_id=id,
+        category_id=item.category_id
     )
     
-    if item is None:
-        raise HTTPException(404, f"Item {id} doesn't exists")
-    
     create_history(session=session, data=history)
     
     return {
@@ -166,13 +169,10 @@ def update_item_endpoint(
                 if old_file.exists():
                     old_file.unlink()
                     
-            filename = f"{uuid4().hex}_{image.filename}"
-            filepath = BASE_STORAGE / filename
-            
-            with open(filepath, "wb") as f:
-                f.write(image.file.read())
+            upload = save_upload(image, BASE_STORAGE, settings.UPLOAD_MAX_BYTES)
                 
-            image_path = str(filepath)
+            image_path = upload.path
+            image_hash = compute_image_hash(upload.path)
         
         data_dict = UpdateItem(
             name=name,
@@ -186,6 +186,7 @@ def update_item_endpoint(
         
         if image_path:
             data_dict.image_link = image_path
+            data_dict.image_hash = image_hash
         
         updated = update_item(
             session=session,
@@ -203,6 +204,9 @@ def update_item_endpoint(
         }
         
     except Exception as e:
+        if str(e) == "FILE_TOO_LARGE":
+            raise HTTPException(413, f"Image is larger than {settings.UPLOAD_MAX_BYTES} bytes")
+        
         raise HTTPException(400, str(e))
     
 @router.delete("/{id}")
@@ -1,15 +1,24 @@
+import asyncio
+import json
+
 from fastapi import APIRouter, File, UploadFile, Depends, HTTPException, Form
+from fastapi.responses import StreamingResponse
 from typing import Annotated, List
 from sqlmodel import Session, select
 
 from dotenv import load_dotenv
 
-from app.databases.session import get_session
-from app.schemas.llm_schema import SingleLLMResponse
+from app.databases.session import get_session, engine
+from app.schemas.llm_schema import SingleLLMResponse, SingleJobResponse
 from app.services.authentication_service import get_current_active_user
-from app.services.llm_service import process_llm_request, llm_check_request
+from app.services.llm_service import process_llm_request, llm_check_request, llm_scan_request, process_llm_batch, get_llm_metrics, model_retry_after
+from app.services.llm_job_service import submit_llm_job, get_llm_job, serialize_job, get_job_metrics
 from app.models.user_model import User
+from app.core.callback_url import validate_callback_url
 from app.core.config import settings
+from app.core.resilience import request_deadline
+from app.core.upload import StoredUpload, save_upload
+from app.routers.item_router import BASE_STORAGE
 
 
 router = APIRouter(prefix="/llm", tags=["LLM"])
@@ -22,10 +31,11 @@ async def llm_process_request(
     current_user: User = Depends(get_current_active_user)
 ):
     try:
-        process_result = await process_llm_request(
-            upload_file=file,
-            session=session,
-        )
+        with request_deadline(settings.LLM_REQUEST_DEADLINE_SECONDS):
+            process_result = await process_llm_request(
+                upload_file=file,
+                session=session,
+            )
         
         return {
             "status": "success",
@@ -40,12 +50,145 @@ async def llm_process_request(
                 detail="Database error occurred while processing the request"
             )
         
+        elif str(e) == "MODEL_TIMEOUT":
+            raise HTTPException(
+                status_code=504,
+                detail="Model took too long to respond"
+            )
+        
+        elif str(e) == "MODEL_PARSE_ERROR":
+            raise HTTPException(
+                status_code=502,
+                detail="Model returned an invalid response"
+            )
+        
+        elif str(e) == "MODEL_UNAVAILABLE":
+            raise HTTPException(
+                status_code=503,
+                detail="Model is temporarily unavailable, please retry later",
+                headers={"Retry-After": str(model_retry_after())}
+            )
+        
+        elif str(e) == "FILE_TOO_LARGE":
+            raise HTTPException(
+                status_code=413,
+                detail=f"Image is larger than {settings.UPLOAD_MAX_BYTES} bytes"
+            )
+        
         else:
             raise HTTPException(
                 status_code=422,
                 detail=f"Validation Error: {str(e)}"
             )
 
+async def _stream_batch_results(uploads: list[StoredUpload]):
+    # Session sendiri karena response streaming berjalan setelah dependency selesai
+    with Session(engine) as session:
+        async for line in process_llm_batch(uploads=uploads, session=session):
+            yield json.dumps(line) + "\n"
+
+@router.post("/process/batch")
+async def llm_process_batch_request(
+    files: Annotated[List[UploadFile], File(...)],
+    current_user: User = Depends(get_current_active_user)
+):
+    if len(files) > settings.LLM_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.LLM_BATCH_MAX_FILES} images per batch"
+        )
+    
+    uploads = []
+    try:
+        for file in files:
+            uploads.append(
+                await asyncio.to_thread(save_upload, file, BASE_STORAGE, settings.UPLOAD_MAX_BYTES)
+            )
+    except ValueError as e:
+        for upload in uploads:
+            upload.discard()
+        
+        if str(e) == "FILE_TOO_LARGE":
+            raise HTTPException(
+                status_code=413,
+                detail=f"Image is larger than {settings.UPLOAD_MAX_BYTES} bytes"
+            )
+        raise HTTPException(422, f"Validation Error: {str(e)}")
+    
+    return StreamingResponse(
+        _stream_batch_results(uploads),
+        media_type="application/x-ndjson"
+    )
+
+@router.post("/jobs", response_model=SingleJobResponse, status_code=202)
+async def llm_submit_job(
+    file: Annotated[UploadFile, File(...)],
+    callback_url: str | None = Form(None),
+    current_user: User = Depends(get_current_active_user)
+):
+    if callback_url:
+        try:
+            await asyncio.to_thread(validate_callback_url, callback_url)
+        except ValueError:
+            raise HTTPException(
+                status_code=422,
+                detail="callback_url must be an http(s) URL of a public host"
+            )
+    
+    upload = None
+    try:
+        upload = await asyncio.to_thread(save_upload, file, BASE_STORAGE, settings.UPLOAD_MAX_BYTES)
+        
+        job = submit_llm_job(
+            upload=upload,
+            owner_id=current_user.id,
+            callback_url=callback_url
+        )
+        
+        return {
+            "status": "success",
+            "message": "LLM job queued successfully",
+            "data": serialize_job(job)
+        }
+        
+    except Exception as e:
+        if upload:
+            upload.discard()
+        
+        if str(e) == "FILE_TOO_LARGE":
+            raise HTTPException(
+                status_code=413,
+                detail=f"Image is larger than {settings.UPLOAD_MAX_BYTES} bytes"
+            )
+        
+        if str(e) == "QUEUE_FULL":
+            raise HTTPException(
+                status_code=429,
+                detail="LLM job queue is full, please retry later",
+                headers={"Retry-After": "5"}
+            )
+        
+        raise HTTPException(
+            status_code=422,
+            detail=f"Validation Error: {str(e)}"
+        )
+
+@router.get("/jobs/{job_id}", response_model=SingleJobResponse)
+async def llm_read_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    job = get_llm_job(job_id=job_id, owner_id=current_user.id)
+    
+    if job is None:
+        raise HTTPException(404, f"Job {job_id} doesn't exists")
+    
+    return {
+        "status": "success",
+        "message": "LLM job fetched successfully",
+        "data": serialize_job(job)
+    }
+
 @router.post("/check", response_model=SingleLLMResponse)
 async def llm_check(
     file: Annotated[UploadFile, File(...)],
@@ -53,10 +196,11 @@ async def llm_check(
     current_user: User = Depends(get_current_active_user)
 ):
     try:
-        check_result = await llm_check_request(
-            upload_file=file,
-            session=session,
-        )
+        with request_deadline(settings.LLM_REQUEST_DEADLINE_SECONDS):
+            check_result = await llm_check_request(
+                upload_file=file,
+                session=session,
+            )
         
         return {
             "status": "success",
@@ -65,7 +209,102 @@ async def llm_check(
         }
 
     except Exception as e:
+        if str(e) == "MODEL_TIMEOUT":
+            raise HTTPException(
+                status_code=504,
+                detail="Model took too long to respond"
+            )
+        
+        if str(e) == "MODEL_PARSE_ERROR":
+            raise HTTPException(
+                status_code=502,
+                detail="Model returned an invalid response"
+            )
+        
+        if str(e) == "MODEL_UNAVAILABLE":
+            raise HTTPException(
+                status_code=503,
+                detail="Model is temporarily unavailable, please retry later",
+                headers={"Retry-After": str(model_retry_after())}
+            )
+        
+        if str(e) == "FILE_TOO_LARGE":
+            raise HTTPException(
+                status_code=413,
+                detail=f"Image is larger than {settings.UPLOAD_MAX_BYTES} bytes"
+            )
+        
         raise HTTPException(
             status_code=422,
             detail=f"Validation Error: {str(e)}"
         )
+
+@router.post("/scan", response_model=SingleLLMResponse)
+async def llm_scan(
+    file: Annotated[UploadFile, File(...)],
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    try:
+        with request_deadline(settings.LLM_REQUEST_DEADLINE_SECONDS):
+            scan_result = await llm_scan_request(
+                upload_file=file,
+                session=session,
+            )
+        
+        return {
+            "status": "success",
+            "message": "LLM scan processed successfully",
+            "data": scan_result
+        }
+
+    except Exception as e:
+        if str(e) == "ERROR DATABASE":
+            raise HTTPException(
+                status_code=500,
+                detail="Database error occurred while processing the request"
+            )
+        
+        elif str(e) == "MODEL_TIMEOUT":
+            raise HTTPException(
+                status_code=504,
+                detail="Model took too long to respond"
+            )
+        
+        elif str(e) == "MODEL_PARSE_ERROR":
+            raise HTTPException(
+                status_code=502,
+                detail="Model returned an invalid response"
+            )
+        
+        elif str(e) == "MODEL_UNAVAILABLE":
+            raise HTTPException(
+                status_code=503,
+                detail="Model is temporarily unavailable, please retry later",
+                headers={"Retry-After": str(model_retry_after())}
+            )
+        
+        elif str(e) == "FILE_TOO_LARGE":
+            raise HTTPException(
+                status_code=413,
+                detail=f"Image is larger than {settings.UPLOAD_MAX_BYTES} bytes"
+            )
+        
+        else:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Validation Error: {str(e)}"
+            )
+
+@router.get("/metrics")
+async def llm_metrics(
+    current_user: User = Depends(get_current_active_user)
+):
+    return {
+        "status": "success",
+        "message": "LLM metrics fetched successfully",
+        "data": {
+            **get_llm_metrics(),
+            "jobs": get_job_metrics()
+        }
+    }
@@ -7,6 +7,7 @@ from app.schemas.category_schema import CategoryName
 class CreateHistory(BaseModel):
     user_id: int
     item_id: int
+    category_id: int | None = None
 
 class Recommendations(BaseModel):
     item_id: int
@@ -28,3 +29,9 @@ class PopularItem(BaseModel):
 
 class ResponsePopularItem(BaseResponse):
     data: List[PopularItem]
+
+class TrendingItem(PopularItem):
+    score: float
+
+class ResponseTrendingItem(BaseResponse):
+    data: List[TrendingItem]
@@ -17,6 +17,8 @@ class CreateItem(BaseModel):
     is_hazardous: bool
     
     category_name: str
+    
+    image_hash: int | None = None
 
 class ReadItem(BaseModel):
     id: int
@@ -61,4 +63,6 @@ class UpdateItem(BaseModel):
     
     category_name: str | None
     
+    image_hash: int | None = None
+    
     updated_at: datetime = datetime.now(timezone.utc)
\ No newline at end of file
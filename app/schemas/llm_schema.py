@@ -7,5 +7,31 @@ class LLMRequest(BaseModel):
     id: int
     image_filename: str
 
+class LLMProcessResult(BaseModel):
+    """Skema output model untuk /llm/process (dipakai juga sebagai response_schema Gemini)."""
+    name: str
+    description: str = "Unknown description"
+    recycle: str = "Unknown recycle"
+    is_reusable: bool = False
+    is_recyclable: bool = False
+    is_hazardous: bool = False
+    category_id: int = 12
+
+class LLMCheckResult(BaseModel):
+    name: str = "Unknown item"
+    confidence: float = 0.0
+
 class SingleLLMResponse(BaseResponse):
-    data: dict
\ No newline at end of file
+    data: dict
+    
+class LLMJob(BaseModel):
+    job_id: str
+    status: str
+    attempts: int
+    result: dict | None
+    error: str | None
+    created_at: str
+    updated_at: str
+    
+class SingleJobResponse(BaseResponse):
+    data: LLMJob
\ No newline at end of file
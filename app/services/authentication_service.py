@@ -47,7 +47,7 @@ def create_access_token(
     }
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
-async def get_current_user(
+def get_current_user(
     token: Annotated[str, Depends(oauth2_schema)], 
     session: Session = Depends(get_session)
 ):
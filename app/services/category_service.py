@@ -4,6 +4,8 @@ from datetime import datetime, timezone
 
 from app.models.category_model import Category
 from app.schemas.category_schema import CreateCategory
+from app.services.prompt_service import build_process_prompt
+from app.services.history_service import invalidate_recommendations
 
 def read_category(session: Session, id: int) -> Category | None:
     category = session.exec(
@@ -39,6 +41,8 @@ def create_category(session: Session, data: CreateCategory) -> Category:
     session.commit()
     session.refresh(category)
     
+    build_process_prompt(session)
+    
     return category
 
 def update_category(
@@ -66,6 +70,11 @@ def update_category(
     session.commit()
     session.refresh(category)
 
+    # Mapping kategori di prompt LLM dan nama kategori di rekomendasi ikut berubah
+    if name is not None:
+        build_process_prompt(session)
+        invalidate_recommendations()
+
     return category
 
 def delete_cetegory(
@@ -82,4 +91,6 @@ def delete_cetegory(
     session.delete(category)
     session.commit()
     
+    build_process_prompt(session)
+    
     return category
\ No newline at end of file
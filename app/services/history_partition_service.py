@@ -0,0 +1,198 @@
+import asyncio
+import re
+from datetime import date, datetime, timezone
+
+from sqlalchemy import delete, text
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.databases.session import advisory_lock, engine
+from app.models.history_model import History
+from app.services.rollup_service import ITEM_DAILY_VIEWS_LOCK_KEY, refresh_item_daily_views
+
+# Partisi bulanan dibuat oleh migration b5c7d9e1f3a2 dan ensure_history_partitions
+_PARTITION_NAME = re.compile(r"^histories_y(\d{4})m(\d{2})$")
+
+# Kunci pg advisory lock untuk job partisi / retention
+HISTORY_MAINTENANCE_LOCK_KEY = 7_240_002
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def _current_month() -> date:
+    return datetime.now(timezone.utc).date().replace(day=1)
+
+def _partition_name(month: date) -> str:
+    return f"histories_y{month.year}m{month.month:02d}"
+
+def histories_partitioned(session: Session) -> bool:
+    if session.get_bind().dialect.name != "postgresql":
+        return False
+
+    relkind = session.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass('histories')")
+    ).scalar()
+
+    return relkind == "p"
+
+def _partition_months(session: Session) -> list[date]:
+    names = session.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = 'histories'
+    """)).scalars().all()
+
+    months = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+
+    return sorted(months)
+
+def _create_partition(session: Session, month: date):
+    name = _partition_name(month)
+    start, end = month.isoformat(), _add_months(month, 1).isoformat()
+    bounds = {"start": start, "end": end}
+
+    in_default = session.execute(
+        text("SELECT EXISTS (SELECT 1 FROM histories_default WHERE viewed_at >= :start AND viewed_at < :end)"),
+        bounds
+    ).scalar()
+
+    if not in_default:
+        session.execute(text(
+            f"CREATE TABLE {name} PARTITION OF histories FOR VALUES FROM ('{start}') TO ('{end}')"
+        ))
+        return
+
+    # Partisi tidak bisa dibuat selama partisi default berisi baris di rentangnya:
+    # lepas default, buat partisi, pindahkan barisnya, lalu pasang default lagi
+    session.execute(text("ALTER TABLE histories DETACH PARTITION histories_default"))
+    session.execute(text(
+        f"CREATE TABLE {name} PARTITION OF histories FOR VALUES FROM ('{start}') TO ('{end}')"
+    ))
+    session.execute(text(f"""
+        INSERT INTO histories (id, user_id, item_id, viewed_at)
+        SELECT id, user_id, item_id, viewed_at FROM histories_default
+        WHERE viewed_at >= :start AND viewed_at < :end
+    """), bounds)
+    session.execute(
+        text("DELETE FROM histories_default WHERE viewed_at >= :start AND viewed_at < :end"),
+        bounds
+    )
+    session.execute(text("ALTER TABLE histories ATTACH PARTITION histories_default DEFAULT"))
+
+def ensure_history_partitions(session: Session, months_ahead: int) -> list[str]:
+    """
+    Buat partisi histories untuk bulan ini sampai months_ahead bulan ke depan
+    yang belum ada. Mengembalikan nama partisi yang dibuat.
+    Tidak melakukan apa pun jika histories bukan tabel partisi (selain PostgreSQL).
+    """
+    if not histories_partitioned(session):
+        return []
+
+    existing = set(_partition_months(session))
+    current = _current_month()
+    created = []
+
+    for offset in range(months_ahead + 1):
+        month = _add_months(current, offset)
+        if month in existing:
+            continue
+
+        _create_partition(session, month)
+        created.append(_partition_name(month))
+
+    session.commit()
+
+    return created
+
+def _archive_partition(session: Session, month: date, mode: str) -> str:
+    name = _partition_name(month)
+    session.execute(text(f"ALTER TABLE histories DETACH PARTITION {name}"))
+
+    if mode == "drop":
+        session.execute(text(f"DROP TABLE {name}"))
+        return name
+
+    # Arsip tidak boleh menghalangi penghapusan item / user, jadi foreign key-nya dilepas
+    constraints = session.execute(
+        text("SELECT conname FROM pg_constraint WHERE conrelid = CAST(:name AS regclass) AND contype = 'f'"),
+        {"name": name}
+    ).scalars().all()
+    for constraint in constraints:
+        session.execute(text(f'ALTER TABLE {name} DROP CONSTRAINT "{constraint}"'))
+
+    archive = f"histories_archive_y{month.year}m{month.month:02d}"
+    session.execute(text(f"ALTER TABLE {name} RENAME TO {archive}"))
+
+    return archive
+
+def apply_history_retention(session: Session, retention_months: int, mode: str) -> dict:
+    """
+    Buang histori yang lebih tua dari retention_months bulan penuh. Rollup
+    item_daily_views di-refresh dulu, jadi hitungan harian tetap tersimpan.
+    Pada tabel partisi, partisi lama di-detach menjadi tabel arsip
+    histories_archive_* (mode "detach") atau di-drop (mode "drop").
+    Tanpa partisi, baris lama hanya di-DELETE pada mode "drop".
+    """
+    result = {"partitions": [], "deleted_rows": 0}
+    if retention_months <= 0:
+        return result
+
+    cutoff = _add_months(_current_month(), -retention_months)
+
+    # Refresh oleh job rollup di worker lain ditunggu selesai, tidak dijalankan bersamaan
+    with advisory_lock(ITEM_DAILY_VIEWS_LOCK_KEY, wait=True):
+        refresh_item_daily_views(session)
+
+    if histories_partitioned(session):
+        for month in _partition_months(session):
+            if month < cutoff:
+                result["partitions"].append(_archive_partition(session, month, mode))
+
+    elif mode == "drop":
+        deleted = session.exec(
+            delete(History).where(
+                History.viewed_at < datetime.combine(cutoff, datetime.min.time(), tzinfo=timezone.utc)
+            )
+        )
+        result["deleted_rows"] = deleted.rowcount
+
+    session.commit()
+
+    return result
+
+def _maintain_history_partitions():
+    # Job berjalan di setiap worker; DDL partisi cukup dijalankan satu worker pada satu waktu
+    with advisory_lock(HISTORY_MAINTENANCE_LOCK_KEY) as acquired:
+        if not acquired:
+            return
+
+        with Session(engine) as session:
+            created = ensure_history_partitions(session, settings.HISTORY_PARTITION_MONTHS_AHEAD)
+            removed = apply_history_retention(
+                session,
+                retention_months=settings.HISTORY_RETENTION_MONTHS,
+                mode=settings.HISTORY_RETENTION_MODE
+            )
+
+    if created:
+        print(f"History partitions created: {created}")
+
+    if removed["partitions"] or removed["deleted_rows"]:
+        print(f"History retention applied: {removed}")
+
+async def run_history_partition_job():
+    while True:
+        try:
+            await asyncio.to_thread(_maintain_history_partitions)
+
+        except Exception as e:
+            print(f"Error maintaining history partitions: {str(e)}")
+
+        await asyncio.sleep(settings.HISTORY_MAINTENANCE_SECONDS)
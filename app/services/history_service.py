@@ -1,87 +1,284 @@
 from sqlmodel import Session, func, select, desc
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 from typing import Optional, List
 from datetime import datetime, timezone, timedelta
-from collections import defaultdict
+from collections import Counter, defaultdict
+import asyncio
 import math
+import threading
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.interaction_matrix import InteractionMatrix
+from app.core.item_similarity import ItemSimilarityIndex, build_item_similarity
+from app.core.minhash_lsh import MinHashLSH
+from app.core.popularity import BUCKET_SECONDS, PopularityBackend, SlidingWindowCounter, hour_bucket
+from app.core.trending import TrendingLeaderboard
+from app.core.write_buffer import WriteBehindBuffer
+from app.databases.session import engine
 from app.models.history_model import History
 from app.models.item_model import Item
+from app.models.user_model import User
 from app.schemas.history_schema import CreateHistory, Recommendations
+from app.services.rollup_service import get_daily_view_counts, get_last_rollup_day, get_popular_item_ids
 
-def create_history(session: Session, data: CreateHistory):   
-    history = History(
-        user_id=data.user_id,
-        item_id=data.item_id
-    ) 
-    
-    session.add(history)
-    session.commit()
-    
-def collaborative_filtering(session: Session, user_id: int, top_k: int = 6):    
-    histories = session.exec(
-        select(History)
+# Matriks user x item di memori, dibangun saat startup dan di-update oleh create_history
+interaction_matrix = InteractionMatrix(
+    compact_threshold=settings.RECOMMENDATION_COMPACT_THRESHOLD
+)
+
+# Hasil rekomendasi per user; dihapus saat user menambah item baru ke historinya
+recommendation_cache = TTLCache(
+    max_entries=settings.RECOMMENDATION_CACHE_MAX_ENTRIES,
+    ttl=settings.RECOMMENDATION_CACHE_TTL_SECONDS
+)
+
+def invalidate_recommendations(user_id: int | None = None):
+    """Hapus cache rekomendasi satu user, atau semua user jika user_id None (misalnya item berubah)."""
+    if user_id is None:
+        recommendation_cache.clear()
+        return
+
+    recommendation_cache.delete(str(user_id))
+
+# MinHash LSH atas himpunan item per user, hanya diisi jika mode "lsh" aktif
+user_lsh = MinHashLSH(
+    num_perm=settings.RECOMMENDATION_LSH_PERMUTATIONS,
+    bands=settings.RECOMMENDATION_LSH_BANDS
+)
+
+def _lsh_enabled() -> bool:
+    return settings.RECOMMENDATION_USER_SIMILARITY == "lsh"
+
+def build_interaction_matrix(session: Session):
+    rows = session.exec(
+        select(History.user_id, History.item_id)
     ).all()
-    
-    user_items = defaultdict(set)
-    for h in histories:
-        user_items[h.user_id].add(h.item_id)
+
+    interaction_matrix.load(
+        (user_id, item_id) for user_id, item_id in rows
+        if user_id is not None and item_id is not None
+    )
+
+def build_user_lsh(session: Session):
+    """
+    Bangun signature MinHash semua user. Lebih lambat dari matriks interaksi,
+    jadi dijalankan di background; sampai selesai similarity dihitung exact.
+    """
+    if not _lsh_enabled():
+        return
+
+    # Interaksi baru selama histories dibaca ditampung user_lsh dan diputar ulang
+    # setelah swap; histori yang masih di buffer ditulis dulu supaya ikut terbaca
+    user_lsh.begin_load()
+    try:
+        if history_buffer.running:
+            history_buffer.flush()
+
+        rows = session.exec(
+            select(History.user_id, History.item_id)
+        ).all()
+
+    except Exception:
+        # Tanpa ini add() terus menampung ke _pending yang tidak pernah diputar ulang
+        user_lsh.abort_load()
+        raise
+
+    user_lsh.load(
+        (user_id, item_id) for user_id, item_id in rows
+        if user_id is not None and item_id is not None
+    )
+
+#---------------------------------------------------------------#
+#--------------------- ITEM SIMILARITY INDEX -------------------#
+#---------------------------------------------------------------#
+# Snapshot index item-item; diganti utuh (atomic swap) oleh job di background
+_item_similarity: ItemSimilarityIndex | None = None
+
+def rebuild_item_similarity() -> ItemSimilarityIndex | None:
+    """
+    Bangun ulang index item-item dari matriks interaksi. Hanya baris item
+    yang terpengaruh histori baru sejak snapshot sebelumnya yang dihitung ulang.
+    Mengembalikan None jika tidak ada histori baru.
+    """
+    global _item_similarity
+
+    snapshot = interaction_matrix.snapshot()
+    previous = _item_similarity
+
+    if previous is not None and previous.generation == snapshot.generation and not snapshot.dirty_cols:
+        return None
+
+    try:
+        _item_similarity = build_item_similarity(
+            snapshot,
+            top_k=settings.RECOMMENDATION_NEIGHBOURS,
+            previous=previous
+        )
+
+    except Exception:
+        # Kolom dirty dikembalikan agar dihitung ulang pada percobaan berikutnya
+        interaction_matrix.restore_dirty(snapshot)
+        raise
+
+    return _item_similarity
+
+async def run_item_similarity_job():
+    while True:
+        try:
+            index = await asyncio.to_thread(rebuild_item_similarity)
+            if index is not None:
+                print(f"Item similarity index rebuilt: {index.stats()}")
+
+        except Exception as e:
+            print(f"Error rebuilding item similarity index: {str(e)}")
+
+        await asyncio.sleep(settings.RECOMMENDATION_INDEX_REBUILD_SECONDS)
+
+#---------------------------------------------------------------#
+#---------------------------- HISTORY --------------------------#
+#---------------------------------------------------------------#
+def _insert_histories(session: Session, rows: list[dict]):
+    session.exec(insert(History), params=rows)
+    session.commit()
+
+def _flush_histories(rows: list[dict]):
+    """
+    Tulis satu batch histori dengan satu multi-row INSERT. Jika batch ditolak
+    foreign key (item / user dihapus sebelum flush), baris tersebut dibuang
+    dan sisanya ditulis ulang, supaya satu baris tidak memblokir seluruh buffer.
+    """
+    with Session(engine) as session:
+        try:
+            _insert_histories(session, rows)
+            return
+
+        except IntegrityError:
+            session.rollback()
+
+        item_ids = set(session.exec(
+            select(Item.id).where(Item.id.in_({row["item_id"] for row in rows}))
+        ).all())
+        user_ids = set(session.exec(
+            select(User.id).where(User.id.in_({row["user_id"] for row in rows}))
+        ).all())
+
+        valid = [row for row in rows if row["item_id"] in item_ids and row["user_id"] in user_ids]
+        if valid:
+            _insert_histories(session, valid)
+
+        if len(valid) < len(rows):
+            print(f"Dropped {len(rows) - len(valid)} buffered histories for deleted items / users")
+
+# View item ditampung di memori dan ditulis per batch di background (write-behind).
+# Histori yang belum di-flush hilang jika proses mati mendadak, lihat WriteBehindBuffer
+history_buffer = WriteBehindBuffer(
+    flush_fn=_flush_histories,
+    max_size=settings.HISTORY_BUFFER_MAX_SIZE,
+    flush_seconds=settings.HISTORY_BUFFER_FLUSH_SECONDS,
+    max_pending=settings.HISTORY_BUFFER_MAX_PENDING
+)
+
+def start_history_buffer():
+    if settings.HISTORY_BUFFER_ENABLED:
+        history_buffer.start()
+
+def stop_history_buffer():
+    history_buffer.stop()
+
+def discard_pending_histories(item_id: int):
+    """Buang histori item yang belum di-flush, dipanggil sebelum item dihapus."""
+    history_buffer.discard(lambda row: row["item_id"] == item_id)
+
+def create_history(session: Session, data: CreateHistory):   
+    # Tanpa buffer (atau sebelum lifespan berjalan) histori langsung di-commit
+    if history_buffer.running:
+        history_buffer.append({
+            "user_id": data.user_id,
+            "item_id": data.item_id,
+            "viewed_at": datetime.now(timezone.utc)
+        })
+    else:
+        history = History(
+            user_id=data.user_id,
+            item_id=data.item_id
+        ) 
         
-    if user_id not in user_items:
-        return []
+        session.add(history)
+        session.commit()
     
-    target_items = user_items[user_id]
+    record_item_view(data.item_id, data.category_id)
     
-    similarity_scores = {}
-    for other_users, items in user_items.items():
-        if other_users == user_id:
-            continue
-        
-        intersections = len(target_items & items)
-        norm = math.sqrt(len(target_items)) * math.sqrt(len(items))
-        
-        if norm == 0:
-            continue
-        
-        similarity_scores[other_users] = intersections / norm
-        
-    similar_users = sorted(
-        similarity_scores.items(),
-        key=lambda x: x[1],
-        reverse=True
-    )[:top_k]
+    is_new_item = interaction_matrix.add(data.user_id, data.item_id)
+    if _lsh_enabled():
+        user_lsh.add(data.user_id, data.item_id)
     
-    recommended = set()
-    for other_user, _ in similar_users:
-        recommended.update(user_items[other_user])
-        
-    return list(recommended - target_items)
+    # Melihat ulang item yang sama tidak mengubah himpunan item user
+    if is_new_item:
+        invalidate_recommendations(data.user_id)
+    
+def collaborative_filtering(session: Session, user_id: int, top_k: int = 6):    
+    """
+    Item dari top_k user paling mirip (cosine similarity) yang belum dilihat user_id.
+    Dihitung dari matriks sparse di memori, tanpa membaca tabel histories.
+    Pada mode "lsh" hanya kandidat dari MinHash LSH yang dihitung similarity-nya.
+    """
+    candidates = None
+    if _lsh_enabled() and user_lsh.loaded:
+        candidates = user_lsh.candidates(user_id, limit=settings.RECOMMENDATION_LSH_MAX_CANDIDATES)
+
+    return interaction_matrix.recommend(user_id=user_id, top_k_users=top_k, candidates=candidates)
+
+def item_based_filtering(session: Session, user_id: int) -> List[int] | None:
+    """
+    Rekomendasi dari tetangga item-item untuk item yang terakhir dilihat user.
+    None jika index belum selesai dibangun. Item terakhir dibaca dari database,
+    jadi view yang masih di history_buffer baru ikut setelah flush berikutnya.
+    """
+    index = _item_similarity
+    if index is None:
+        return None
+
+    recent_items = session.exec(
+        select(History.item_id)
+        .where(History.user_id == user_id)
+        .group_by(History.item_id)
+        .order_by(desc(func.max(History.id)))
+        .limit(settings.RECOMMENDATION_RECENT_ITEMS)
+    ).all()
+
+    return index.recommend(
+        recent_item_ids=list(recent_items),
+        exclude=interaction_matrix.user_items(user_id),
+        limit=settings.RECOMMENDATION_LIMIT
+    )
     
 def get_recommendations(session: Session, user_id: int) -> List | None:
     MIN_USERS = 3
     MIN_INTERACTIONS = 20
     
-    total_users = session.exec(
-        select(func.count(func.distinct(History.user_id)))
-    ).one()
-    
-    total_interactions = session.exec(
-        select(func.count()).select_from(History)
-    ).one()
-    
-    user_history = session.exec(
-        select(History).where(History.user_id == user_id)
-    ).all()
-    
-    if total_users < MIN_USERS or total_interactions < MIN_INTERACTIONS:
+    if interaction_matrix.user_count < MIN_USERS or interaction_matrix.events < MIN_INTERACTIONS:
         return []
     
-    if not user_history:
+    if not interaction_matrix.has_user(user_id):
         return []
     
-    similarities = collaborative_filtering(session=session, user_id=user_id)
+    cached = recommendation_cache.get(str(user_id))
+    if cached is not None:
+        return cached
+    
+    similarities = item_based_filtering(session=session, user_id=user_id)
+    
+    # Index belum siap atau item user belum masuk snapshot, pakai user-user
+    if not similarities:
+        similarities = collaborative_filtering(session=session, user_id=user_id)
 
     items = session.exec(
-        select(Item).where(Item.id.in_(similarities))
+        select(Item)
+        .where(Item.id.in_(similarities))
+        .options(selectinload(Item.category))
     ).all()
     
     item_map = {item.id: item for item in items}
@@ -89,29 +286,225 @@ def get_recommendations(session: Session, user_id: int) -> List | None:
     recommendations = [
         Recommendations(
             item_id=item_id,
-            item_name=item_map[item_id].name
+            item_name=item_map[item_id].name,
+            item_category=item_map[item_id].category.name,
+            item_image_link=item_map[item_id].image_link
         )
         for item_id in similarities
         if item_id in item_map
     ]
+    
+    recommendation_cache.set(str(user_id), recommendations)
         
     return recommendations
 
-def get_popular_items(session: Session):
-    
-    seven_days_history = datetime.now(timezone.utc) - timedelta(days=7)
-
-    statement = (
-        select(Item, func.count(History.id).label("popularity_count"))
-        .join(History, Item.id == History.item_id)
-        .where(History.viewed_at >= seven_days_history)
-        .group_by(Item.id)
-        .order_by(desc("popularity_count"))
-        .limit(10)
+#---------------------------------------------------------------#
+#-------------------------- POPULARITY -------------------------#
+#---------------------------------------------------------------#
+# View per item per jam selama window, di-update oleh create_history
+popularity_counter: PopularityBackend = SlidingWindowCounter(
+    window_hours=settings.POPULAR_ITEMS_WINDOW_HOURS,
+    capacity=settings.POPULAR_ITEMS_LIMIT * 5
+)
+# Counter yang sama per kategori (Item.category_id), selalu in-memory per proses
+category_popularity: dict[int, SlidingWindowCounter] = {}
+_item_categories: dict[int, int] = {}
+_category_lock = threading.Lock()
+
+# Skor trending: jumlah view yang meluruh eksponensial, dengan top-K global dan per kategori
+trending_leaderboard = TrendingLeaderboard(
+    half_life_seconds=settings.TRENDING_HALF_LIFE_HOURS * 3600,
+    capacity=settings.TRENDING_LIMIT * 5
+)
+
+_popularity_started_at = datetime.now(timezone.utc)
+_popularity_ready = False
+_category_popularity_ready = False
+
+def set_popularity_backend(backend: PopularityBackend):
+    """
+    Ganti counter dengan backend bersama (misalnya Redis) untuk multi-worker.
+    Backend bersama sudah berisi hitungan semua worker, jadi tidak di-bootstrap ulang.
+    """
+    global popularity_counter, _popularity_ready
+
+    popularity_counter = backend
+    _popularity_ready = True
+
+def _category_counter(category_id: int) -> SlidingWindowCounter:
+    counter = category_popularity.get(category_id)
+    if counter is not None:
+        return counter
+
+    with _category_lock:
+        return category_popularity.setdefault(category_id, SlidingWindowCounter(
+            window_hours=settings.POPULAR_ITEMS_WINDOW_HOURS,
+            capacity=settings.POPULAR_ITEMS_LIMIT * 5
+        ))
+
+def set_item_category(item_id: int, category_id: int):
+    """Pindahkan hitungan popular dan skor trending item ke kategori barunya."""
+    previous = _item_categories.get(item_id)
+    _item_categories[item_id] = category_id
+
+    if previous is not None and previous != category_id:
+        counts = _category_counter(previous).remove(item_id)
+        if counts:
+            _category_counter(category_id).merge(counts)
+
+    trending_leaderboard.set_group(item_id, category_id)
+
+def record_item_view(item_id: int, category_id: int | None = None):
+    popularity_counter.increment(item_id)
+    trending_leaderboard.increment(item_id, group=category_id)
+
+    if category_id is None:
+        return
+
+    if _item_categories.get(item_id) != category_id:
+        set_item_category(item_id, category_id)
+
+    _category_counter(category_id).increment(item_id)
+
+def _raw_popularity_counts(session: Session, counts: Counter, start: datetime, end: datetime):
+    if start >= end:
+        return
+
+    rows = session.exec(
+        select(History.item_id, History.viewed_at, Item.category_id)
+        .join(Item, Item.id == History.item_id)
+        .where(History.viewed_at >= start)
+        .where(History.viewed_at < end)
+        .execution_options(yield_per=50_000)
     )
 
-    results = session.exec(statement).all()
+    for item_id, viewed_at, category_id in rows:
+        # Kolom viewed_at tanpa timezone disimpan sebagai UTC
+        if viewed_at.tzinfo is None:
+            viewed_at = viewed_at.replace(tzinfo=timezone.utc)
+
+        counts[(hour_bucket(viewed_at.timestamp()), item_id, category_id)] += 1
+
+def bootstrap_popularity(session: Session):
+    """
+    Isi counter in-memory (global, per kategori, dan trending) dari histori di dalam
+    window yang tercatat sebelum proses ini mulai menghitung; view setelahnya sudah
+    masuk lewat create_history. Counter global dilewati jika memakai backend bersama.
+
+    Hari penuh sebelum hari terakhir di rollup item_daily_views dibaca dari rollup
+    (hitungan satu hari masuk ke bucket jam tengah hari tersebut); histories mentah
+    hanya dibaca untuk sisa hari pertama window dan sejak hari terakhir rollup
+    (normalnya hari ini). Jika rollup kosong seluruh window dibaca dari histories.
+    """
+    global _popularity_ready, _category_popularity_ready
+
+    if _category_popularity_ready:
+        return
+
+    window_start = _popularity_started_at - timedelta(hours=settings.POPULAR_ITEMS_WINDOW_HOURS)
+
+    # Hari sebelum hari terakhir rollup sudah lengkap saat job rollup terakhir berjalan
+    last_day = get_last_rollup_day(session)
+
+    first_full_day = window_start.date() + timedelta(days=1)
+    raw_start = window_start
+    if last_day is not None:
+        raw_start = max(raw_start, datetime.combine(last_day, datetime.min.time(), tzinfo=timezone.utc))
+
+    counts = Counter()
+
+    if raw_start.date() > first_full_day:
+        _raw_popularity_counts(
+            session,
+            counts,
+            window_start,
+            datetime.combine(first_full_day, datetime.min.time(), tzinfo=timezone.utc)
+        )
+
+        for item_id, day, view_count, category_id in get_daily_view_counts(session, first_full_day, raw_start.date()):
+            midday = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc) + timedelta(hours=12)
+            counts[(hour_bucket(midday.timestamp()), item_id, category_id)] += view_count
+
+    else:
+        raw_start = window_start
+
+    _raw_popularity_counts(session, counts, raw_start, _popularity_started_at)
+
+    if not _popularity_ready:
+        popularity_counter.merge(
+            (bucket, item_id, count) for (bucket, item_id, _), count in counts.items()
+        )
+        _popularity_ready = True
+
+    by_category = defaultdict(list)
+    for (bucket, item_id, category_id), count in counts.items():
+        by_category[category_id].append((bucket, item_id, count))
+        _item_categories.setdefault(item_id, category_id)
+
+    for category_id, category_counts in by_category.items():
+        _category_counter(category_id).merge(category_counts)
+
+    # Bobot trending dihitung dari tengah jam tempat view tercatat
+    trending_leaderboard.merge(
+        (item_id, category_id, (bucket + 0.5) * BUCKET_SECONDS, count)
+        for (bucket, item_id, category_id), count in counts.items()
+    )
+    _category_popularity_ready = True
+
+def remove_item_popularity(item_id: int):
+    popularity_counter.remove(item_id)
+    trending_leaderboard.remove(item_id)
+
+    category_id = _item_categories.pop(item_id, None)
+    if category_id is not None:
+        _category_counter(category_id).remove(item_id)
+
+def _ranked_items(session: Session, item_ids: list[int], category_id: int | None) -> list[Item]:
+    items = session.exec(
+        select(Item)
+        .where(Item.id.in_(item_ids))
+        .options(selectinload(Item.category))
+    ).all()
+
+    item_map = {item.id: item for item in items}
+
+    # Item yang sudah dihapus (atau sudah pindah kategori) dilewati
+    return [
+        item_map[item_id] for item_id in item_ids
+        if item_id in item_map and (category_id is None or item_map[item_id].category_id == category_id)
+    ]
+
+def get_popular_items(session: Session, category_id: int | None = None):
+    """
+    Item terpopuler selama window (global atau satu kategori), dibaca dari
+    counter sliding-window (O(K)). Selama counter belum selesai di-bootstrap,
+    pakai rollup item_daily_views.
+    """
+    limit = settings.POPULAR_ITEMS_LIMIT
+
+    if category_id is None and _popularity_ready:
+        item_ids = [item_id for item_id, _ in popularity_counter.top(limit * 2)]
+    elif category_id is not None and _category_popularity_ready:
+        counter = category_popularity.get(category_id)
+        item_ids = [item_id for item_id, _ in counter.top(limit * 2)] if counter else []
+    else:
+        item_ids = get_popular_item_ids(
+            session,
+            days=math.ceil(settings.POPULAR_ITEMS_WINDOW_HOURS / 24),
+            limit=limit * 2,
+            category_id=category_id
+        )
+
+    return _ranked_items(session, item_ids, category_id)[:limit]
+
+def get_trending_items(session: Session, category_id: int | None = None) -> list[tuple[Item, float]]:
+    """
+    Item dengan skor trending (view yang meluruh eksponensial) tertinggi,
+    global atau satu kategori, langsung dari leaderboard di memori.
+    """
+    limit = settings.TRENDING_LIMIT
 
-    popular_items = [row[0] for row in results]
+    scores = dict(trending_leaderboard.top(limit * 2, group=category_id))
+    items = _ranked_items(session, list(scores), category_id)
 
-    return popular_items
+    return [(item, scores[item.id]) for item in items[:limit]]
@@ -0,0 +1,98 @@
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.image_hash import HammingIndex, dhash, from_signed64, to_signed64
+from app.models.item_model import Item
+
+image_hash_index = HammingIndex()
+
+def compute_image_hash(image: bytes | str) -> int | None:
+    """
+    Hash perseptual gambar (bytes atau path) dalam bentuk signed 64-bit,
+    siap disimpan di Item.image_hash.
+    """
+    value = dhash(image)
+    if value is None:
+        return None
+
+    return to_signed64(value)
+
+def build_image_hash_index(session: Session):
+    image_hash_index.clear()
+
+    rows = session.exec(
+        select(Item.id, Item.image_hash).where(Item.image_hash != None)
+    ).all()
+
+    for item_id, image_hash in rows:
+        image_hash_index.add(item_id, from_signed64(image_hash))
+
+def backfill_image_hashes(session: Session, batch_size: int = 200) -> int:
+    """
+    Hitung image_hash untuk item lama yang belum punya (kolom ditambahkan
+    migration 3a9f1c7e2b4d tanpa backfill), lalu daftarkan ke index.
+    Diproses per batch dan di-commit per batch. Item yang gambarnya tidak bisa
+    dibaca tetap NULL. Mengembalikan jumlah item yang di-hash.
+    """
+    hashed = 0
+    last_id = 0
+
+    while True:
+        items = session.exec(
+            select(Item)
+            .where(Item.image_hash == None, Item.id > last_id)
+            .order_by(Item.id)
+            .limit(batch_size)
+        ).all()
+
+        if not items:
+            return hashed
+
+        for item in items:
+            last_id = item.id
+
+            image_hash = compute_image_hash(item.image_link) if item.image_link else None
+            if image_hash is None:
+                continue
+
+            item.image_hash = image_hash
+            session.add(item)
+            hashed += 1
+
+        session.commit()
+
+        for item in items:
+            if item.image_hash is not None:
+                register_item_hash(item.id, item.image_hash)
+
+def register_item_hash(item_id: int, image_hash: int | None):
+    if image_hash is None:
+        image_hash_index.remove(item_id)
+        return
+
+    image_hash_index.add(item_id, from_signed64(image_hash))
+
+def remove_item_hash(item_id: int):
+    image_hash_index.remove(item_id)
+
+def find_similar_item(session: Session, image_hash: int | None) -> Item | None:
+    """
+    Cari Item yang gambarnya mirip (jarak Hamming <= PHASH_MAX_DISTANCE).
+    """
+    if image_hash is None:
+        return None
+
+    match = image_hash_index.nearest(
+        from_signed64(image_hash),
+        max_distance=settings.PHASH_MAX_DISTANCE
+    )
+    if match is None:
+        return None
+
+    item_id, _ = match
+    item = session.get(Item, item_id)
+
+    if item is None:
+        image_hash_index.remove(item_id)
+
+    return item
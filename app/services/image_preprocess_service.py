@@ -0,0 +1,102 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from app.core.config import settings
+from app.core.image_preprocess import preprocess_image
+from app.core.upload import StoredUpload
+
+_executor: ProcessPoolExecutor | None = None
+
+preprocess_stats = {
+    "requests": 0,
+    "failures": 0,
+    "kept_original": 0,
+    "bytes_in": 0,
+    "bytes_out": 0,
+    "total_ms": 0.0,
+    "last": None
+}
+
+def init_preprocess_pool():
+    global _executor
+
+    if settings.IMAGE_PREPROCESS_ENABLED and _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.IMAGE_PREPROCESS_WORKERS)
+
+def shutdown_preprocess_pool():
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+async def run_in_pool(func, *args, **kwargs):
+    """
+    Jalankan fungsi CPU-bound di process pool (atau thread jika pool belum dibuat).
+    """
+    job = partial(func, *args, **kwargs)
+
+    if _executor is not None:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, job)
+
+    return await asyncio.to_thread(job)
+
+async def preprocess_for_model(upload: StoredUpload) -> tuple[bytes, str]:
+    """
+    Kecilkan gambar sebelum dikirim ke model. Worker membaca langsung dari
+    file upload. Jika preprocessing dimatikan, gambar gagal di-decode, atau
+    hasil encode ulang tidak lebih kecil, bytes asli dikembalikan apa adanya.
+    """
+    if not settings.IMAGE_PREPROCESS_ENABLED:
+        return await asyncio.to_thread(upload.read_bytes), upload.mime_type
+
+    started_at = time.perf_counter()
+    try:
+        output_bytes, output_mime = await run_in_pool(
+            preprocess_image,
+            upload.path,
+            max_edge=settings.IMAGE_MAX_EDGE,
+            quality=settings.IMAGE_QUALITY,
+            image_format=settings.IMAGE_OUTPUT_FORMAT
+        )
+    except Exception as e:
+        print(f"Error preprocessing image: {str(e)}")
+        preprocess_stats["failures"] += 1
+        return await asyncio.to_thread(upload.read_bytes), upload.mime_type
+
+    # Gambar yang sudah kecil / terkompresi baik bisa jadi lebih besar setelah di-encode ulang
+    if len(output_bytes) >= upload.size:
+        preprocess_stats["kept_original"] += 1
+        output_bytes, output_mime = await asyncio.to_thread(upload.read_bytes), upload.mime_type
+
+    elapsed_ms = (time.perf_counter() - started_at) * 1000
+
+    preprocess_stats["requests"] += 1
+    preprocess_stats["bytes_in"] += upload.size
+    preprocess_stats["bytes_out"] += len(output_bytes)
+    preprocess_stats["total_ms"] += elapsed_ms
+    preprocess_stats["last"] = {
+        "bytes_in": upload.size,
+        "bytes_out": len(output_bytes),
+        "bytes_saved": upload.size - len(output_bytes),
+        "elapsed_ms": round(elapsed_ms, 2)
+    }
+
+    return output_bytes, output_mime
+
+def get_preprocess_metrics() -> dict:
+    requests = preprocess_stats["requests"]
+
+    return {
+        "enabled": settings.IMAGE_PREPROCESS_ENABLED,
+        "requests": requests,
+        "failures": preprocess_stats["failures"],
+        "kept_original": preprocess_stats["kept_original"],
+        "bytes_saved": preprocess_stats["bytes_in"] - preprocess_stats["bytes_out"],
+        "avg_bytes_saved": round((preprocess_stats["bytes_in"] - preprocess_stats["bytes_out"]) / requests) if requests else 0,
+        "avg_elapsed_ms": round(preprocess_stats["total_ms"] / requests, 2) if requests else 0.0,
+        "last": preprocess_stats["last"]
+    }
@@ -0,0 +1,48 @@
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.name_index import NameIndex
+from app.models.item_model import Item
+
+item_name_index = NameIndex()
+
+def build_item_name_index(session: Session):
+    item_name_index.clear()
+
+    rows = session.exec(
+        select(Item.id, Item.name)
+    ).all()
+
+    for item_id, name in rows:
+        item_name_index.add(item_id, name)
+
+def register_item_name(item_id: int, name: str):
+    item_name_index.add(item_id, name)
+
+def remove_item_name(item_id: int):
+    item_name_index.remove(item_id)
+
+def resolve_item_name(session: Session, name: str) -> Item | None:
+    """
+    Cari Item berdasarkan nama secara fuzzy ("Plastic Bottles" -> "plastic bottle").
+    Jika index tidak menemukan apa pun, fallback ke pencarian exact di DB
+    (misalnya item dibuat oleh worker lain setelah index dibangun).
+    """
+    match = item_name_index.lookup(name, threshold=settings.ITEM_NAME_MATCH_THRESHOLD)
+
+    if match is not None:
+        item_id, _ = match
+        item = session.get(Item, item_id)
+        if item is not None:
+            return item
+
+        item_name_index.remove(item_id)
+
+    item = session.exec(
+        select(Item).where(Item.name == name)
+    ).first()
+
+    if item is not None:
+        item_name_index.add(item.id, item.name)
+
+    return item
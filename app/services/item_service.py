@@ -5,6 +5,10 @@ from datetime import datetime, timezone
 from app.models.item_model import Item
 from app.models.category_model import Category
 from app.schemas.item_schema import CreateItem, ReadItem, UpdateItem, ShowItem
+from app.services.image_hash_service import register_item_hash, remove_item_hash
+from app.services.item_name_service import register_item_name, remove_item_name
+from app.services.history_service import discard_pending_histories, invalidate_recommendations, remove_item_popularity, set_item_category
+from app.services.rollup_service import delete_item_daily_views
 
 def create_item(session: Session, data: CreateItem) -> ReadItem:
     existing = session.exec(
@@ -29,6 +33,7 @@ def create_item(session: Session, data: CreateItem) -> ReadItem:
         is_reusable=data.is_reusable,
         is_recyclable=data.is_recyclable,
         is_hazardous=data.is_hazardous,
+        image_hash=data.image_hash,
         category_id=category.id
     )
     
@@ -36,6 +41,9 @@ def create_item(session: Session, data: CreateItem) -> ReadItem:
     session.commit()
     session.refresh(item)
     
+    register_item_hash(item.id, item.image_hash)
+    register_item_name(item.id, item.name)
+    
     return item    
 
 def read_item(session: Session, id: int) -> ReadItem | None:
@@ -103,6 +111,18 @@ def update_item(session: Session, id: int, data: UpdateItem):
     session.add(existing)
     session.commit()
     session.refresh(existing)
+    
+    if "image_hash" in updated_data:
+        register_item_hash(existing.id, existing.image_hash)
+    
+    if "name" in updated_data:
+        register_item_name(existing.id, existing.name)
+    
+    if data.category_name:
+        set_item_category(existing.id, existing.category_id)
+    
+    # Nama / gambar / kategori di rekomendasi yang di-cache bisa sudah berubah
+    invalidate_recommendations()
             
     return existing
 
@@ -117,7 +137,15 @@ def delete_item(
     if not item:
         return None
     
+    discard_pending_histories(id)
+    delete_item_daily_views(session, id)
+    
     session.delete(item)
     session.commit()
     
+    remove_item_hash(id)
+    remove_item_name(id)
+    remove_item_popularity(id)
+    invalidate_recommendations()
+    
     return item
\ No newline at end of file
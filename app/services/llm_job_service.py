@@ -0,0 +1,130 @@
+import asyncio
+
+import httpx
+from sqlmodel import Session
+
+from app.core.callback_url import validate_callback_url
+from app.core.config import settings
+from app.core.job_queue import InMemoryJobStore, JobQueue, JobStore, SQLiteJobStore
+from app.core.upload import StoredUpload
+from app.databases.session import engine
+from app.services.llm_service import is_transient_model_error, process_llm_upload
+
+async def _process_job(job: dict, upload: StoredUpload) -> dict:
+    try:
+        with Session(engine) as session:
+            return await process_llm_upload(
+                upload=upload,
+                session=session,
+                discard_on_error=False
+            )
+
+    except Exception as e:
+        # File hanya dihapus jika job tidak akan di-retry lagi
+        if not is_transient_model_error(e) or job["attempts"] > settings.LLM_JOB_MAX_RETRIES:
+            upload.discard()
+        raise
+
+async def _send_callback(job: dict):
+    if not job.get("callback_url"):
+        return
+
+    # Dicek ulang karena DNS host bisa berubah sejak job disubmit
+    addresses = await asyncio.to_thread(validate_callback_url, job["callback_url"])
+
+    # Koneksi langsung ke IP yang sudah divalidasi (bukan resolve ulang oleh httpx,
+    # celah DNS rebinding); Host header dan SNI / verifikasi sertifikat tetap memakai host asli
+    url = httpx.URL(job["callback_url"])
+    headers = {"Host": url.netloc.decode("ascii")}
+    extensions = {"sni_hostname": url.host} if url.scheme == "https" else {}
+
+    async with httpx.AsyncClient(timeout=settings.LLM_JOB_CALLBACK_TIMEOUT_SECONDS) as client:
+        for index, address in enumerate(addresses):
+            try:
+                await client.post(
+                    url.copy_with(host=address),
+                    json=serialize_job(job),
+                    headers=headers,
+                    extensions=extensions
+                )
+                return
+
+            except httpx.ConnectError:
+                if index == len(addresses) - 1:
+                    raise
+
+def _create_store() -> JobStore:
+    if settings.LLM_JOB_STORE == "sqlite":
+        return SQLiteJobStore(settings.LLM_JOB_SQLITE_PATH)
+
+    return InMemoryJobStore()
+
+llm_job_queue: JobQueue | None = None
+
+def start_llm_job_queue():
+    global llm_job_queue
+
+    llm_job_queue = JobQueue(
+        handler=_process_job,
+        store=_create_store(),
+        max_size=settings.LLM_JOB_QUEUE_MAX_SIZE,
+        max_retries=settings.LLM_JOB_MAX_RETRIES,
+        retry_base_seconds=settings.LLM_JOB_RETRY_BASE_SECONDS,
+        is_transient=is_transient_model_error,
+        on_finished=_send_callback,
+        discard_payload=StoredUpload.discard
+    )
+    llm_job_queue.start(workers=settings.LLM_JOB_WORKERS)
+
+async def stop_llm_job_queue():
+    global llm_job_queue
+
+    if llm_job_queue is None:
+        return
+
+    await llm_job_queue.stop()
+    if isinstance(llm_job_queue.store, SQLiteJobStore):
+        llm_job_queue.store.close()
+
+    llm_job_queue = None
+
+def submit_llm_job(
+    upload: StoredUpload,
+    owner_id: int,
+    callback_url: str | None = None
+) -> dict:
+    if llm_job_queue is None:
+        raise ValueError("QUEUE_FULL")
+
+    return llm_job_queue.submit(
+        payload=upload,
+        owner_id=owner_id,
+        callback_url=callback_url
+    )
+
+def get_llm_job(job_id: str, owner_id: int) -> dict | None:
+    if llm_job_queue is None:
+        return None
+
+    job = llm_job_queue.get(job_id)
+    if job is None or job["owner_id"] != owner_id:
+        return None
+
+    return job
+
+def serialize_job(job: dict) -> dict:
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "result": job["result"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"]
+    }
+
+def get_job_metrics() -> dict:
+    if llm_job_queue is None:
+        return {"running": False}
+
+    return {"running": True, **llm_job_queue.metrics()}
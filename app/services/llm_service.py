@@ -1,191 +1,664 @@
-import json
-import os
-from uuid import uuid4
+import asyncio
+import time
+
+import httpx
+from pathlib import Path
+from typing import TypeVar
 
 from fastapi import UploadFile
-from google import genai
-from google.genai import types
-from sqlmodel import Session, select
+from google.genai import errors as genai_errors
+from pydantic import BaseModel
+from sqlmodel import Session
 from sqlalchemy.exc import SQLAlchemyError
 
+from app.core.cache import TieredCache, TTLCache, content_hash
 from app.core.config import settings
+from app.core.genai_client import genai_client_stats
+from app.core.model_backend import ModelRequest, TransientModelError, get_model_backend
+from app.core.metrics import HistogramRegistry
+from app.core.resilience import CircuitBreaker, Hedger, remaining_time
+from app.core.single_flight import SingleFlight
+from app.core.structured_output import parse_model_output
+from app.core.upload import StoredUpload, save_upload
 from app.models.item_model import Item
 from app.models.category_model import Category
+from app.schemas.llm_schema import LLMCheckResult, LLMProcessResult
 from app.routers.item_router import BASE_STORAGE
+from app.services.image_preprocess_service import get_preprocess_metrics, preprocess_for_model
+from app.services.prefilter_service import NEGATIVE_LABEL, get_prefilter_metrics, prefilter_check, record_prefilter_sample
+from app.services.image_hash_service import compute_image_hash, find_similar_item, register_item_hash, image_hash_index
+from app.services.item_name_service import register_item_name, resolve_item_name
+from app.services.prompt_service import (
+    NOT_IDENTIFIED_NAME,
+    current_prompt_version,
+    get_context_cache,
+    get_process_prompt,
+    get_prompt_metrics,
+    resolve_category_id
+)
+
+TEMP_STORAGE = Path("storage/tmp")
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Naikkan versi prompt setiap kali isi prompt diubah agar cache lama tidak dipakai.
+# Versi prompt process diturunkan dari isi prompt (lihat prompt_service).
+CHECK_PROMPT_VERSION = "v2"
 
 #---------------------------------------------------------------#
-#-------------------- LLM REQUEST FUNCTION ---------------------#
+#----------------------- LLM RESULT CACHE ----------------------#
 #---------------------------------------------------------------#
-async def process_llm_request(upload_file: UploadFile, session: Session) -> str:
+llm_cache = TieredCache(
+    local=TTLCache(
+        max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+        ttl=settings.LLM_CACHE_TTL_SECONDS
+    )
+)
+
+phash_stats = {
+    "hits": 0,
+    "misses": 0
+}
+
+model_call_stats = {
+    "calls": 0,
+    "total_seconds": 0.0
+}
+
+# Latency end-to-end per endpoint / jalur resolusi /llm/scan
+route_latency = HistogramRegistry()
+
+scan_stats = {
+    "escalated_low_confidence": 0,
+    "escalated_not_found": 0
+}
+
+parse_stats = {
+    "parsed": 0,
+    "repaired": 0,
+    "failed": 0
+}
+
+def _record_model_call(started_at: float):
+    model_call_stats["calls"] += 1
+    model_call_stats["total_seconds"] += time.perf_counter() - started_at
+
+def _parse_output(text: str | None, schema: type[ModelT]) -> ModelT:
+    try:
+        result, repaired = parse_model_output(text, schema)
+    except ValueError:
+        parse_stats["failed"] += 1
+        print(f"Error parsing model output: {(text or '')[:200]!r}")
+        raise
 
-    client = genai.Client(api_key=settings.GEMINI_API_KEY)
+    parse_stats["parsed"] += 1
+    if repaired:
+        parse_stats["repaired"] += 1
 
-    temp_file_path = None
+    return result
 
-    try:
-        
-        image_bytes = await upload_file.read()
-        mime_type = upload_file.content_type or "image/jpeg" or "image/jpg"
+# Upload identik yang datang bersamaan menunggu satu panggilan model yang sama
+process_flight = SingleFlight()
+check_flight = SingleFlight()
 
+# Membatasi jumlah inferensi yang berjalan bersamaan di satu worker
+model_semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
 
-        response = client.models.generate_content(
-            model=settings.GEMINI_MODEL_NAME_PROCESS,
-            contents=[
-                types.Part.from_bytes(
-                    data=image_bytes,
-                    mime_type=mime_type,
-                ),
-                """
-                Identify the item in this image. Response ONLY with a valid JSON object.
-                
-                Follow this category_id mapping: 
-                [
-                    {"id": 1, "name": "Organic"}, {"id": 2, "name": "Plastic"}, 
-                    {"id": 3, "name": "Metal"}, {"id": 4, "name": "Glass"}, 
-                    {"id": 5, "name": "Paper"}, {"id": 6, "name": "Textiles"}, 
-                    {"id": 7, "name": "Hazardous"}, {"id": 8, "name": "E-Waste"}, 
-                    {"id": 9, "name": "Batteries"}, {"id": 10, "name": "Styrofoam"}, 
-                    {"id": 11, "name": "Mixed Waste"}, {"id": 12, "name": "Other"}
-                ]
-
-                Response output format: 
-                {
-                    "name": "item_name_singular", 
-                    "description": "item_description", 
-                    "recycle": "item_recycle_instructions", 
-                    "is_reusable": true, 
-                    "is_recyclable": true, 
-                    "is_hazardous": false, 
-                    "category_id": 12
-                }
-                
+# Resilience per model: circuit breaker, hedged request setelah p95, latency per model
+model_breakers: dict[str, CircuitBreaker] = {}
+model_latency = HistogramRegistry()
+hedger = Hedger()
 
-                If the item was not a trash item or could not be identified, return name as "Wasted Not Identified".
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
 
-                Example for identified trash item: 
-                {"name": "plastic bottle", "description": "A clear plastic water bottle", "recycle": "**First choice** Before throwing it, see if it can be reused as DIY thing. Easy reuse ideas: - Refill for water\n - Use as a plant watering can\n - Cut and use as a funnel\n\n **How to recycle properly** Most plastic bottle are reusable, especially those marked with PET, PPE, or #1\n Steps:\n - Empty the bottle completely\n - Remove the cap and label\n - Rinse the bottle\n - Place it in the recycling bin", "is_reusable": true, "is_recyclable": true, "is_hazardous": false, "category_id": 2}
+def is_transient_model_error(error: Exception) -> bool:
+    """Error sementara (layak di-retry dan dihitung oleh circuit breaker)."""
+    if isinstance(error, genai_errors.APIError):
+        return error.code in TRANSIENT_STATUS_CODES
 
-                Example for non-trash item:
-                {"name": "Wasted Not Identified", "description": "Item could not be identified as trash", "recycle": "N/A", "is_reusable": false, "is_recyclable": false, "is_hazardous": false, "category_id": 12}
-                
-                No markdown, no extra text.
-                """
-            ]
+    if isinstance(error, (httpx.TransportError, TransientModelError)):
+        return True
+
+    return str(error) in ("MODEL_TIMEOUT", "MODEL_UNAVAILABLE")
+
+def _get_breaker(model: str) -> CircuitBreaker:
+    if (breaker := model_breakers.get(model)) is None:
+        breaker = model_breakers[model] = CircuitBreaker(
+            failure_rate=settings.LLM_BREAKER_FAILURE_RATE,
+            min_calls=settings.LLM_BREAKER_MIN_CALLS,
+            window=settings.LLM_BREAKER_WINDOW,
+            open_seconds=settings.LLM_BREAKER_OPEN_SECONDS
         )
 
-        llm_request_result = response.text
-
-        llm_request_json_extract = json.loads(llm_request_result)
-        extract_name = llm_request_json_extract.get("name", "Unknown item")
-        extract_description = llm_request_json_extract.get("description", "Unknown description")
-        extract_recycle = llm_request_json_extract.get("recycle", "Unknown recycle")
-        extract_is_reusable = llm_request_json_extract.get("is_reusable", "Unknown status")
-        extract_is_recyclable = llm_request_json_extract.get("is_recyclable", "Unknown status")
-        extract_is_hazardous = llm_request_json_extract.get("is_hazardous", "Unknown status")
-        raw_category_id = llm_request_json_extract.get("category_id", 12)
-        extract_category_id = int(raw_category_id)
-
-        if extract_name == "Wasted Not Identified":
-            status = {
-                "status": "failed",
-                "message": "Item could not be identified as trash"
-            }
-            return status
-        
+    return breaker
+
+def model_retry_after() -> int:
+    """Detik sampai breaker model yang sedang open boleh dicoba lagi (untuk header Retry-After)."""
+    retry_after = max((breaker.retry_after() for breaker in model_breakers.values()), default=0.0)
+    return max(int(retry_after + 0.999), 1)
+
+def _hedge_after(model: str) -> float | None:
+    if not settings.LLM_HEDGE_ENABLED:
+        return None
+
+    histogram = model_latency.get(model)
+    if histogram.count < settings.LLM_HEDGE_MIN_SAMPLES:
+        return None
+
+    return histogram.quantile(0.95)
+
+async def _generate_content(request: ModelRequest) -> str | None:
+    """
+    Panggil backend model (Gemini / fake / ONNX, lihat LLM_BACKEND) secara async
+    dan kembalikan teks mentahnya. Raise ValueError("MODEL_TIMEOUT") jika melebihi LLM_TIMEOUT_SECONDS atau
+    sisa deadline request, ValueError("MODEL_UNAVAILABLE") jika circuit
+    breaker model sedang open.
+    """
+    timeout = settings.LLM_TIMEOUT_SECONDS
+    if (remaining := remaining_time()) is not None:
+        if remaining <= 0:
+            raise ValueError("MODEL_TIMEOUT")
+        timeout = min(timeout, remaining)
+
+    clipped = timeout < settings.LLM_TIMEOUT_SECONDS
+
+    model = request.model
+    breaker = _get_breaker(model)
+    if not breaker.allow():
+        raise ValueError("MODEL_UNAVAILABLE")
+
+    async def call():
+        async with model_semaphore:
+            started_at = time.perf_counter()
+            text = await get_model_backend().generate(request)
+
+            model_latency.observe(model, time.perf_counter() - started_at)
+            _record_model_call(started_at)
+            return text
+
+    try:
+        text = await asyncio.wait_for(
+            hedger.run(call, _hedge_after(model)),
+            timeout=timeout
+        )
+
+    except asyncio.TimeoutError:
+        # Timeout karena sisa deadline request tidak berarti model lambat,
+        # hanya timeout penuh LLM_TIMEOUT_SECONDS yang dihitung sebagai failure
+        if clipped:
+            breaker.release()
         else:
+            breaker.record_failure()
+        raise ValueError("MODEL_TIMEOUT")
 
-            filename = f"{uuid4().hex}_{upload_file.filename}"
-            filepath = os.path.join(BASE_STORAGE, filename)
-            with open(filepath, "wb") as f:
-                f.write(image_bytes)
-                f.close()
-
-            new_item = Item(
-                name=extract_name,
-                description=extract_description,
-                image_link=str(filepath),
-                recycle=extract_recycle,
-                is_reusable=extract_is_reusable,
-                is_recyclable=extract_is_recyclable,
-                is_hazardous=extract_is_hazardous,
-                category_id=extract_category_id
-            )
+    except asyncio.CancelledError:
+        breaker.release()
+        raise
 
-            try:
-                session.add(new_item)
-                session.commit()
-                session.refresh(new_item)
-
-                data = {
-                    "id": new_item.id,
-                    "name": new_item.name,
-                    "description": new_item.description,
-                    "recycle": new_item.recycle,
-                    "is_reusable": new_item.is_reusable,
-                    "is_recyclable": new_item.is_recyclable,
-                    "is_hazardous": new_item.is_hazardous,
-                    "category_id": new_item.category_id
-                }
+    except Exception as e:
+        # Error dari sisi request (misalnya 400) bukan tanda model sedang bermasalah
+        if is_transient_model_error(e):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        raise
+
+    breaker.record_success()
+    return text
+
+def _serialize_item(item: Item) -> dict:
+    return {
+        "id": item.id,
+        "name": item.name,
+        "description": item.description,
+        "recycle": item.recycle,
+        "is_reusable": item.is_reusable,
+        "is_recyclable": item.is_recyclable,
+        "is_hazardous": item.is_hazardous,
+        "category_id": item.category_id
+    }
+
+def get_llm_metrics() -> dict:
+    calls = model_call_stats["calls"]
+    avg_latency = model_call_stats["total_seconds"] / calls if calls else 0.0
+    cache_stats = llm_cache.stats()
+    prefilter_stats = get_prefilter_metrics()
+    process_flight_stats = process_flight.stats()
+    check_flight_stats = check_flight.stats()
+    coalesced = process_flight_stats["coalesced"] + check_flight_stats["coalesced"]
+    parsed_total = parse_stats["parsed"] + parse_stats["failed"]
+    saved_calls = (
+        cache_stats["hits"]
+        + phash_stats["hits"]
+        + prefilter_stats["model_calls_avoided"]
+        + coalesced
+    )
+
+    return {
+        "cache": cache_stats,
+        "phash": {
+            "indexed_items": len(image_hash_index),
+            "hits": phash_stats["hits"],
+            "misses": phash_stats["misses"]
+        },
+        "backend": get_model_backend().name,
+        "connections": genai_client_stats(),
+        "preprocess": get_preprocess_metrics(),
+        "prefilter": prefilter_stats,
+        "prompt": get_prompt_metrics(),
+        "parse": {
+            **parse_stats,
+            "failure_rate": round(parse_stats["failed"] / parsed_total, 4) if parsed_total else 0.0
+        },
+        "routes": route_latency.snapshot(),
+        "resilience": {
+            "breakers": {model: breaker.stats() for model, breaker in model_breakers.items()},
+            "hedging": {
+                "enabled": settings.LLM_HEDGE_ENABLED,
+                **hedger.stats()
+            },
+            "model_latency": model_latency.snapshot()
+        },
+        "scan": {
+            **scan_stats,
+            "confidence_threshold": settings.LLM_SCAN_CONFIDENCE_THRESHOLD
+        },
+        "coalescing": {
+            "process": process_flight_stats,
+            "check": check_flight_stats,
+            "coalesced_calls": coalesced
+        },
+        "model": {
+            "calls": calls,
+            "avg_latency_seconds": round(avg_latency, 4),
+            "estimated_saved_calls": saved_calls,
+            "estimated_saved_seconds": round(saved_calls * avg_latency, 2)
+        }
+    }
+
+#---------------------------------------------------------------#
+#-------------------- LLM REQUEST FUNCTION ---------------------#
+#---------------------------------------------------------------#
+def _process_cache_key(upload: StoredUpload) -> str:
+    return content_hash(
+        upload.sha256,
+        settings.GEMINI_MODEL_NAME_PROCESS,
+        current_prompt_version()
+    )
+
+def _cached_process_result(session: Session, cache_key: str, cached: dict | None) -> dict | None:
+    """
+    Hasil process di cache hanya dipakai sebagai penunjuk ke Item: datanya dibaca
+    ulang dari DB, jadi perubahan item langsung terlihat. Jika item sudah dihapus,
+    entry cache dibuang dan dianggap miss (gambar diproses ulang).
+    """
+    if cached is None or "id" not in cached:
+        return cached
+
+    item = session.get(Item, cached["id"])
+    if item is None:
+        llm_cache.delete(cache_key)
+        return None
+
+    return _serialize_item(item)
+
+def _not_identified_status() -> dict:
+    return {
+        "status": "failed",
+        "message": "Item could not be identified as trash"
+    }
+
+# Hasil untuk gambar yang ditolak pre-filter. Tidak di-cache: classifier terus dilatih
+# ulang, jadi gambar yang sama bisa lolos ke model pada percobaan berikutnya
+_PREFILTER_REJECTED = LLMProcessResult(name=NOT_IDENTIFIED_NAME, description="Rejected by pre-filter")
+
+def _prefilter_label(llm_result: LLMProcessResult) -> int:
+    if llm_result.name == NOT_IDENTIFIED_NAME:
+        return NEGATIVE_LABEL
+
+    return llm_result.category_id
+
+async def _run_process_model(upload: StoredUpload) -> LLMProcessResult:
+    # Gambar yang jelas bukan sampah ditolak tanpa memanggil model
+    rejected, features = await prefilter_check(upload)
+    if rejected:
+        return _PREFILTER_REJECTED
+
+    model_bytes, model_mime_type = await preprocess_for_model(upload)
+
+    prompt = await get_process_prompt()
+    cached_content = await get_context_cache(prompt)
+
+    text = await _generate_content(
+        ModelRequest(
+            model=settings.GEMINI_MODEL_NAME_PROCESS,
+            image=model_bytes,
+            mime_type=model_mime_type,
+            # Jika prompt sudah ada di context cache Gemini, cukup kirim gambarnya
+            prompt=prompt.text if cached_content is None else None,
+            schema=LLMProcessResult,
+            cached_content=cached_content
+        )
+    )
+
+    llm_result = _parse_output(text, LLMProcessResult)
+    record_prefilter_sample(features, _prefilter_label(llm_result))
+
+    return llm_result
+
+async def _build_item(llm_result: LLMProcessResult, upload: StoredUpload) -> Item:
+    """
+    Bentuk Item dari hasil model yang sudah tervalidasi (belum di-commit).
+    Gambar sudah tersimpan di storage oleh save_upload.
+    """
+    return Item(
+        name=llm_result.name,
+        description=llm_result.description,
+        image_link=upload.path,
+        recycle=llm_result.recycle,
+        is_reusable=llm_result.is_reusable,
+        is_recyclable=llm_result.is_recyclable,
+        is_hazardous=llm_result.is_hazardous,
+        image_hash=await asyncio.to_thread(compute_image_hash, upload.path),
+        category_id=resolve_category_id(llm_result.category_id)
+    )
+
+async def process_llm_upload(
+    upload: StoredUpload,
+    session: Session,
+    discard_on_error: bool = True
+) -> dict:
+    """
+    Klasifikasi gambar yang sudah tersimpan di storage. File dihapus lagi jika
+    tidak menjadi Item baru (cache hit, bukan sampah, duplikat, atau gagal).
+    discard_on_error=False dipakai job queue agar file tetap ada untuk retry.
+
+    Upload dengan isi yang sama yang sedang diproses bersamaan digabung: hanya
+    satu request yang memanggil model dan insert Item, sisanya memakai hasilnya.
+    """
+    cache_key = _process_cache_key(upload)
+    is_leader = False
+
+    async def run() -> dict:
+        nonlocal is_leader
+        is_leader = True
+        return await _process_llm_upload(upload, session, cache_key, discard_on_error)
+
+    try:
+        data, shared = await process_flight.do(cache_key, run)
+    except Exception:
+        if not is_leader and discard_on_error:
+            upload.discard()
+        raise
+
+    if shared:
+        upload.discard()
+
+    return data
+
+async def _process_llm_upload(
+    upload: StoredUpload,
+    session: Session,
+    cache_key: str,
+    discard_on_error: bool
+) -> dict:
+    try:
+        if (cached := _cached_process_result(session, cache_key, llm_cache.get(cache_key))) is not None:
+            upload.discard()
+            return cached
+
+        llm_result = await _run_process_model(upload)
+
+        if llm_result.name == NOT_IDENTIFIED_NAME:
+            upload.discard()
+            status = _not_identified_status()
+            if llm_result is not _PREFILTER_REJECTED:
+                llm_cache.set(cache_key, status)
+            return status
+
+        new_item = await _build_item(llm_result, upload)
 
-                return data
+    except Exception:
+        if discard_on_error:
+            upload.discard()
+        raise
 
-            except SQLAlchemyError as e:
-                session.rollback()
-                ValueError(f"ERROR DATABASE: {str(e)}")
+    try:
+        session.add(new_item)
+        session.commit()
+        session.refresh(new_item)
+        register_item_hash(new_item.id, new_item.image_hash)
+        register_item_name(new_item.id, new_item.name)
+
+        data = _serialize_item(new_item)
+        llm_cache.set(cache_key, data)
+
+        return data
+
+    except SQLAlchemyError as e:
+        session.rollback()
+        if discard_on_error:
+            upload.discard()
+        print(f"Error saving item: {str(e)}")
+        raise ValueError("ERROR DATABASE")
+
+async def process_llm_request(upload_file: UploadFile, session: Session) -> dict:
+    started_at = time.perf_counter()
+
+    try:
+        upload = await asyncio.to_thread(
+            save_upload,
+            upload_file,
+            BASE_STORAGE,
+            settings.UPLOAD_MAX_BYTES
+        )
+
+        return await process_llm_upload(upload=upload, session=session)
 
     except Exception as e:
         print(f"Error processing uploaded file: {str(e)}")
         raise e
-    
+
     finally:
-        if temp_file_path:
-            os.unlink(temp_file_path)
+        route_latency.observe("process", time.perf_counter() - started_at)
 
 #---------------------------------------------------------------#
-#--------------------- LLM CHECK FUNCTION ----------------------#
+#--------------------- LLM BATCH FUNCTION ----------------------#
 #---------------------------------------------------------------#
-async def llm_check_request(upload_file: UploadFile, session: Session) -> str:
+async def process_llm_batch(uploads: list[StoredUpload], session: Session):
+    """
+    Proses banyak gambar sekaligus. Gambar identik hanya dikirim ke model sekali
+    dan hasil di-yield per gambar begitu selesai. Setiap Item baru di-commit
+    sebelum barisnya dikirim, jadi id yang diterima client selalu sudah tersimpan.
+    Baris terakhir berisi ringkasan batch.
+    """
+    groups: dict[str, list[int]] = {}
+    for index, upload in enumerate(uploads):
+        groups.setdefault(_process_cache_key(upload), []).append(index)
+
+    # Duplikat di dalam batch tidak perlu disimpan berkali-kali
+    for indices in groups.values():
+        for index in indices[1:]:
+            uploads[index].discard()
+
+    batch_semaphore = asyncio.Semaphore(settings.LLM_BATCH_MAX_CONCURRENCY)
+
+    async def classify(cache_key: str, index: int):
+        async with batch_semaphore:
+            try:
+                if (cached := _cached_process_result(session, cache_key, llm_cache.get(cache_key))) is not None:
+                    return cache_key, cached, None, None
+
+                extract = await _run_process_model(uploads[index])
+                return cache_key, None, extract, None
 
-    client = genai.Client(api_key=settings.GEMINI_API_KEY)
+            except Exception as e:
+                return cache_key, None, None, e
 
-    temp_file = None
+    tasks = [
+        asyncio.create_task(classify(cache_key, indices[0]))
+        for cache_key, indices in groups.items()
+    ]
+
+    # Gambar yang sudah selesai ditangani (file-nya dipakai Item baru atau sudah dibuang)
+    handled: set[str] = set()
+    created = 0
+    failed = 0
 
     try:
+        for next_done in asyncio.as_completed(tasks):
+            cache_key, result, extract, error = await next_done
+            indices = groups[cache_key]
+            upload = uploads[indices[0]]
+            keep_upload = False
+
+            if error is None and result is None:
+                if extract.name == NOT_IDENTIFIED_NAME:
+                    result = _not_identified_status()
+                    if extract is not _PREFILTER_REJECTED:
+                        llm_cache.set(cache_key, result)
+
+                else:
+                    try:
+                        new_item = await _build_item(extract, upload)
+
+                        # Commit per gambar: satu baris gagal tidak membatalkan seluruh batch
+                        session.add(new_item)
+                        session.commit()
+                        session.refresh(new_item)
+
+                        register_item_hash(new_item.id, new_item.image_hash)
+                        register_item_name(new_item.id, new_item.name)
+
+                        result = _serialize_item(new_item)
+                        llm_cache.set(cache_key, result)
+                        keep_upload = True
+                        created += 1
+
+                    except SQLAlchemyError as e:
+                        session.rollback()
+                        print(f"Error saving batch item: {str(e)}")
+                        error = ValueError("ERROR DATABASE")
+
+                    except Exception as e:
+                        error = e
+
+            if not keep_upload:
+                upload.discard()
+            handled.add(cache_key)
+
+            for index in indices:
+                line = {
+                    "index": index,
+                    "filename": uploads[index].filename
+                }
 
-        image_bytes = await upload_file.read()
-        mime_type = "image/jpeg" or "image/jpg"
+                if error is not None:
+                    failed += 1
+                    line.update({"status": "failed", "message": str(error)})
+                else:
+                    line.update({"status": "success", "data": result})
 
-        response = client.models.generate_content(
+                yield line
+
+    finally:
+        for task in tasks:
+            task.cancel()
+
+        # Client terputus / error di tengah batch: gambar yang belum menjadi Item dibuang
+        for cache_key, indices in groups.items():
+            if cache_key not in handled:
+                uploads[indices[0]].discard()
+
+    yield {
+        "status": "success",
+        "message": "LLM batch processed successfully",
+        "summary": {
+            "total": len(uploads),
+            "unique": len(groups),
+            "created": created,
+            "failed": failed
+        }
+    }
+
+#---------------------------------------------------------------#
+#--------------------- LLM CHECK FUNCTION ----------------------#
+#---------------------------------------------------------------#
+async def _run_check_model(upload: StoredUpload, cache_key: str) -> dict:
+    model_bytes, model_mime_type = await preprocess_for_model(upload)
+    text = await _generate_content(
+        ModelRequest(
             model=settings.GEMINI_MODEL_NAME_CHECK,
-            contents=[
-                types.Part.from_bytes(
-                    data=image_bytes,
-                    mime_type=mime_type,
-                ),
+            image=model_bytes,
+            mime_type=model_mime_type,
+            prompt=(
                 "Identify the item in this image. Response ONLY with a valid JSON object. "
-                "Format: {'name': 'item_name_singular'}. "
-                "Example: {'name': 'plastic bottle'}. No markdown, no extra text."
-            ]
+                "Format: {'name': 'item_name_singular', 'confidence': number_between_0_and_1}. "
+                "confidence is how sure you are that the name is correct. "
+                "Example: {'name': 'plastic bottle', 'confidence': 0.92}. No markdown, no extra text."
+            ),
+            schema=LLMCheckResult
         )
+    )
+
+    llm_check_json_extract = _parse_output(text, LLMCheckResult).model_dump()
+    llm_cache.set(cache_key, llm_check_json_extract)
+
+    return llm_check_json_extract
+
+def _check_cache_key(upload: StoredUpload) -> str:
+    return content_hash(
+        upload.sha256,
+        settings.GEMINI_MODEL_NAME_CHECK,
+        CHECK_PROMPT_VERSION
+    )
+
+async def _identify_with_check_model(upload: StoredUpload, cache_key: str) -> dict:
+    """
+    Panggil model check setelah llm_cache miss (lookup cache dilakukan pemanggil,
+    supaya satu request hanya tercatat satu kali hit / miss).
+    """
+    llm_check_json_extract, _ = await check_flight.do(
+        cache_key,
+        lambda: _run_check_model(upload, cache_key)
+    )
+
+    return llm_check_json_extract
+
+async def llm_check_request(upload_file: UploadFile, session: Session) -> str:
+
+    upload = None
+    started_at = time.perf_counter()
+
+    try:
+
+        # Gambar check tidak disimpan permanen, cukup di direktori sementara
+        upload = await asyncio.to_thread(
+            save_upload,
+            upload_file,
+            TEMP_STORAGE,
+            settings.UPLOAD_MAX_BYTES
+        )
+
+        cache_key = _check_cache_key(upload)
+        llm_check_json_extract = llm_cache.get(cache_key)
+
+        if llm_check_json_extract is None:
+            # Foto yang sama dari sudut / kompresi berbeda dijawab langsung dari DB
+            image_hash = await asyncio.to_thread(compute_image_hash, upload.path)
+            if similar_item := find_similar_item(session, image_hash):
+                phash_stats["hits"] += 1
+                return _serialize_item(similar_item)
+
+            phash_stats["misses"] += 1
+
+            llm_check_json_extract = await _identify_with_check_model(upload, cache_key)
 
-        llm_check_result = response.text
-        
-        llm_check_json_extract = json.loads(llm_check_result)
         json_extract_result = llm_check_json_extract.get("name", "Unknown item")
         
-        if selected_item := session.exec(
-            select(Item).where(Item.name == json_extract_result)
-        ).first():
-            json_extract_result = {
-                "id": selected_item.id,
-                "name": selected_item.name,
-                "description": selected_item.description,
-                "recycle": selected_item.recycle,
-                "is_reusable": selected_item.is_reusable,
-                "is_recyclable": selected_item.is_recyclable,
-                "is_hazardous": selected_item.is_hazardous,
-                "category_id": selected_item.category_id
-            }
+        # "Plastic Bottles" / "plastic-bottle" tetap cocok dengan Item "plastic bottle"
+        if selected_item := resolve_item_name(session, json_extract_result):
+            json_extract_result = _serialize_item(selected_item)
 
             return json_extract_result
         
@@ -199,3 +672,87 @@ async def llm_check_request(upload_file: UploadFile, session: Session) -> str:
     except Exception as e:
         print(f"Error processing uploaded file: {str(e)}")
         raise e
+
+    finally:
+        if upload:
+            upload.discard()
+
+        route_latency.observe("check", time.perf_counter() - started_at)
+
+#---------------------------------------------------------------#
+#---------------------- LLM SCAN FUNCTION ----------------------#
+#---------------------------------------------------------------#
+async def llm_scan_request(upload_file: UploadFile, session: Session) -> dict:
+    """
+    Routing adaptif: cache / near-duplicate dulu, lalu model check yang lebih
+    murah. Model process hanya dipanggil jika confidence check rendah atau
+    nama hasil check tidak ada di DB. Mengembalikan {"route", "result"}.
+    """
+    started_at = time.perf_counter()
+    route = "error"
+    upload = None
+
+    try:
+        # Disimpan di storage item karena bisa saja berakhir menjadi Item baru
+        upload = await asyncio.to_thread(
+            save_upload,
+            upload_file,
+            BASE_STORAGE,
+            settings.UPLOAD_MAX_BYTES
+        )
+
+        process_cache_key = _process_cache_key(upload)
+        if (cached := _cached_process_result(session, process_cache_key, llm_cache.get(process_cache_key))) is not None:
+            upload.discard()
+            route = "cache"
+            return {"route": route, "result": cached}
+
+        image_hash = await asyncio.to_thread(compute_image_hash, upload.path)
+        if similar_item := find_similar_item(session, image_hash):
+            phash_stats["hits"] += 1
+            upload.discard()
+            route = "phash"
+            return {"route": route, "result": _serialize_item(similar_item)}
+
+        phash_stats["misses"] += 1
+
+        check_cache_key = _check_cache_key(upload)
+        if (check_result := llm_cache.get(check_cache_key)) is None:
+            check_result = await _identify_with_check_model(upload, check_cache_key)
+
+        confidence = check_result.get("confidence") or 0.0
+        selected_item = resolve_item_name(session, check_result.get("name", ""))
+
+        if confidence >= settings.LLM_SCAN_CONFIDENCE_THRESHOLD and selected_item:
+            upload.discard()
+            route = "check"
+            return {"route": route, "result": _serialize_item(selected_item)}
+
+        if selected_item is None:
+            scan_stats["escalated_not_found"] += 1
+        else:
+            scan_stats["escalated_low_confidence"] += 1
+
+        try:
+            route = "process"
+            result = await process_llm_upload(upload=upload, session=session)
+
+        except ValueError as e:
+            # Model process sedang down: pakai jawaban check walau confidence rendah
+            if str(e) != "MODEL_UNAVAILABLE" or selected_item is None:
+                raise
+
+            route = "check_fallback"
+            return {"route": route, "result": _serialize_item(selected_item)}
+
+        return {"route": route, "result": result}
+
+    except Exception as e:
+        if upload:
+            upload.discard()
+
+        print(f"Error processing uploaded file: {str(e)}")
+        raise e
+
+    finally:
+        route_latency.observe(f"scan.{route}", time.perf_counter() - started_at)
@@ -0,0 +1,152 @@
+import threading
+from collections import defaultdict, deque
+from pathlib import Path
+
+import numpy as np
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.prefilter import SoftmaxClassifier, extract_features
+from app.core.upload import StoredUpload
+from app.models.item_model import Item
+from app.services.image_preprocess_service import run_in_pool
+
+# Label untuk gambar yang menurut model bukan sampah ("Wasted Not Identified")
+NEGATIVE_LABEL = -1
+
+_samples: dict[int, deque] = defaultdict(
+    lambda: deque(maxlen=settings.PREFILTER_MAX_SAMPLES_PER_CLASS)
+)
+_samples_lock = threading.Lock()
+_train_lock = threading.Lock()
+
+_classifier: SoftmaxClassifier | None = None
+_pending_samples = 0
+
+prefilter_stats = {
+    "evaluated": 0,
+    "rejected": 0,
+    "skipped_untrained": 0,
+    "samples_added": 0,
+    "trainings": 0
+}
+
+def record_prefilter_sample(features: np.ndarray | None, label: int | None):
+    """
+    Tambahkan hasil model sebagai data latih. Model dilatih ulang di background
+    setiap PREFILTER_RETRAIN_EVERY sampel baru.
+    """
+    global _pending_samples
+
+    if features is None or label is None:
+        return
+
+    with _samples_lock:
+        _samples[label].append(features)
+        _pending_samples += 1
+        prefilter_stats["samples_added"] += 1
+        should_train = _pending_samples >= settings.PREFILTER_RETRAIN_EVERY
+
+    if should_train:
+        threading.Thread(target=train_prefilter, daemon=True).start()
+
+def train_prefilter():
+    """
+    Latih classifier dari sampel yang terkumpul lalu tukar secara atomik.
+    Classifier baru hanya dipakai jika kelas negatif dan minimal satu kelas
+    sampah punya sampel yang cukup.
+    """
+    global _classifier, _pending_samples
+
+    if not _train_lock.acquire(blocking=False):
+        return
+
+    try:
+        with _samples_lock:
+            snapshot = {label: list(samples) for label, samples in _samples.items()}
+            _pending_samples = 0
+
+        ready = {
+            label: samples
+            for label, samples in snapshot.items()
+            if len(samples) >= settings.PREFILTER_MIN_SAMPLES_PER_CLASS
+        }
+        if NEGATIVE_LABEL not in ready or len(ready) < 2:
+            return
+
+        features = np.stack([sample for samples in ready.values() for sample in samples])
+        labels = np.concatenate([
+            np.full(len(samples), label) for label, samples in ready.items()
+        ])
+
+        _classifier = SoftmaxClassifier().fit(features, labels)
+        prefilter_stats["trainings"] += 1
+
+    except Exception as e:
+        print(f"Error training prefilter: {str(e)}")
+
+    finally:
+        _train_lock.release()
+
+def bootstrap_prefilter(session: Session):
+    """
+    Isi data latih awal dari gambar Item yang tersimpan (label = category_id)
+    dan contoh gambar non-sampah di PREFILTER_NEGATIVE_DIR.
+    """
+    if not settings.PREFILTER_ENABLED:
+        return
+
+    items = session.exec(
+        select(Item.image_link, Item.category_id)
+    ).all()
+
+    for image_link, category_id in items:
+        if len(_samples[category_id]) >= settings.PREFILTER_MAX_SAMPLES_PER_CLASS:
+            continue
+        if image_link and Path(image_link).exists():
+            record_prefilter_sample(extract_features(image_link), category_id)
+
+    negative_dir = Path(settings.PREFILTER_NEGATIVE_DIR)
+    if negative_dir.is_dir():
+        for path in sorted(negative_dir.iterdir())[:settings.PREFILTER_MAX_SAMPLES_PER_CLASS]:
+            record_prefilter_sample(extract_features(str(path)), NEGATIVE_LABEL)
+
+    train_prefilter()
+
+async def prefilter_check(upload: StoredUpload) -> tuple[bool, np.ndarray | None]:
+    """
+    Mengembalikan (rejected, features). rejected=True berarti gambar dengan yakin
+    bukan sampah sehingga panggilan model bisa dilewati.
+    """
+    if not settings.PREFILTER_ENABLED:
+        return False, None
+
+    features = await run_in_pool(extract_features, upload.path)
+    if features is None:
+        return False, None
+
+    classifier = _classifier
+    if classifier is None:
+        prefilter_stats["skipped_untrained"] += 1
+        return False, features
+
+    prefilter_stats["evaluated"] += 1
+    label, confidence = classifier.predict(features)
+
+    if label == NEGATIVE_LABEL and confidence >= settings.PREFILTER_REJECT_THRESHOLD:
+        prefilter_stats["rejected"] += 1
+        return True, features
+
+    return False, features
+
+def get_prefilter_metrics() -> dict:
+    classifier = _classifier
+
+    return {
+        "enabled": settings.PREFILTER_ENABLED,
+        "trained": classifier is not None,
+        "classes": len(classifier.classes) if classifier is not None else 0,
+        "reject_threshold": settings.PREFILTER_REJECT_THRESHOLD,
+        "model_calls_avoided": prefilter_stats["rejected"],
+        **prefilter_stats
+    }
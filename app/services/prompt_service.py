@@ -0,0 +1,248 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from string import Template
+
+from google.genai import types
+from sqlmodel import Session, select
+
+from app.core.cache import content_hash
+from app.core.config import settings
+from app.core.genai_client import get_genai_client
+from app.databases.session import engine
+from app.models.category_model import Category
+
+NOT_IDENTIFIED_NAME = "Wasted Not Identified"
+
+# Naikkan versi setiap kali isi template diubah agar cache hasil lama tidak dipakai
+PROCESS_PROMPT_TEMPLATE_VERSION = "v2"
+
+# Mapping bawaan, hanya dipakai jika tabel categories masih kosong
+DEFAULT_CATEGORIES = [
+    (1, "Organic"), (2, "Plastic"), (3, "Metal"), (4, "Glass"),
+    (5, "Paper"), (6, "Textiles"), (7, "Hazardous"), (8, "E-Waste"),
+    (9, "Batteries"), (10, "Styrofoam"), (11, "Mixed Waste"), (12, "Other")
+]
+FALLBACK_CATEGORY_NAME = "Other"
+EXAMPLE_CATEGORY_NAME = "Plastic"
+
+PROCESS_PROMPT_TEMPLATE = Template("""
+                Identify the item in this image. Response ONLY with a valid JSON object.
+
+                Follow this category_id mapping:
+                $category_mapping
+
+                Response output format:
+                {
+                    "name": "item_name_singular",
+                    "description": "item_description",
+                    "recycle": "item_recycle_instructions",
+                    "is_reusable": true,
+                    "is_recyclable": true,
+                    "is_hazardous": false,
+                    "category_id": $fallback_category_id
+                }
+
+
+                If the item was not a trash item or could not be identified, return name as "$not_identified_name".
+
+                Example for identified trash item:
+                {"name": "plastic bottle", "description": "A clear plastic water bottle", "recycle": "**First choice** Before throwing it, see if it can be reused as DIY thing. Easy reuse ideas: - Refill for water\\n - Use as a plant watering can\\n - Cut and use as a funnel\\n\\n **How to recycle properly** Most plastic bottle are reusable, especially those marked with PET, PPE, or #1\\n Steps:\\n - Empty the bottle completely\\n - Remove the cap and label\\n - Rinse the bottle\\n - Place it in the recycling bin", "is_reusable": true, "is_recyclable": true, "is_hazardous": false, "category_id": $example_category_id}
+
+                Example for non-trash item:
+                {"name": "$not_identified_name", "description": "Item could not be identified as trash", "recycle": "N/A", "is_reusable": false, "is_recyclable": false, "is_hazardous": false, "category_id": $fallback_category_id}
+
+                No markdown, no extra text.
+                """)
+
+@dataclass(frozen=True)
+class ProcessPrompt:
+    text: str
+    version: str
+    category_ids: frozenset[int]
+    fallback_category_id: int
+    built_at: float
+
+_process_prompt: ProcessPrompt | None = None
+_refresh_lock = asyncio.Lock()
+
+# Context cache Gemini untuk prompt statis (opsional)
+_context_cache = {
+    "name": None,
+    "version": None,
+    "expires_at": 0.0
+}
+_context_cache_lock = asyncio.Lock()
+# Task penghapusan cached content lama (referensi disimpan agar tidak di-garbage collect)
+_context_cache_cleanup: set[asyncio.Task] = set()
+
+prompt_stats = {
+    "builds": 0,
+    "context_cache_created": 0,
+    "context_cache_deleted": 0,
+    "context_cache_errors": 0
+}
+
+def _render_prompt(categories: list[tuple[int, str]]) -> ProcessPrompt:
+    ids_by_name = {name.lower(): category_id for category_id, name in categories}
+    fallback_category_id = ids_by_name.get(FALLBACK_CATEGORY_NAME.lower(), categories[-1][0])
+    example_category_id = ids_by_name.get(EXAMPLE_CATEGORY_NAME.lower(), fallback_category_id)
+
+    category_mapping = json.dumps([
+        {"id": category_id, "name": name} for category_id, name in categories
+    ])
+
+    text = PROCESS_PROMPT_TEMPLATE.substitute(
+        category_mapping=category_mapping,
+        fallback_category_id=fallback_category_id,
+        example_category_id=example_category_id,
+        not_identified_name=NOT_IDENTIFIED_NAME
+    )
+
+    return ProcessPrompt(
+        text=text,
+        version=content_hash(PROCESS_PROMPT_TEMPLATE_VERSION, text)[:16],
+        category_ids=frozenset(category_id for category_id, _ in categories),
+        fallback_category_id=fallback_category_id,
+        built_at=time.monotonic()
+    )
+
+def build_process_prompt(session: Session) -> ProcessPrompt:
+    """
+    Susun prompt /llm/process dari isi tabel categories lalu simpan di memori.
+    Dipanggil saat startup dan setiap kali kategori berubah.
+    """
+    global _process_prompt
+
+    categories = session.exec(
+        select(Category.id, Category.name).order_by(Category.id)
+    ).all()
+
+    _process_prompt = _render_prompt([tuple(row) for row in categories] or DEFAULT_CATEGORIES)
+    prompt_stats["builds"] += 1
+
+    return _process_prompt
+
+def _build_process_prompt_from_db() -> ProcessPrompt:
+    with Session(engine) as session:
+        return build_process_prompt(session)
+
+async def get_process_prompt() -> ProcessPrompt:
+    """
+    Prompt yang sedang aktif. Dibangun ulang jika lebih tua dari
+    LLM_PROMPT_REFRESH_SECONDS supaya perubahan kategori dari worker lain ikut terbawa.
+    """
+    prompt = _process_prompt
+    if prompt is not None and time.monotonic() - prompt.built_at < settings.LLM_PROMPT_REFRESH_SECONDS:
+        return prompt
+
+    async with _refresh_lock:
+        prompt = _process_prompt
+        if prompt is None or time.monotonic() - prompt.built_at >= settings.LLM_PROMPT_REFRESH_SECONDS:
+            prompt = await asyncio.to_thread(_build_process_prompt_from_db)
+
+    return prompt
+
+def current_prompt_version() -> str:
+    prompt = _process_prompt
+    if prompt is None:
+        return PROCESS_PROMPT_TEMPLATE_VERSION
+
+    return prompt.version
+
+def resolve_category_id(category_id: int) -> int:
+    """Category id dari model yang tidak ada di tabel diganti kategori fallback."""
+    prompt = _process_prompt
+    if prompt is None or category_id in prompt.category_ids:
+        return category_id
+
+    return prompt.fallback_category_id
+
+async def get_context_cache(prompt: ProcessPrompt) -> str | None:
+    """
+    Nama cached content Gemini yang berisi prompt statis, atau None jika
+    fitur dimatikan / gagal dibuat (misalnya prompt di bawah batas token minimum).
+    """
+    # Context cache hanya ada di Gemini
+    if not settings.LLM_CONTEXT_CACHE_ENABLED or settings.LLM_BACKEND != "gemini":
+        return None
+
+    if _context_cache_fresh(prompt):
+        return _context_cache["name"]
+
+    # Hanya satu request yang membuat cache baru, sisanya menunggu lalu memakai hasilnya
+    async with _context_cache_lock:
+        if _context_cache_fresh(prompt):
+            return _context_cache["name"]
+
+        previous = _context_cache["name"]
+        name = await _create_context_cache(prompt)
+
+    if previous is not None and previous != name:
+        task = asyncio.create_task(_delete_context_cache(previous))
+        _context_cache_cleanup.add(task)
+        task.add_done_callback(_context_cache_cleanup.discard)
+
+    return name
+
+def _context_cache_fresh(prompt: ProcessPrompt) -> bool:
+    return _context_cache["version"] == prompt.version and time.monotonic() < _context_cache["expires_at"]
+
+async def _create_context_cache(prompt: ProcessPrompt) -> str | None:
+    now = time.monotonic()
+    ttl = settings.LLM_CONTEXT_CACHE_TTL_SECONDS
+
+    try:
+        cached_content = await get_genai_client().aio.caches.create(
+            model=settings.GEMINI_MODEL_NAME_PROCESS,
+            config=types.CreateCachedContentConfig(
+                contents=[
+                    types.Content(role="user", parts=[types.Part.from_text(text=prompt.text)])
+                ],
+                ttl=f"{ttl}s"
+            )
+        )
+        name = cached_content.name
+        prompt_stats["context_cache_created"] += 1
+
+        # Diperbarui sedikit lebih awal dari TTL di sisi server
+        expires_at = now + ttl * 0.9
+
+    except Exception as e:
+        print(f"Error creating context cache: {str(e)}")
+        prompt_stats["context_cache_errors"] += 1
+
+        # Jangan coba lagi di setiap request, pakai prompt inline sementara
+        name = None
+        expires_at = now + 300
+
+    _context_cache.update(name=name, version=prompt.version, expires_at=expires_at)
+
+    return name
+
+async def _delete_context_cache(name: str):
+    """
+    Hapus cached content yang sudah diganti. Ditunda selama deadline request
+    supaya request yang sudah memegang nama lama tetap selesai.
+    """
+    await asyncio.sleep(settings.LLM_REQUEST_DEADLINE_SECONDS)
+
+    try:
+        await get_genai_client().aio.caches.delete(name=name)
+        prompt_stats["context_cache_deleted"] += 1
+
+    except Exception as e:
+        print(f"Error deleting context cache: {str(e)}")
+        prompt_stats["context_cache_errors"] += 1
+
+def get_prompt_metrics() -> dict:
+    prompt = _process_prompt
+
+    return {
+        "version": current_prompt_version(),
+        "categories": len(prompt.category_ids) if prompt is not None else 0,
+        "context_cache_enabled": settings.LLM_CONTEXT_CACHE_ENABLED,
+        "context_cache_active": _context_cache["name"] is not None,
+        **prompt_stats
+    }
@@ -0,0 +1,151 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert
+from sqlmodel import Session, desc, func, select
+
+from app.core.config import settings
+from app.databases.session import advisory_lock, engine
+from app.models.history_model import History
+from app.models.item_daily_view_model import ItemDailyView
+from app.models.item_model import Item
+
+# Kunci pg advisory lock untuk refresh rollup (dipakai juga oleh retention histories)
+ITEM_DAILY_VIEWS_LOCK_KEY = 7_240_001
+
+def _as_date(value: date | str) -> date:
+    # SQLite mengembalikan date(...) sebagai string "YYYY-MM-DD"
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+
+    return value
+
+def refresh_item_daily_views(session: Session) -> int:
+    """
+    Perbarui rollup item_daily_views dari histories secara incremental:
+    hanya hari sejak hari terakhir di rollup (dikurangi lookback untuk histori
+    yang tercatat terlambat) yang dihitung ulang. Jika rollup masih kosong,
+    seluruh histories di-backfill. Mengembalikan jumlah baris yang ditulis.
+    """
+    last_day = session.exec(
+        select(func.max(ItemDailyView.day))
+    ).one()
+
+    day = func.date(History.viewed_at)
+    statement = (
+        select(
+            History.item_id,
+            day,
+            func.count(History.id),
+            func.count(func.distinct(History.user_id))
+        )
+        .where(History.item_id.is_not(None))
+        .group_by(History.item_id, day)
+    )
+
+    start_day = None
+    if last_day is not None:
+        start_day = _as_date(last_day) - timedelta(days=settings.ITEM_DAILY_VIEWS_LOOKBACK_DAYS)
+        statement = statement.where(
+            History.viewed_at >= datetime.combine(start_day, datetime.min.time(), tzinfo=timezone.utc)
+        )
+
+    rows = [
+        {
+            "item_id": item_id,
+            "day": _as_date(view_day),
+            "view_count": view_count,
+            "unique_users": unique_users
+        }
+        for item_id, view_day, view_count, unique_users in session.exec(statement).all()
+    ]
+
+    # Hari yang dihitung ulang diganti utuh dalam satu transaksi
+    if start_day is not None:
+        session.exec(
+            delete(ItemDailyView).where(ItemDailyView.day >= start_day)
+        )
+
+    if rows:
+        session.exec(insert(ItemDailyView), params=rows)
+
+    session.commit()
+
+    return len(rows)
+
+def _refresh_item_daily_views():
+    # Job berjalan di setiap worker; refresh yang bersamaan saling bentrok saat delete + insert hari yang sama
+    with advisory_lock(ITEM_DAILY_VIEWS_LOCK_KEY) as acquired:
+        if not acquired:
+            return None
+
+        with Session(engine) as session:
+            return refresh_item_daily_views(session)
+
+async def run_item_daily_views_job():
+    while True:
+        try:
+            await asyncio.to_thread(_refresh_item_daily_views)
+
+        except Exception as e:
+            print(f"Error refreshing item_daily_views: {str(e)}")
+
+        await asyncio.sleep(settings.ITEM_DAILY_VIEWS_REFRESH_SECONDS)
+
+def get_popular_item_ids(
+    session: Session,
+    days: int,
+    limit: int,
+    category_id: int | None = None
+) -> list[int]:
+    """Item dengan view terbanyak selama `days` hari terakhir (termasuk hari ini), dari rollup."""
+    start_day = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+
+    views = func.sum(ItemDailyView.view_count).label("views")
+
+    statement = (
+        select(ItemDailyView.item_id, views)
+        .where(ItemDailyView.day >= start_day)
+        .group_by(ItemDailyView.item_id)
+        .order_by(desc(views))
+        .limit(limit)
+    )
+
+    if category_id is not None:
+        statement = statement.join(Item, Item.id == ItemDailyView.item_id).where(Item.category_id == category_id)
+
+    rows = session.exec(statement).all()
+
+    return [item_id for item_id, _ in rows]
+
+def get_last_rollup_day(session: Session) -> date | None:
+    """Hari terakhir yang sudah ada di rollup; hari-hari sebelumnya sudah lengkap."""
+    last_day = session.exec(
+        select(func.max(ItemDailyView.day))
+    ).one()
+
+    return _as_date(last_day) if last_day is not None else None
+
+def get_daily_view_counts(session: Session, start_day: date, end_day: date) -> list[tuple[int, date, int, int]]:
+    """Baris rollup (item_id, day, view_count, category_id) untuk start_day <= day < end_day."""
+    rows = session.exec(
+        select(ItemDailyView.item_id, ItemDailyView.day, ItemDailyView.view_count, Item.category_id)
+        .join(Item, Item.id == ItemDailyView.item_id)
+        .where(ItemDailyView.day >= start_day)
+        .where(ItemDailyView.day < end_day)
+    ).all()
+
+    return [
+        (item_id, _as_date(day), view_count, category_id)
+        for item_id, day, view_count, category_id in rows
+    ]
+
+def delete_item_daily_views(session: Session, item_id: int) -> None:
+    """
+    Hapus rollup milik item (tanpa commit, ikut transaksi penghapusan item).
+    Database lama dibuat tanpa ON DELETE CASCADE dan SQLite tidak menegakkan
+    foreign key, jadi penghapusan dilakukan eksplisit.
+    """
+    session.exec(
+        delete(ItemDailyView).where(ItemDailyView.item_id == item_id)
+    )
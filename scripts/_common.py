@@ -0,0 +1,114 @@
+"""
+Setup bersama untuk benchmark di scripts/: environment minimal, direktori kerja
+dan database SQLite sementara. Database dan storage asli tidak pernah disentuh.
+"""
+import atexit
+import io
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Nilai dummy untuk setting wajib di app.core.config (tidak ada koneksi keluar)
+_REQUIRED_ENV = {
+    "APP_NAME": "bench",
+    "ENV": "bench",
+    "GEMINI_API_KEY": "bench",
+    "GEMINI_MODEL_NAME_CHECK": "bench-check",
+    "GEMINI_MODEL_NAME_PROCESS": "bench-process",
+    "SECRET_KEY": "bench-secret-key-with-at-least-32-bytes",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "DB_DRIVER": "sqlite",
+    "DB_HOST": "localhost",
+    "DB_PORT": "0",
+    "DB_NAME": "bench",
+    "DB_USER": "bench",
+    "DB_PASSWORD": "bench",
+}
+
+
+def setup_env(database_path: str | None = None, **overrides) -> Path:
+    """
+    Siapkan environment sebelum modul app diimport: setting wajib diisi dummy,
+    override dipasang, DATABASE_URL diarahkan ke file SQLite (default: file baru
+    di direktori sementara) dan direktori kerja dipindah ke direktori sementara
+    supaya upload / storage/ benchmark tidak tercampur dengan milik aplikasi.
+    Direktori itu dihapus saat proses selesai. Mengembalikan direktori kerja tersebut.
+    """
+    workdir = Path(tempfile.mkdtemp(prefix="bench_"))
+    atexit.register(shutil.rmtree, workdir, ignore_errors=True)
+
+    for key, value in _REQUIRED_ENV.items():
+        os.environ.setdefault(key, value)
+
+    for key, value in overrides.items():
+        os.environ[key] = str(value)
+
+    database_path = database_path or str(workdir / "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(database_path)}"
+
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    os.chdir(workdir)
+
+    return workdir
+
+
+def create_database():
+    """
+    Buat semua tabel (SQLModel metadata) di database benchmark, isi kategori
+    bawaan dan matikan echo SQL.
+    """
+    from sqlmodel import Session, SQLModel
+
+    import app.models  # noqa: F401
+    from app.databases.session import engine
+    from app.models.category_model import Category
+    from app.services.prompt_service import DEFAULT_CATEGORIES
+
+    engine.echo = False
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        for category_id, name in DEFAULT_CATEGORIES:
+            session.add(Category(id=category_id, name=name, image_link="bench"))
+        session.commit()
+
+    return engine
+
+
+def create_user_token(session) -> str:
+    """Buat satu user dan kembalikan header Authorization untuk endpoint yang butuh login."""
+    from app.core.sequrity import get_password_hashed
+    from app.models.user_model import User
+    from app.services.authentication_service import create_access_token
+
+    user = User(name="bench", email="bench@example.com", hashed_password=get_password_hashed("bench"))
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+
+    return f"Bearer {create_access_token(user.id)}"
+
+
+def noise_jpeg(seed: int, size: int = 256) -> bytes:
+    """Gambar JPEG acak (tidak saling near-duplicate) untuk upload benchmark."""
+    from PIL import Image
+
+    pixels = np.random.default_rng(seed).integers(0, 255, (size, size, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, "JPEG")
+
+    return buffer.getvalue()
+
+
+def percentiles(seconds: list[float]) -> str:
+    p50, p95, p99 = np.percentile(np.asarray(seconds) * 1000, [50, 95, 99])
+
+    return f"p50 {p50:.2f} ms  p95 {p95:.2f} ms  p99 {p99:.2f} ms"
@@ -0,0 +1,93 @@
+"""
+Benchmark throughput GET /api/items/{id} (mencatat histori setiap view) dengan
+commit per view dibandingkan write-behind buffer (history_buffer), pada
+database SQLite sementara. Untuk PostgreSQL, arahkan --database-url ke database kosong.
+
+    python -m scripts.bench_history_buffer --requests 2000 --workers 1 8
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from scripts._common import create_database, create_user_token, percentiles, setup_env
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--database-url", help="database selain SQLite sementara (tabel dibuat dengan create_all)")
+    args = parser.parse_args()
+
+    setup_env(HISTORY_BUFFER_ENABLED=True)
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    create_database()
+
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session, func, select
+
+    import app.services.history_service as history_service
+    from app.databases.session import engine
+    from app.main import app
+    from app.models.history_model import History
+    from app.models.item_model import Item
+
+    with Session(engine) as session:
+        headers = {"Authorization": create_user_token(session)}
+        for index in range(args.items):
+            session.add(Item(
+                name=f"item {index}",
+                description="bench",
+                image_link=f"bench/{index}.jpg",
+                recycle="bench",
+                is_reusable=True,
+                is_recyclable=True,
+                is_hazardous=False,
+                category_id=1 + index % 12
+            ))
+        session.commit()
+        item_ids = session.exec(select(Item.id)).all()
+
+    def run(client: TestClient, requests: int, workers: int) -> str:
+        latencies = []
+
+        def read(index: int):
+            started = time.perf_counter()
+            response = client.get(f"/api/items/{item_ids[index % len(item_ids)]}", headers=headers)
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(workers) as executor:
+            list(executor.map(read, range(requests)))
+        elapsed = time.perf_counter() - started
+
+        return f"{requests / elapsed:7.0f} req/s  {percentiles(latencies)}"
+
+    with TestClient(app) as client:
+        buffer = history_service.history_buffer
+
+        for workers in args.workers:
+            # Tanpa buffer create_history langsung INSERT + COMMIT per view
+            buffer.stop()
+            run(client, 200, workers)
+            print(f"workers={workers} commit per view: {run(client, args.requests, workers)}")
+
+            buffer.start()
+            run(client, 200, workers)
+            print(f"workers={workers} write-behind   : {run(client, args.requests, workers)}")
+
+        buffer.stop()
+        print(buffer.metrics())
+
+    with Session(engine) as session:
+        histories = session.exec(select(func.count(History.id))).one()
+        expected = len(args.workers) * 2 * (args.requests + 200)
+        print(f"histories written: {histories} (expected {expected})")
+
+
+if __name__ == "__main__":
+    main()
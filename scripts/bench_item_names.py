@@ -0,0 +1,123 @@
+"""
+Benchmark pencocokan nama item untuk /api/llm/check: NameIndex di memori
+(resolve_item_name, exact ternormalisasi + fuzzy trigram) dibandingkan query DB
+lama (`Item.name ==`) dan pencarian ILIKE '%nama%', pada database SQLite sintetis.
+
+Query "exact" memakai nama apa adanya, query "fuzzy" memakai varian plural,
+huruf besar, tanda hubung dan satu huruf salah ketik.
+
+    python -m scripts.bench_item_names --items 100000 --queries 2000
+"""
+import argparse
+import random
+import time
+
+from scripts._common import create_database, percentiles, setup_env
+
+WORDS = [
+    "plastic", "glass", "paper", "metal", "aluminium", "cardboard", "rubber", "wooden",
+    "ceramic", "steel", "foam", "fabric", "cotton", "nylon", "copper", "tin",
+    "bottle", "can", "box", "bag", "cup", "jar", "lid", "straw", "tray", "wrapper",
+    "battery", "bulb", "cable", "phone", "charger", "tube", "carton", "plate", "fork",
+    "spoon", "brush", "toy", "shoe", "shirt", "mask", "glove", "pipe", "bucket", "sack",
+]
+
+
+def random_name(generator: random.Random) -> str:
+    words = [generator.choice(WORDS) for _ in range(generator.randint(2, 3))]
+    return f"{' '.join(words)} {generator.randrange(10_000)}"
+
+
+def fuzzy_variant(generator: random.Random, name: str) -> str:
+    """Varian yang tidak lolos `Item.name ==`: plural, kapital, tanda hubung, satu typo."""
+    words = name.split()
+    words[-2] = words[-2] + "s"
+    variant = "-".join(words).title()
+
+    index = generator.randrange(1, len(variant) - 1)
+    return variant[:index] + generator.choice("aeiou") + variant[index + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--ilike-queries", type=int, default=50, help="ILIKE memindai seluruh tabel, jadi sampelnya lebih sedikit")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    setup_env()
+    create_database()
+
+    from sqlmodel import Session, select
+
+    from app.core.config import settings
+    from app.databases.session import engine
+    from app.models.item_model import Item
+    from app.services.item_name_service import build_item_name_index, item_name_index, resolve_item_name
+
+    generator = random.Random(args.seed)
+    names = list({random_name(generator) for _ in range(args.items)})
+
+    with Session(engine) as session:
+        for index, name in enumerate(names):
+            session.add(Item(
+                name=name,
+                description="bench",
+                image_link=f"bench/{index}.jpg",
+                recycle="bench",
+                is_reusable=True,
+                is_recyclable=True,
+                is_hazardous=False,
+                category_id=1 + index % 12
+            ))
+        session.commit()
+
+        started = time.perf_counter()
+        build_item_name_index(session)
+        print(f"{len(names)} items, build_item_name_index {time.perf_counter() - started:.2f} s")
+
+        exact_queries = [generator.choice(names) for _ in range(args.queries)]
+        fuzzy_queries = [(fuzzy_variant(generator, name), name) for name in (generator.choice(names) for _ in range(args.queries))]
+
+        def measure(lookup, queries: list[str]) -> tuple[list[float], int]:
+            latencies, hits = [], 0
+            for query in queries:
+                started = time.perf_counter()
+                item = lookup(query)
+                latencies.append(time.perf_counter() - started)
+                hits += item is not None
+            return latencies, hits
+
+        def db_exact(name: str) -> Item | None:
+            # Implementasi sebelum NameIndex
+            return session.exec(select(Item).where(Item.name == name)).first()
+
+        def db_ilike(name: str) -> Item | None:
+            return session.exec(select(Item).where(Item.name.ilike(f"%{name}%"))).first()
+
+        def index_only(name: str):
+            return item_name_index.lookup(name, threshold=settings.ITEM_NAME_MATCH_THRESHOLD)
+
+        for label, queries in (("exact", exact_queries), ("fuzzy", [query for query, _ in fuzzy_queries])):
+            ilike_queries = queries[:args.ilike_queries]
+
+            for path, lookup, sample in (
+                ("Item.name ==", db_exact, queries),
+                ("ILIKE '%name%'", db_ilike, ilike_queries),
+                ("NameIndex.lookup", index_only, queries),
+                ("resolve_item_name", lambda name: resolve_item_name(session, name), queries),
+            ):
+                latencies, hits = measure(lookup, sample)
+                print(f"{label} {path:<18}: {percentiles(latencies)}  hits {hits}/{len(sample)}")
+
+        item_names = dict(session.exec(select(Item.id, Item.name)).all())
+        correct = sum(
+            (match := index_only(query)) is not None and item_names[match[0]] == expected
+            for query, expected in fuzzy_queries
+        )
+        print(f"fuzzy resolved to the original item: {correct}/{len(fuzzy_queries)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Load benchmark POST /api/llm/process dengan backend model fake (LLM_BACKEND=fake):
+N upload bersamaan dalam satu event loop, seperti satu worker uvicorn.
+
+Mode "blocking" meniru perilaku sebelum SDK async dipakai (panggilan model sync
+di dalam handler async yang menahan event loop); mode "async" adalah jalur saat ini
+(SDK async + LLM_MAX_CONCURRENCY + LLM_TIMEOUT_SECONDS).
+
+    python -m scripts.bench_llm_load --uploads 50 --latency 0.2
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+from collections import Counter
+
+from scripts._common import create_database, create_user_token, noise_jpeg, percentiles, setup_env
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=50, help="jumlah upload bersamaan")
+    parser.add_argument("--latency", type=float, default=0.2, help="latency model fake (detik)")
+    parser.add_argument("--limit", type=int, default=64, help="LLM_MAX_CONCURRENCY")
+    parser.add_argument("--modes", nargs="+", default=["blocking", "async"], choices=["blocking", "async"])
+    return parser.parse_args()
+
+
+async def run(client, headers: dict, images: list[bytes]) -> tuple[float, list[float], Counter]:
+    latencies = []
+
+    async def upload(image: bytes) -> int:
+        started = time.perf_counter()
+        response = await client.post(
+            "/api/llm/process",
+            files={"file": ("bench.jpg", image, "image/jpeg")},
+            headers=headers
+        )
+        latencies.append(time.perf_counter() - started)
+        return response.status_code
+
+    started = time.perf_counter()
+    statuses = await asyncio.gather(*(upload(image) for image in images))
+
+    return time.perf_counter() - started, latencies, Counter(statuses)
+
+
+async def main():
+    args = parse_args()
+
+    setup_env(
+        LLM_BACKEND="fake",
+        FAKE_MODEL_LATENCY_MEDIAN_SECONDS=args.latency,
+        FAKE_MODEL_LATENCY_SIGMA=0,
+        LLM_MAX_CONCURRENCY=args.limit,
+        PREFILTER_ENABLED=False
+    )
+    create_database()
+
+    import httpx
+    from sqlmodel import Session
+
+    import app.core.model_backend as model_backend
+    from app.databases.session import engine
+    from app.main import app
+
+    class BlockingFakeBackend(model_backend.FakeBackend):
+        """Fake backend yang tidur secara sync, seperti client.models.generate_content."""
+
+        async def generate(self, request):
+            time.sleep(self.latency_median)
+
+            digest = int.from_bytes(hashlib.sha256(request.image).digest()[:8], "big")
+            return json.dumps(self._fake_output(request.schema, digest))
+
+    with Session(engine) as session:
+        headers = {"Authorization": create_user_token(session)}
+
+    print(f"{args.uploads} concurrent uploads, model latency {args.latency * 1000:.0f} ms, LLM_MAX_CONCURRENCY={args.limit}")
+
+    seed = 0
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for mode in args.modes:
+                async_backend = model_backend.get_model_backend()
+                if mode == "blocking":
+                    model_backend._backend = BlockingFakeBackend(
+                        latency_median=args.latency,
+                        latency_sigma=0,
+                        error_rate=0
+                    )
+
+                # Gambar baru tiap mode supaya tidak ada cache hit
+                images = [noise_jpeg(seed + index) for index in range(args.uploads)]
+                seed += args.uploads
+
+                elapsed, latencies, statuses = await run(client, headers, images)
+                model_backend._backend = async_backend
+
+                print(
+                    f"{mode:>8}: {args.uploads / elapsed:7.1f} req/s  total {elapsed:.2f} s  "
+                    f"{percentiles(latencies)}  status {dict(statuses)}"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,141 @@
+"""
+Benchmark item populer: query SQL lama (JOIN histories + GROUP BY 7 hari per
+request) dibandingkan counter sliding-window per jam di memori
+(history_service.get_popular_items), pada database SQLite sintetis.
+
+Membuat 10M baris butuh beberapa menit; pakai --database untuk menyimpan dan
+memakai ulang file database yang sama.
+
+    python -m scripts.bench_popularity --rows 10000000 --database /tmp/bench_popularity.db
+"""
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from scripts._common import create_database, percentiles, setup_env
+
+CHUNK_ROWS = 1_000_000
+
+
+def generate(path: str, rows: int, users: int, items: int, days: int, seed: int) -> None:
+    """Isi histories dengan view acak selama `days` hari terakhir (item berdistribusi Zipf)."""
+    connection = sqlite3.connect(path)
+    connection.executemany(
+        "INSERT INTO items (id, name, description, image_link, recycle, is_reusable, is_recyclable, is_hazardous, created_at, category_id) "
+        "VALUES (?, ?, 'bench', 'bench', 'bench', 1, 1, 0, '2026-01-01', ?)",
+        [(item_id, f"item {item_id}", 1 + item_id % 12) for item_id in range(1, items + 1)]
+    )
+    connection.executemany(
+        "INSERT INTO users (id, name, email, hashed_password, created_at) VALUES (?, 'bench', ?, 'bench', '2026-01-01')",
+        [(user_id, f"user{user_id}@example.com") for user_id in range(1, users + 1)]
+    )
+
+    generator = np.random.default_rng(seed)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    started = time.perf_counter()
+
+    for offset in range(0, rows, CHUNK_ROWS):
+        count = min(CHUNK_ROWS, rows - offset)
+        user_ids = generator.integers(1, users + 1, count)
+        item_ids = np.minimum(generator.zipf(1.3, count), items)
+        seconds = generator.integers(0, days * 86400, count)
+
+        connection.executemany(
+            "INSERT INTO histories (user_id, item_id, viewed_at) VALUES (?, ?, ?)",
+            (
+                (int(user_id), int(item_id), (now - timedelta(seconds=int(second))).isoformat(sep=" "))
+                for user_id, item_id, second in zip(user_ids, item_ids, seconds)
+            )
+        )
+        connection.commit()
+
+    connection.close()
+    print(f"generated {rows} histories in {time.perf_counter() - started:.0f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--items", type=int, default=5_000)
+    parser.add_argument("--days", type=int, default=10, help="rentang viewed_at (sebagian di luar window 7 hari)")
+    parser.add_argument("--database", help="file SQLite yang dibuat / dipakai ulang")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    reuse = args.database is not None and os.path.exists(args.database)
+    setup_env(database_path=args.database)
+
+    if not reuse:
+        create_database()
+        generate(os.environ["DATABASE_URL"].removeprefix("sqlite:///"), args.rows, args.users, args.items, args.days, args.seed)
+
+    from sqlmodel import Session, desc, func, select
+
+    import app.services.history_service as history_service
+    from app.databases.session import engine
+    from app.models.history_model import History
+    from app.models.item_model import Item
+    from app.services.rollup_service import refresh_item_daily_views
+
+    engine.echo = False
+
+    def popular_items_sql(session: Session) -> list[int]:
+        # Implementasi sebelum counter sliding-window
+        since = datetime.now(timezone.utc) - timedelta(days=7)
+        statement = (
+            select(Item, func.count(History.id).label("popularity_count"))
+            .join(History, Item.id == History.item_id)
+            .where(History.viewed_at >= since)
+            .group_by(Item.id)
+            .order_by(desc("popularity_count"))
+            .limit(10)
+        )
+
+        return [item.id for item, _ in session.exec(statement).all()]
+
+    with Session(engine) as session:
+        latencies = []
+        for _ in range(3):
+            started = time.perf_counter()
+            sql_ids = popular_items_sql(session)
+            latencies.append(time.perf_counter() - started)
+        print(f"SQL GROUP BY per request: {', '.join(f'{seconds:.2f} s' for seconds in latencies)}")
+
+        # Rollup harian biasanya sudah diisi job di background; bootstrap hanya membaca histories hari ini
+        started = time.perf_counter()
+        refresh_item_daily_views(session)
+        print(f"item_daily_views refresh: {time.perf_counter() - started:.1f} s")
+
+        started = time.perf_counter()
+        history_service.bootstrap_popularity(session)
+        print(f"counter bootstrap (once per process): {time.perf_counter() - started:.1f} s  {history_service.popularity_counter.stats()}")
+
+        latencies = []
+        for _ in range(200):
+            started = time.perf_counter()
+            counter_ids = [item.id for item in history_service.get_popular_items(session)]
+            latencies.append(time.perf_counter() - started)
+        print(f"counter get_popular_items (incl. loading {len(counter_ids)} items): {percentiles(latencies)}")
+
+    counter = history_service.popularity_counter
+
+    started = time.perf_counter()
+    for index in range(100_000):
+        counter.increment(index % args.items + 1)
+    print(f"increment: {(time.perf_counter() - started) * 10:.2f} us")
+
+    started = time.perf_counter()
+    for _ in range(10_000):
+        counter.top(10)
+    print(f"top(10): {(time.perf_counter() - started) * 100:.2f} us")
+
+    print(f"same top 10 as SQL: {sql_ids == counter_ids[:10]}")
+
+
+if __name__ == "__main__":
+    main()
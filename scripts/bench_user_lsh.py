@@ -0,0 +1,119 @@
+"""
+Benchmark recall@K MinHash LSH terhadap similarity user exact
+(mode RECOMMENDATION_USER_SIMILARITY="lsh" vs "exact").
+
+Data sintetis: user berkelompok (tiap kelompok punya pool item sendiri)
+ditambah item populer berdistribusi Zipf, kasus terburuk untuk mode exact.
+
+    python -m scripts.bench_user_lsh --users 100000 --configs 64x32 128x64
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.core.interaction_matrix import InteractionMatrix
+from app.core.minhash_lsh import MinHashLSH
+
+
+def generate_pairs(users: int, items: int, groups: int, seed: int) -> list[tuple[int, int]]:
+    generator = np.random.default_rng(seed)
+    pools = generator.integers(0, items, (groups, 30))
+    pairs = []
+
+    for user_id in range(users):
+        count = generator.integers(3, 20)
+        own = generator.choice(pools[user_id % groups], size=count)
+
+        popular = generator.random(count) < 0.3
+        own[popular] = np.minimum(generator.zipf(1.3, popular.sum()), items) - 1
+
+        pairs.extend((user_id, int(item_id)) for item_id in own)
+
+    return pairs
+
+
+def evaluate(
+    matrix: InteractionMatrix,
+    lsh: MinHashLSH,
+    sample_size: int,
+    top_k: int,
+    max_candidates: int
+) -> dict:
+    """
+    Bandingkan top_k user mirip dari LSH dengan hasil exact pada sampel user.
+    Tetangga LSH dihitung benar jika skornya >= skor ke-K hasil exact (aman terhadap skor seri).
+    """
+    user_ids = matrix.user_ids()
+    sample = random.sample(user_ids, min(sample_size, len(user_ids)))
+
+    hits = 0
+    expected = 0
+    exact_seconds = 0.0
+    lsh_seconds = 0.0
+    candidate_count = 0
+
+    for user_id in sample:
+        started = time.perf_counter()
+        exact = matrix.similar_users(user_id, top_k)
+        exact_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        candidates = lsh.candidates(user_id, limit=max_candidates)
+        approximate = matrix.similar_users(user_id, top_k, candidates=candidates)
+        lsh_seconds += time.perf_counter() - started
+
+        candidate_count += len(candidates)
+        if not exact:
+            continue
+
+        threshold = exact[-1][1] - 1e-9
+        expected += len(exact)
+        hits += min(sum(1 for _, score in approximate if score >= threshold), len(exact))
+
+    users = max(len(sample), 1)
+
+    return {
+        "users": len(sample),
+        "top_k": top_k,
+        "recall": round(hits / expected, 4) if expected else None,
+        "avg_candidates": round(candidate_count / users, 1),
+        "exact_ms": round(exact_seconds / users * 1000, 3),
+        "lsh_ms": round(lsh_seconds / users * 1000, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--items", type=int, default=5_000)
+    parser.add_argument("--groups", type=int, default=1_000)
+    parser.add_argument("--sample", type=int, default=300)
+    parser.add_argument("--top-k", type=int, default=6)
+    parser.add_argument("--max-candidates", type=int, default=500)
+    parser.add_argument("--configs", nargs="+", default=["64x32", "128x64"], help="num_perm x bands")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    pairs = generate_pairs(args.users, args.items, args.groups, args.seed)
+
+    matrix = InteractionMatrix()
+    matrix.load(pairs)
+    print(f"{args.users} users, {len(pairs)} histories")
+
+    for config in args.configs:
+        num_perm, bands = (int(value) for value in config.split("x"))
+        lsh = MinHashLSH(num_perm=num_perm, bands=bands)
+
+        started = time.perf_counter()
+        lsh.load(pairs)
+        load_seconds = time.perf_counter() - started
+
+        result = evaluate(matrix, lsh, args.sample, args.top_k, args.max_candidates)
+        print(f"num_perm={num_perm} bands={bands} load={load_seconds:.1f}s {result}")
+
+
+if __name__ == "__main__":
+    main()